@@ -1,8 +1,9 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, JSON, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Date, JSON, Boolean, Float, LargeBinary
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from datetime import datetime
 from app.utils.database import Base
+from app.utils.text_codec import compress_text, decompress_text
 
 # --- 1. USER MANAGEMENT ---
 class User(Base):
@@ -39,9 +40,10 @@ class Book(Base):
     author = Column(String, nullable=True)
     file_path = Column(String, nullable=False)
     
-    # Content & Status
-    extracted_text = Column(Text, nullable=True)
-    status = Column(String, default="uploaded") # uploaded, processing, completed, failed
+    # Content & Status (the text itself lives in BookContent; see extracted_text below)
+    # Pre-BookContent rows keep their text here until migrated; deferred so it never rides along
+    legacy_text = deferred(Column("extracted_text", Text, nullable=True))
+    status = Column(String, default="uploaded") # uploaded, extracting, ready, processing, completed, failed
     
     # ✅ ADMIN FIELD (Content Moderation)
     is_flagged = Column(Boolean, default=False) 
@@ -56,6 +58,75 @@ class Book(Base):
     # Relationships
     owner = relationship("User", back_populates="books")
     summaries = relationship("Summary", back_populates="book", cascade="all, delete-orphan")
+    jobs = relationship("ProcessingJob", back_populates="book", cascade="all, delete-orphan")
+    summary_tree = relationship("SummaryTree", back_populates="book", uselist=False, cascade="all, delete-orphan")
+    sentence_index = relationship("SentenceIndex", back_populates="book", uselist=False, cascade="all, delete-orphan")
+    stage_timings = relationship("StageTiming", back_populates="book", cascade="all, delete-orphan")
+    content = relationship("BookContent", back_populates="book", uselist=False, cascade="all, delete-orphan")
+
+    @property
+    def extracted_text(self):
+        """Full text, loaded (one extra query) and decompressed only when read."""
+        content = self.content
+        if content is None:
+            return self.legacy_text
+        cached = self.__dict__.get("_text_cache")
+        if cached is None or cached[0] is not content.data:
+            cached = (content.data, decompress_text(content.codec, content.data))
+            self.__dict__["_text_cache"] = cached
+        return cached[1]
+
+    @extracted_text.setter
+    def extracted_text(self, text):
+        self.legacy_text = None
+        self.__dict__.pop("_text_cache", None)
+        if not text:
+            self.content = None
+            return
+        codec, data = compress_text(text)
+        if self.content is None:
+            self.content = BookContent(codec=codec, data=data, text_length=len(text))
+        else:
+            self.content.codec, self.content.data, self.content.text_length = codec, data, len(text)
+
+    @property
+    def language(self):
+        """ISO 639-1 code detected at ingestion (stored on BookContent, next to the text it describes)."""
+        return self.content.language if self.content is not None else None
+
+
+# --- 2a. BOOK CONTENT (Extracted text, compressed, off the hot Book row) ---
+class BookContent(Base):
+    __tablename__ = "book_contents"
+
+    book_id = Column(Integer, ForeignKey("books.book_id", ondelete="CASCADE"), primary_key=True)
+    codec = Column(String, nullable=False)          # zstd | zlib (app.utils.text_codec)
+    data = Column(LargeBinary, nullable=False)
+    text_length = Column(Integer, default=0)        # characters, before compression
+    language = Column(String, nullable=True)        # ISO 639-1 code detected at ingestion
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    book = relationship("Book", back_populates="content")
+
+
+# --- 2b. SENTENCE INDEX (Segmented once at ingestion) ---
+class SentenceIndex(Base):
+    __tablename__ = "sentence_indexes"
+
+    index_id = Column(Integer, primary_key=True, index=True)
+    book_id = Column(Integer, ForeignKey("books.book_id", ondelete="CASCADE"), unique=True, index=True)
+
+    # Packed little-endian int32 (start, end) pairs into Book.extracted_text
+    offsets = Column(LargeBinary, nullable=False)
+    sentence_count = Column(Integer, default=0)
+    # len(extracted_text) when built; a mismatch means the index is stale
+    text_length = Column(Integer, default=0)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    book = relationship("Book", back_populates="sentence_index")
 
 
 # --- 3. SUMMARY ENGINE ---
@@ -83,6 +154,121 @@ class Summary(Base):
     user = relationship("User", back_populates="summaries")
 
 
+# --- 3a. SUMMARY TREE (Multi-resolution, one per book) ---
+class SummaryTree(Base):
+    __tablename__ = "summary_trees"
+
+    tree_id = Column(Integer, primary_key=True, index=True)
+    book_id = Column(Integer, ForeignKey("books.book_id", ondelete="CASCADE"), unique=True, index=True)
+
+    # levels[0] = chunk summaries, levels[1..-2] = section summaries, levels[-1] = [book summary]
+    levels = Column(JSON, nullable=False)
+    chunk_count = Column(Integer, default=0)
+    model_name = Column(String, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    book = relationship("Book", back_populates="summary_tree")
+
+
+# --- 3b. SUMMARY CACHE (Content-addressed) ---
+class SummaryCacheEntry(Base):
+    __tablename__ = "summary_cache"
+
+    cache_id = Column(Integer, primary_key=True, index=True)
+    # sha256(content_hash | length | style | model | prompt_version)
+    cache_key = Column(String(64), unique=True, index=True, nullable=False)
+    content_hash = Column(String(64), index=True, nullable=False)
+
+    length_setting = Column(String, nullable=False)
+    style_setting = Column(String, nullable=False)
+    model_name = Column(String, nullable=False)
+    prompt_version = Column(String, nullable=False)
+
+    summary_text = Column(Text, nullable=False)
+    keywords = Column(String, nullable=True)
+
+    # ✅ EVICTION BOOKKEEPING
+    hit_count = Column(Integer, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_hit_at = Column(DateTime(timezone=True), nullable=True, index=True)
+
+
+# --- 3c. PROCESSING JOBS (Durable queue) ---
+class ProcessingJob(Base):
+    __tablename__ = "processing_jobs"
+
+    job_id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False, default="summary")
+    book_id = Column(Integer, ForeignKey("books.book_id", ondelete="CASCADE"), index=True)
+    user_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=True)
+
+    # Job Settings
+    length_setting = Column(String, default="medium")
+    style_setting = Column(String, default="paragraph")
+
+    # ✅ SCHEDULING (lower priority runs first; batch jobs use the book's word count)
+    batch_id = Column(Integer, ForeignKey("summary_batches.batch_id", ondelete="CASCADE"), nullable=True, index=True)
+    priority = Column(Integer, default=0, index=True)
+
+    # ✅ QUEUE STATE
+    status = Column(String, default="queued", index=True)  # queued, running, completed, failed
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=3)
+    last_error = Column(Text, nullable=True)
+    worker_id = Column(String, nullable=True)
+    available_at = Column(DateTime(timezone=True), nullable=True, index=True)  # retry backoff
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+
+    # ✅ TIMINGS
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    duration_seconds = Column(Float, nullable=True)
+
+    # Relationships
+    book = relationship("Book", back_populates="jobs")
+    batch = relationship("SummaryBatch", back_populates="jobs")
+    stage_timings = relationship("StageTiming", back_populates="job", cascade="all, delete-orphan")
+
+
+# --- 3d. SUMMARY BATCHES (Many books, one request) ---
+class SummaryBatch(Base):
+    __tablename__ = "summary_batches"
+
+    batch_id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=True)
+
+    length_setting = Column(String, default="medium")
+    style_setting = Column(String, default="paragraph")
+    total = Column(Integer, default=0)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    jobs = relationship("ProcessingJob", back_populates="batch", cascade="all, delete-orphan")
+
+
+# --- 3e. STAGE TIMINGS (Where the processing time goes) ---
+class StageTiming(Base):
+    __tablename__ = "stage_timings"
+
+    timing_id = Column(Integer, primary_key=True, index=True)
+    book_id = Column(Integer, ForeignKey("books.book_id", ondelete="CASCADE"), index=True)
+    # Null for work done inside a request (e.g. upload) rather than by a job
+    job_id = Column(Integer, ForeignKey("processing_jobs.job_id", ondelete="CASCADE"), nullable=True, index=True)
+
+    # file_save, text_extraction, gemini_upload, ocr_wait, generation, postprocessing, db_commit
+    stage = Column(String, nullable=False, index=True)
+    duration_seconds = Column(Float, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    book = relationship("Book", back_populates="stage_timings")
+    job = relationship("ProcessingJob", back_populates="stage_timings")
+
+
 # --- 4. AUDIT LOGS (For "Real-time Events" Feed) ---
 class AuditLog(Base):
     __tablename__ = "audit_logs"
@@ -98,6 +284,22 @@ class AuditLog(Base):
     user = relationship("User", back_populates="audit_logs")
 
 
+# --- 4a. DAILY ROLLUPS (Admin dashboard, maintained as events happen) ---
+class DailyStat(Base):
+    __tablename__ = "daily_stats"
+
+    # One row per UTC day; counters are bumped in the same transaction as the event
+    day = Column(Date, primary_key=True)
+    new_users = Column(Integer, nullable=False, default=0)
+    books_uploaded = Column(Integer, nullable=False, default=0)
+    summaries_generated = Column(Integer, nullable=False, default=0)
+    failures = Column(Integer, nullable=False, default=0)   # summary jobs failed for good
+
+    # Book processing runs (upload ingestion, summary jobs) for the average duration
+    processing_count = Column(Integer, nullable=False, default=0)
+    processing_seconds = Column(Float, nullable=False, default=0.0)
+
+
 # --- 5. COLLABORATIVE WORKSPACES ---
 class Workspace(Base):
     __tablename__ = "workspaces"
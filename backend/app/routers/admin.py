@@ -1,86 +1,135 @@
+import os
 from fastapi import APIRouter, HTTPException, Depends, status
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from datetime import datetime, timedelta, date
-import random  # ✅ Added this import
+from sqlalchemy import func, case, text
+from datetime import timedelta
 
 from app.utils.database import get_db
-from app.models import User, Book, Summary
+from app.models import User, Book, Summary, StageTiming, ProcessingJob, AuditLog
+from app.utils.single_flight import all_stats as coalescing_stats
+from app.utils.rate_governor import all_saturation
+from app.utils.ttl_cache import TTLCache
+from app.services import analytics_rollup
+from app.services.job_queue import BOOK_STATUS_KINDS
 
 router = APIRouter(tags=["Admin Analytics"])
 
-# --- 1. OVERVIEW METRICS ---
-@router.get("/analytics/overview")
-def get_admin_overview(db: Session = Depends(get_db)):
-    total_users = db.query(User).count()
-    total_books = db.query(Book).count()
-    total_summaries = db.query(Summary).count()
-    
-    books_with_time = db.query(Book).filter(
-        Book.processing_start.isnot(None), 
-        Book.processing_end.isnot(None)
-    ).all()
-    
-    if books_with_time:
-        durations = [(b.processing_end - b.processing_start).total_seconds() for b in books_with_time]
-        avg_time = round(sum(durations) / len(durations), 2)
+# Dashboard panels are recomputed at most this often
+ADMIN_ANALYTICS_TTL_SECONDS = float(os.getenv("ADMIN_ANALYTICS_TTL_SECONDS", 30))
+analytics_cache = TTLCache("admin_analytics", ADMIN_ANALYTICS_TTL_SECONDS)
+
+# Upper bounds (seconds) and labels of the processing-time histogram
+PROCESSING_TIME_BUCKETS = [
+    (2, "< 2s"),
+    (5, "2s - 5s"),
+    (10, "5s - 10s"),
+    (30, "10s - 30s"),
+    (60, "30s - 60s"),
+    (None, "> 60s"),
+]
+
+
+def _database_size_mb(db: Session):
+    dialect = db.bind.dialect.name
+    if dialect == "postgresql":
+        size = db.execute(text("SELECT pg_database_size(current_database())")).scalar()
+    elif dialect == "sqlite":
+        pages = db.execute(text("PRAGMA page_count")).scalar()
+        page_size = db.execute(text("PRAGMA page_size")).scalar()
+        size = pages * page_size
     else:
-        avg_time = 0.0
-    
+        return None
+    return round(size / (1024 * 1024), 1)
+
+
+# --- 1. OVERVIEW METRICS ---
+def _overview(db: Session) -> dict:
+    t = analytics_rollup.totals(db)
+    total_books, total_summaries = t["books_uploaded"], t["summaries_generated"]
+    avg_time = t["processing_seconds"] / t["processing_count"] if t["processing_count"] else 0.0
     completion_rate = round((total_summaries / total_books * 100), 1) if total_books > 0 else 100.0
-    failed_count = db.query(Book).filter(Book.status == "failed").count()
 
     return {
-        "total_users": total_users,
-        "total_summaries": total_summaries, 
-        "avg_processing_time": avg_time, 
+        "total_users": t["new_users"],
+        "total_summaries": total_summaries,
+        "avg_processing_time": round(float(avg_time), 2),
         "completion_rate": completion_rate,
-        "db_size_mb": 15.4, 
-        "failed_books": failed_count
+        "db_size_mb": _database_size_mb(db),
+        "failed_books": t["failures"]
     }
 
+
+@router.get("/analytics/overview")
+def get_admin_overview(db: Session = Depends(get_db)):
+    return analytics_cache.get_or_compute("overview", lambda: _overview(db))
+
 # --- 2. TIME-SERIES GRAPHS ---
 @router.get("/analytics/daily")
 def get_daily_activity(db: Session = Depends(get_db)):
-    today = date.today()
-    days, new_users, summaries_generated = [], [], []
-    
-    for i in range(6, -1, -1):
-        d = today - timedelta(days=i)
-        days.append(d.strftime("%b %d"))
-        
-        u_count = db.query(User).filter(func.date(User.created_at) == d).count()
-        s_count = db.query(Summary).filter(func.date(Summary.created_at) == d).count()
-        
-        new_users.append(u_count)
-        summaries_generated.append(s_count)
-        
+    today = analytics_rollup.today()
+    week = [today - timedelta(days=i) for i in range(6, -1, -1)]
+    rows = analytics_rollup.daily(db, week[0], today)
+
     return {
-        "dates": days,
-        "new_users": new_users,
-        "summaries_generated": summaries_generated
+        "dates": [d.strftime("%b %d") for d in week],
+        "new_users": [rows[d].new_users if d in rows else 0 for d in week],
+        "summaries_generated": [rows[d].summaries_generated if d in rows else 0 for d in week]
     }
 
 # --- 3. DISTRIBUTIONS ---
-@router.get("/analytics/distributions")
-def get_distributions(db: Session = Depends(get_db)):
+def _processing_time_histogram(db: Session) -> list:
+    """
+    Completed book processing durations (ingest and summary jobs, the same population
+    as the processing rollups; tree builds excluded), bucketed and counted by the database.
+    """
+    bucket = case(
+        *[
+            (ProcessingJob.duration_seconds < bound, i)
+            for i, (bound, _) in enumerate(PROCESSING_TIME_BUCKETS) if bound is not None
+        ],
+        else_=len(PROCESSING_TIME_BUCKETS) - 1,
+    ).label("bucket")
+    counts = dict(
+        db.query(bucket, func.count(ProcessingJob.job_id))
+        .filter(
+            ProcessingJob.status == "completed",
+            ProcessingJob.kind.in_(BOOK_STATUS_KINDS),
+            ProcessingJob.duration_seconds.isnot(None),
+        )
+        .group_by(bucket)
+        .all()
+    )
+    return [{"name": label, "value": counts.get(i, 0)} for i, (_, label) in enumerate(PROCESSING_TIME_BUCKETS)]
+
+
+def _distributions(db: Session) -> dict:
     styles = db.query(Summary.style_setting, func.count(Summary.summary_id)).group_by(Summary.style_setting).all()
     style_data = [{"name": s[0] if s[0] else "Standard", "value": s[1]} for s in styles]
-    
+
     return {
         "summary_styles": style_data or [{"name": "No Data", "value": 1}],
-        "processing_times": [
-            {"name": "< 2s", "value": 45},
-            {"name": "2s - 5s", "value": 30},
-            {"name": "5s - 10s", "value": 15},
-            {"name": "> 10s", "value": 10},
-        ]
+        "processing_times": _processing_time_histogram(db),
     }
 
+
+@router.get("/analytics/distributions")
+def get_distributions(db: Session = Depends(get_db)):
+    return analytics_cache.get_or_compute("distributions", lambda: _distributions(db))
+
 # --- 4. USER TABLE ---
 @router.get("/analytics/users-table")
 def get_users_table(db: Session = Depends(get_db)):
-    users = db.query(User).all()
+    book_counts = (
+        db.query(Book.user_id, func.count(Book.book_id).label("books"))
+        .group_by(Book.user_id)
+        .subquery()
+    )
+    users = (
+        db.query(User, func.coalesce(book_counts.c.books, 0))
+        .outerjoin(book_counts, book_counts.c.user_id == User.user_id)
+        .order_by(User.user_id)
+        .all()
+    )
     return [
         {
             "id": u.user_id,
@@ -88,28 +137,35 @@ def get_users_table(db: Session = Depends(get_db)):
             "email": u.email,
             "role": u.role,
             "joined": u.created_at.strftime("%Y-%m-%d") if u.created_at else "N/A",
-            "books": len(u.books)
-        } for u in users
+            "books": books
+        } for u, books in users
     ]
 
-# --- 5. AUDIT LOGS (Fixes 404 Error) ---
+# --- 5. AUDIT LOGS ---
 @router.get("/analytics/audit-logs")
-def get_audit_logs(db: Session = Depends(get_db)):
-    """Returns a list of mock audit logs."""
-    actions = ["User Login", "Book Uploaded", "Summary Generated", "Settings Updated", "Exported PDF"]
-    users = ["Alice", "Bob", "Charlie", "Diana", "Admin"]
-    
-    logs = []
-    for i in range(10):
-        logs.append({
-            "id": i,
-            "action": random.choice(actions),
-            "user": random.choice(users),
-            "details": "Action performed successfully",
-            "time": (datetime.now() - timedelta(minutes=random.randint(1, 120))).strftime("%H:%M %p"),
-            "status": "Success"
-        })
-    return logs
+def get_audit_logs(limit: int = 50, db: Session = Depends(get_db)):
+    """Most recent activity, newest first."""
+    def recent():
+        rows = (
+            db.query(AuditLog, User.name)
+            .outerjoin(User, AuditLog.user_id == User.user_id)
+            .order_by(AuditLog.timestamp.desc(), AuditLog.id.desc())
+            .limit(min(max(limit, 1), 500))
+            .all()
+        )
+        return [
+            {
+                "id": log.id,
+                "action": log.action,
+                "details": log.details,
+                "user_id": log.user_id,
+                "name": name or "System",
+                "ip_address": log.ip_address,
+                "timestamp": log.timestamp,
+            }
+            for log, name in rows
+        ]
+    return analytics_cache.get_or_compute(("audit-logs", limit), recent)
 
 # --- 6. DELETE USER ---
 @router.delete("/analytics/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -118,6 +174,53 @@ def delete_user(user_id: int, db: Session = Depends(get_db)):
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
+    analytics_rollup.retract_user(db, user)
     db.delete(user)
     db.commit()
-    return None
\ No newline at end of file
+    analytics_cache.clear()
+    return None
+
+# --- 7. REQUEST COALESCING (Single-flight metrics, this process) ---
+@router.get("/analytics/coalescing")
+def get_coalescing_stats():
+    return coalescing_stats()
+
+# --- 8. PROVIDER QUOTAS (Rate governor saturation, this process) ---
+@router.get("/analytics/rate-limits")
+def get_rate_limits():
+    return all_saturation()
+
+# --- 9. STAGE TIMINGS (Which stage dominates processing latency) ---
+@router.get("/analytics/stages")
+def get_stage_timings(db: Session = Depends(get_db)):
+    rows = db.query(
+        StageTiming.stage,
+        func.count(StageTiming.timing_id),
+        func.avg(StageTiming.duration_seconds),
+        func.max(StageTiming.duration_seconds),
+        func.sum(StageTiming.duration_seconds),
+    ).group_by(StageTiming.stage).all()
+
+    grand_total = sum(r[4] or 0 for r in rows) or 1.0
+    return sorted(
+        [
+            {
+                "stage": stage,
+                "count": count,
+                "avg_seconds": round(avg or 0, 3),
+                "max_seconds": round(longest or 0, 3),
+                "share_of_time": round((total or 0) / grand_total, 3),
+            }
+            for stage, count, avg, longest, total in rows
+        ],
+        key=lambda r: r["share_of_time"],
+        reverse=True,
+    )
+
+# --- 10. ROLLUP REBUILD (Recount the daily rollups from the source tables) ---
+@router.post("/analytics/rollups/rebuild")
+def rebuild_rollups(db: Session = Depends(get_db)):
+    days = analytics_rollup.rebuild(db)
+    db.commit()
+    analytics_cache.clear()
+    return {"days": days}
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import List, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 import os
 from dotenv import load_dotenv
 
@@ -9,6 +9,8 @@ from dotenv import load_dotenv
 from app.services.agent_service import run_agent, load_book_into_agent, book_memory
 from app.utils.database import get_db
 from app.models import Book
+from app.services.sentence_index import get_sentence_view
+from app.utils.chunking import chunk_by_chars
 
 load_dotenv()
 router = APIRouter(tags=["Agent"])
@@ -18,17 +20,23 @@ class ChatRequest(BaseModel):
     book_ids: List[int]
     language: Optional[str] = "English"
 
+# Sync on purpose: agent calls wait on the Groq rate governor, so this runs in the threadpool
 @router.post("/chat")
-async def chat_with_agent(request: ChatRequest, db: Session = Depends(get_db)):
+def chat_with_agent(request: ChatRequest, db: Session = Depends(get_db)):
     try:
         # 1. Handle Book Context (If books are selected)
         if request.book_ids:
-            books = db.query(Book).filter(Book.book_id.in_(request.book_ids)).all()
+            # Texts for all selected books in one extra query
+            books = db.query(Book).options(selectinload(Book.content)).filter(Book.book_id.in_(request.book_ids)).all()
             if books:
-                # Combine text from all selected books
-                full_text = "\n".join([b.extracted_text for b in books if b.extracted_text])
+                # Chunk each selected book along its stored sentence offsets
+                chunks = []
+                for b in books:
+                    if b.extracted_text:
+                        view = get_sentence_view(db, b)
+                        chunks.extend(chunk_by_chars(view.text, 1000, spans=view.spans()).texts())
                 # ✅ Load into the Agent's Vector Memory
-                load_book_into_agent(full_text)
+                load_book_into_agent(chunks=chunks)
             else:
                 book_memory.has_book = False
         else:
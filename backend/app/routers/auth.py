@@ -15,6 +15,8 @@ from sqlalchemy import func
 # Internal project imports
 from app.utils.database import get_db
 from app.models import User
+from app.services.audit_log import log_action
+from app.services import analytics_rollup
 
 # =========================================
 # ✅ ENVIRONMENT & PATH CONFIGURATION
@@ -113,6 +115,8 @@ def login(user: UserLogin, db: Session = Depends(get_db)):
         )
 
     access_token = create_access_token(data={"sub": str(db_user.user_id)})
+    log_action(db, db_user.user_id, "LOGIN", f"{db_user.name} signed in")
+    db.commit()
     return {
         "access_token": access_token, 
         "token_type": "bearer", 
@@ -138,6 +142,7 @@ def register(user: UserRegister, db: Session = Depends(get_db)):
         role="user"
     )
     db.add(new_user)
+    analytics_rollup.bump(db, new_users=1)
     db.commit()
     db.refresh(new_user)
     
@@ -159,6 +164,7 @@ def forgot_password(req: ForgotPasswordRequest, db: Session = Depends(get_db)):
     target_user = users[-1] 
     if len(users) > 1:
         for u in users[:-1]:
+            analytics_rollup.retract_user(db, u)
             db.delete(u)
         db.commit()
 
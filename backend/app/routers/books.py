@@ -1,17 +1,21 @@
 from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
-import shutil
 import os
-import fitz  # PyMuPDF for PDF parsing
 
 from app.utils.database import get_db
-from app.models import Book, User
+from app.models import Book, BookContent, User
 from app.routers.auth import get_current_user 
+from app.services import job_queue
+from app.services.audit_log import log_action
+from app.services.upload_store import save_upload, UploadRejected, UploadLimitRoute
+from app.services import analytics_rollup
+from app.utils.stage_timer import recording, stage
 
-router = APIRouter(tags=["Books"])
+# Oversized uploads are refused from their Content-Length, before the body is read
+router = APIRouter(tags=["Books"], route_class=UploadLimitRoute)
 
 class BookResponse(BaseModel):
     book_id: int
@@ -22,6 +26,7 @@ class BookResponse(BaseModel):
     created_at: datetime
     word_count: int
     char_count: int
+    language: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -34,54 +39,59 @@ async def upload_book(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    # 1. Setup directory and save the file
-    upload_dir = "uploads"
-    os.makedirs(upload_dir, exist_ok=True)
-    file_path = os.path.join(upload_dir, file.filename)
+    with recording() as recorder:
+        # 1. Copy to content-addressed storage (type and size checked while copying)
+        try:
+            with stage("file_save"):
+                stored = await save_upload(file)
+        except UploadRejected as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e))
 
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+        # 2. Save the book and queue its ingestion (extraction, counts, language, sentence index).
+        #    The response goes out now; Book.status moves uploaded -> extracting -> ready | failed.
+        new_book = Book(
+            title=title,
+            author=author,
+            user_id=current_user.user_id,
+            file_path=stored.file_path,
+            status="uploaded",
+        )
+        with stage("db_commit"):
+            db.add(new_book)
+            db.flush()
+            job_queue.enqueue(db, new_book, kind="ingest", priority=job_queue.INGEST_PRIORITY)
+            log_action(db, current_user.user_id, "UPLOAD", f"Uploaded '{title}' ({stored.size // 1024} KB)")
+            analytics_rollup.bump(db, books_uploaded=1)
+            db.commit()
 
-    # 2. Extract Text and Calculate Counts Immediately
-    extracted_text = ""
-    try:
-        if file_path.endswith(".pdf"):
-            # Open PDF and extract text from all pages
-            doc = fitz.open(file_path)
-            extracted_text = "\n".join([page.get_text() for page in doc])
-            doc.close()
-        elif file_path.endswith(".txt"):
-            # Read plain text files
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                extracted_text = f.read()
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error parsing file: {str(e)}")
-
-    # 3. Calculate metrics
-    word_count = len(extracted_text.split())
-    char_count = len(extracted_text)
-
-    # 4. Save to Database with real values
-    new_book = Book(
-        title=title,
-        author=author,
-        user_id=current_user.user_id,
-        file_path=file_path,
-        extracted_text=extracted_text, # Save text for summarizer
-        status="completed",            # Mark as ready immediately
-        word_count=word_count,
-        char_count=char_count
-    )
-
-    db.add(new_book)
+    job_queue.record_stage_timings(db, new_book.book_id, recorder.stages)
     db.commit()
     db.refresh(new_book)
-
-    return new_book # Frontend now gets word_count > 0
+    return new_book
 
 @router.get("/", response_model=List[BookResponse])
 def get_books(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return db.query(Book).filter(Book.user_id == current_user.user_id).all()
+    # Languages live on BookContent: fetch them in one query, without the compressed text
+    return (
+        db.query(Book)
+        .options(selectinload(Book.content).load_only(BookContent.language))
+        .filter(Book.user_id == current_user.user_id)
+        .all()
+    )
+
+@router.get("/{book_id}", response_model=BookResponse)
+def get_book(book_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Poll this after an upload: status goes uploaded -> extracting -> ready (or failed)."""
+    # Polled every few seconds: read the language without loading the compressed text
+    book = (
+        db.query(Book)
+        .options(selectinload(Book.content).load_only(BookContent.language))
+        .filter(Book.book_id == book_id, Book.user_id == current_user.user_id)
+        .first()
+    )
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
+    return book
 
 @router.delete("/{book_id}")
 def delete_book(book_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
@@ -89,10 +99,12 @@ def delete_book(book_id: int, db: Session = Depends(get_db), current_user: User
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
     
-    # Remove file from disk if it exists
-    if os.path.exists(book.file_path):
+    # Remove file from disk unless another book was uploaded with the same content
+    shared = db.query(Book.book_id).filter(Book.file_path == book.file_path, Book.book_id != book.book_id).first()
+    if not shared and os.path.exists(book.file_path):
         os.remove(book.file_path)
 
+    analytics_rollup.retract_book(db, book)
     db.delete(book)
     db.commit()
     return {"message": "Book deleted successfully"}
\ No newline at end of file
@@ -5,12 +5,14 @@ from typing import List
 import json
 
 # ✅ CORRECT IMPORTS FOR NEW LANGCHAIN
-from langchain_groq import ChatGroq
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
 
 from app.utils.database import get_db
 from app.models import Book
+from app.services.sentence_index import get_sentence_view
+from app.utils.single_flight import get_group
+from app.utils.rate_governor import governed_chat_groq
 
 router = APIRouter(tags=["KnowledgeGraph"])
 
@@ -32,8 +34,10 @@ class GraphData(BaseModel):
 
 # --- AI SETUP ---
 # Ensure GROQ_API_KEY is set in your .env file
-llm = ChatGroq(model_name="llama-3.3-70b-versatile", temperature=0.3)
+llm = governed_chat_groq("llama-3.3-70b-versatile", temperature=0.3)
 parser = PydanticOutputParser(pydantic_object=GraphData)
+# Identical concurrent requests share one LLM call
+graph_flight = get_group("graph")
 
 @router.get("/generate/{book_id}")
 def generate_graph(book_id: int, type: str = "network", db: Session = Depends(get_db)):
@@ -41,8 +45,8 @@ def generate_graph(book_id: int, type: str = "network", db: Session = Depends(ge
     if not book or not book.extracted_text:
         raise HTTPException(404, "Book not found or empty")
 
-    # Limit text to fit context window (approx 4000 chars)
-    text_sample = book.extracted_text[:4000]
+    # Limit text to fit context window (approx 4000 chars, whole sentences)
+    text_sample = get_sentence_view(db, book).window(4000)
 
     # Define prompt based on visual type
     if type == "mindmap":
@@ -76,8 +80,10 @@ def generate_graph(book_id: int, type: str = "network", db: Session = Depends(ge
 
     try:
         chain = prompt | llm | parser
-        result = chain.invoke({"text": text_sample, "instruction": instruction})
-        return result
+        return graph_flight.do(
+            (book_id, "mindmap" if type == "mindmap" else "network"),
+            lambda: chain.invoke({"text": text_sample, "instruction": instruction}),
+        )
     except Exception as e:
         print(f"Graph Gen Error: {e}")
         # Return empty structure on failure so frontend doesn't crash
@@ -9,8 +9,9 @@ router = APIRouter(tags=["Meeting Summarizer"])
 UPLOAD_DIR = "uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+# Sync: transcription and summary block (file I/O, rate governor), so run in the threadpool
 @router.post("/process-meeting")
-async def summarize_meeting(file: UploadFile = File(...)):
+def summarize_meeting(file: UploadFile = File(...)):
     # 1. Save uploaded file temporarily
     file_path = os.path.join(UPLOAD_DIR, file.filename)
     try:
@@ -5,12 +5,14 @@ from typing import List
 import os
 
 # ✅ Correct Imports for LangChain v0.1+
-from langchain_groq import ChatGroq
 from langchain_core.output_parsers import PydanticOutputParser
 from langchain_core.prompts import PromptTemplate
 
 from app.utils.database import get_db
 from app.models import Book
+from app.services.sentence_index import get_sentence_view
+from app.utils.single_flight import get_group
+from app.utils.rate_governor import governed_chat_groq
 
 router = APIRouter(tags=["Quiz"])
 
@@ -26,8 +28,10 @@ class QuizList(BaseModel):
 
 # --- 2. SETUP AI ---
 # Ensure GROQ_API_KEY is in your .env file
-llm = ChatGroq(model_name="llama-3.3-70b-versatile", temperature=0.3)
+llm = governed_chat_groq("llama-3.3-70b-versatile", temperature=0.3)
 parser = PydanticOutputParser(pydantic_object=QuizList)
+# Identical concurrent requests (double-clicks, classmates) share one LLM call
+quiz_flight = get_group("quiz")
 
 # --- 3. GENERATE ENDPOINT ---
 @router.get("/generate/{book_id}")
@@ -37,8 +41,8 @@ def generate_quiz(book_id: int, lang: str = "en-IN", db: Session = Depends(get_d
     if not book or not book.extracted_text:
         raise HTTPException(404, "Book text not found")
 
-    # Limit text to avoid token limits (approx 3000 chars)
-    context_text = book.extracted_text[:3000]
+    # Limit text to avoid token limits (approx 3000 chars, whole sentences)
+    context_text = get_sentence_view(db, book).window(3000)
 
     # Map Language Codes to Names for better prompting
     lang_map = {
@@ -71,8 +75,10 @@ def generate_quiz(book_id: int, lang: str = "en-IN", db: Session = Depends(get_d
     try:
         # Invoke Chain
         chain = prompt | llm | parser
-        result = chain.invoke({"text": context_text, "language": target_language})
-        return result
+        return quiz_flight.do(
+            (book_id, target_language),
+            lambda: chain.invoke({"text": context_text, "language": target_language}),
+        )
     except Exception as e:
         print(f"Quiz Generation Error: {e}")
         raise HTTPException(500, f"Failed to generate quiz: {str(e)}")
\ No newline at end of file
@@ -1,18 +1,34 @@
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Response
+from fastapi import APIRouter, HTTPException, Depends, Response
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
 from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime, timezone
 import logging
+import json
 
 from app.utils.database import get_db, SessionLocal
-from app.models import Book, Summary
+from app.models import Book, Summary, SummaryBatch
+from app.services import job_queue
+from app.services.summary_cache import summary_cache
+from app.services.summary_tree import get_tree, render_summary, describe_tree
 from app.services.summarizer_service import summarizer_service
+from app.services.summary_tasks import lookup_cached_summary, save_summary_result
+from app.services.extractive_summarizer import summarize_extractive
+from app.services.sentence_index import get_sentence_view
+from app.services.audit_log import log_action
+from app.services import analytics_rollup
+from app.utils.postprocessing import extract_local_keywords
+from app.utils.single_flight import get_group
 from app.utils.export_utils import generate_txt_content, generate_pdf_content
 
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["Summarizer"])
 
+# Summary requests coalesce on the durable queue: duplicates join the active job
+summary_flight = get_group("summary")
+
 
 # =========================
 # ✅ SCHEMA
@@ -21,95 +37,265 @@ class GenerateRequest(BaseModel):
     book_id: int
     summary_length: str = "medium"
     summary_format: str = "paragraph"
+    engine: str = "gemini"  # "gemini" (default) or "fast" (local extractive, no API call)
 
 
-# =========================
-# ✅ BACKGROUND WORKER
-# =========================
-def run_summarization_task(book_id: int, length: str, format: str):
-    logger.info(f"🏗️ [Background] Processing Book {book_id}...")
-    db = SessionLocal()
-
-    try:
-        # 1) Fetch book
-        book = db.query(Book).filter(Book.book_id == book_id).first()
-        if not book:
-            logger.error(f"❌ Book {book_id} not found.")
-            return
-
-        if not book.file_path:
-            logger.error(f"❌ Book {book_id} missing file_path.")
-            book.status = "failed"
-            db.commit()
-            return
-
-        # 2) Call summarizer service (✅ uses file_path)
-        result = summarizer_service.generate_summary(
-            file_path=book.file_path,
-            length_option=length,
-            style=format
-        )
-
-        summary_text = result.get("summary_text", "")
-        keywords_list = result.get("keywords", []) or []
-
-        # 3) Save summary
-        new_summary = Summary(
-            book_id=book_id,
-            user_id=book.user_id,
-            summary_text=summary_text,
-            keywords=",".join(keywords_list),
-            length_setting=length,
-            style_setting=format
-        )
-        db.add(new_summary)
+class BatchRequest(BaseModel):
+    book_ids: List[int]
+    summary_length: str = "medium"
+    summary_format: str = "paragraph"
 
-        # 4) Update book status
-        book.status = "completed"
-        db.commit()
-        logger.info(f"✅ [Background] Book {book_id} Summarization Complete.")
 
-    except Exception as e:
-        logger.error(f"❌ [Background] FAILED: {e}", exc_info=True)
-        try:
-            book = db.query(Book).filter(Book.book_id == book_id).first()
-            if book:
-                book.status = "failed"
-                db.commit()
-        except Exception:
-            pass
-    finally:
-        db.close()
+# =========================
+# ✅ HELPERS
+# =========================
+def _tree_result(tree, length: str, style: str) -> dict:
+    """Renders a stored summary tree into the same shape as a generation result."""
+    text = render_summary(tree.levels, length, style)
+    keywords = [k.strip() for k in extract_local_keywords(text).split(",") if k.strip()]
+    return {"summary_text": text, "keywords": keywords, "status": "completed", "cached": True}
 
 
 # =========================
 # ✅ ROUTES
 # =========================
 @router.post("/generate")
-def request_summary(
-    req: GenerateRequest,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
-):
+def request_summary(req: GenerateRequest, db: Session = Depends(get_db)):
     book = db.query(Book).filter(Book.book_id == req.book_id).first()
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
 
+    # Local extractive engine: instant, offline, no provider quota
+    if req.engine.lower() == "fast" or req.summary_length.lower() == "fast":
+        if not book.extracted_text:
+            raise HTTPException(status_code=400, detail="Book has no extracted text")
+        length = "medium" if req.summary_length.lower() == "fast" else req.summary_length
+        spans = get_sentence_view(db, book).spans()
+        result = summarize_extractive(book.extracted_text, length, req.summary_format, spans)
+        save_summary_result(db, book, req.summary_length, req.summary_format, result)
+        return {"message": "Summary generated locally", "status": "completed", "source": "fast"}
+
+    # Fast path: any length/style is a reformat of the stored summary tree
+    tree = get_tree(db, book.book_id)
+    if tree:
+        result = _tree_result(tree, req.summary_length, req.summary_format)
+        save_summary_result(db, book, req.summary_length, req.summary_format, result)
+        return {"message": "Summary served from summary tree", "status": "completed", "source": "tree"}
+
+    # Same book + settings already queued or running: share that job
+    active = job_queue.find_active(db, book.book_id, "summary", req.summary_length, req.summary_format)
+    if active:
+        summary_flight.record_coalesced()
+        return {"message": "Summary generation already in progress", "status": "processing",
+                "job_id": active.job_id, "coalesced": True}
+
+    # Persisted job: survives restarts and is picked up by the worker pool
+    summary_flight.record_execution()
+    job = job_queue.enqueue(db, book, req.summary_length, req.summary_format)
     book.status = "processing"
     db.commit()
 
-    background_tasks.add_task(
-        run_summarization_task,
-        req.book_id,
-        req.summary_length,
-        req.summary_format
+    return {"message": "Summary generation started", "status": "processing", "job_id": job.job_id}
+
+
+@router.post("/batch")
+def request_batch_summary(req: BatchRequest, db: Session = Depends(get_db)):
+    """
+    Summarizes many books through the shared job queue: provider concurrency is
+    enforced by the workers, and smaller books are scheduled first.
+    """
+    book_ids = list(dict.fromkeys(req.book_ids))
+    if not book_ids:
+        raise HTTPException(status_code=400, detail="No books given")
+
+    books = db.query(Book).filter(Book.book_id.in_(book_ids)).all()
+    missing = sorted(set(book_ids) - {b.book_id for b in books})
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Books not found: {missing}")
+
+    batch = SummaryBatch(
+        user_id=books[0].user_id,
+        length_setting=req.summary_length,
+        style_setting=req.summary_format,
+        total=len(books),
     )
+    db.add(batch)
+    db.flush()
+
+    queued = from_tree = 0
+    for book in sorted(books, key=lambda b: b.word_count or 0):
+        # Small books first: a batch job's priority is its size (interactive jobs are 0)
+        job = job_queue.enqueue(
+            db, book, req.summary_length, req.summary_format,
+            batch_id=batch.batch_id, priority=max(book.word_count or 0, 1),
+        )
+        tree = get_tree(db, book.book_id)
+        if tree:
+            job.status = "completed"
+            job.started_at = job.finished_at = datetime.now(timezone.utc)
+            result = _tree_result(tree, req.summary_length, req.summary_format)
+            save_summary_result(db, book, req.summary_length, req.summary_format, result)
+            from_tree += 1
+        else:
+            book.status = "processing"
+            queued += 1
+    db.commit()
+
+    return {
+        "message": "Batch summary started",
+        "batch_id": batch.batch_id,
+        "total": batch.total,
+        "queued": queued,
+        "from_tree": from_tree,
+    }
 
-    return {"message": "Summary generation started", "status": "processing"}
+
+@router.get("/batch/{batch_id}")
+def get_batch_summary_status(batch_id: int, db: Session = Depends(get_db)):
+    batch = db.get(SummaryBatch, batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return job_queue.batch_progress(db, batch)
+
+
+@router.get("/cache/stats")
+def get_cache_stats(db: Session = Depends(get_db)):
+    return summary_cache.stats(db)
+
+
+@router.post("/{book_id}/tree")
+def request_summary_tree(book_id: int, db: Session = Depends(get_db)):
+    book = db.query(Book).filter(Book.book_id == book_id).first()
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
+    if not book.extracted_text:
+        raise HTTPException(status_code=400, detail="Book has no extracted text")
+
+    active = job_queue.find_active(db, book.book_id, "tree")
+    if active:
+        return {"message": "Summary tree build already in progress", "status": active.status,
+                "job_id": active.job_id, "coalesced": True}
+
+    job = job_queue.enqueue(db, book, kind="tree")
+    db.commit()
+    return {"message": "Summary tree build started", "status": "queued", "job_id": job.job_id}
+
+
+@router.get("/{book_id}/tree")
+def get_summary_tree(book_id: int, db: Session = Depends(get_db)):
+    tree = get_tree(db, book_id)
+    if not tree:
+        raise HTTPException(status_code=404, detail="Summary tree not built yet")
+    return describe_tree(tree)
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.get("/{book_id}/stream")
+def stream_summary(
+    book_id: int,
+    length: str = "medium",
+    format: str = "paragraph",
+    db: Session = Depends(get_db)
+):
+    """
+    Server-Sent Events: progress (uploaded, ocr_active), token chunks as Gemini
+    writes them, then a final 'done' event. The result is persisted as a Summary row.
+    """
+    book = db.query(Book).filter(Book.book_id == book_id).first()
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
+
+    def event_stream():
+        # The request-scoped session is closed once streaming starts; use our own.
+        stream_db = SessionLocal()
+        previous_status = None
+        try:
+            stream_book = stream_db.get(Book, book_id)
+            yield _sse("progress", {"stage": "started", "book_id": book_id})
+
+            # 1) Tree / cache fast paths: the whole text arrives as one token event
+            tree = get_tree(stream_db, book_id)
+            lookup = None
+            if tree:
+                result = _tree_result(tree, length, format)
+            else:
+                lookup = lookup_cached_summary(stream_db, stream_book, length, format)
+                result = lookup.result
+
+            if result:
+                yield _sse("token", {"text": result["summary_text"], "chunk": 1})
+            else:
+                # 2) Live generation
+                previous_status = stream_book.status
+                stream_book.status = "processing"
+                stream_db.commit()
+                for event in summarizer_service.stream_summary(stream_book.file_path, length, format):
+                    kind = event.pop("event")
+                    if kind == "done":
+                        result = event
+                    else:
+                        yield _sse(kind, event)
+
+            summary = save_summary_result(stream_db, stream_book, length, format, result, lookup)
+            yield _sse("done", {
+                "status": "completed",
+                "summary_id": summary.summary_id,
+                "summary_text": summary.summary_text,
+                "length": length,
+                "style": format
+            })
+
+        except Exception as e:
+            logger.error(f"❌ [Stream] Book {book_id} failed: {e}", exc_info=True)
+            stream_db.rollback()
+            failed_book = stream_db.get(Book, book_id)
+            if failed_book:
+                failed_book.status = "failed"
+                stream_db.commit()
+            yield _sse("error", {"status": "failed", "message": str(e)})
+        except GeneratorExit:
+            # Client went away mid-stream: nothing is saved, so don't leave the book "processing"
+            logger.warning(f"⚠️ [Stream] Client disconnected from book {book_id} before completion")
+            stream_db.rollback()
+            if previous_status is not None:
+                abandoned_book = stream_db.get(Book, book_id)
+                if abandoned_book and abandoned_book.status == "processing":
+                    abandoned_book.status = previous_status
+                    stream_db.commit()
+            raise
+        finally:
+            stream_db.close()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.get("/{book_id}")
-def get_latest_summary(book_id: int, db: Session = Depends(get_db)):
+def get_latest_summary(
+    book_id: int,
+    length: Optional[str] = None,
+    style: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    # Any granularity straight from stored tree nodes (no LLM call)
+    if length or style:
+        tree = get_tree(db, book_id)
+        if tree:
+            return {
+                "status": "completed",
+                "summary_text": render_summary(tree.levels, length or "medium", style or "paragraph"),
+                "created_at": tree.created_at,
+                "length": length or "medium",
+                "style": style or "paragraph",
+                "source": "tree"
+            }
+
     summary = (
         db.query(Summary)
         .filter(Summary.book_id == book_id)
@@ -130,14 +316,18 @@ def get_latest_summary(book_id: int, db: Session = Depends(get_db)):
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
 
+    job = job_queue.latest_job(db, book_id)
+    job_info = job_queue.job_to_dict(job) if job else None
+
     if book.status == "processing":
-        return {"status": "processing", "summary_text": "", "message": "AI is working..."}
+        return {"status": "processing", "summary_text": "", "message": "AI is working...", "job": job_info}
 
     if book.status == "failed":
         return {
             "status": "failed",
             "summary_text": "Generation Failed. Check backend logs.",
-            "message": "Error during generation"
+            "message": "Error during generation",
+            "job": job_info
         }
 
     raise HTTPException(status_code=404, detail="Summary not found.")
@@ -159,6 +349,9 @@ def export_summary(book_id: int, format: str = "txt", db: Session = Depends(get_
         raise HTTPException(status_code=404, detail="Book not found")
 
     date_str = summary.created_at.strftime("%Y-%m-%d") if summary.created_at else "Unknown"
+    if format.lower() in ("txt", "pdf"):
+        log_action(db, book.user_id, "EXPORT", f"Exported '{book.title}' as {format.upper()}")
+        db.commit()
 
     if format.lower() == "txt":
         content = generate_txt_content(book.title, book.author, date_str, summary.summary_text)
@@ -199,6 +392,7 @@ def delete_summary(summary_id: int, db: Session = Depends(get_db)):
     if not summary:
         raise HTTPException(status_code=404, detail="Summary not found")
 
+    analytics_rollup.retract_summary(db, summary)
     db.delete(summary)
     db.commit()
     return {"message": "Deleted"}
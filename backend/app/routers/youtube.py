@@ -8,8 +8,9 @@ router = APIRouter(tags=["YouTube Summary"])
 class VideoRequest(BaseModel):
     url: str
 
+# Sync: the Gemini call may wait for quota; a threadpool worker waits instead of the event loop
 @router.post("/summarize")
-async def summarize_video(request: VideoRequest):
+def summarize_video(request: VideoRequest):
     try:
         transcript, video_id = extract_transcript_details(request.url)
         summary = generate_gemini_content(transcript)
@@ -5,6 +5,8 @@ from langgraph.graph import StateGraph, END
 from langchain_core.messages import HumanMessage, AIMessage, BaseMessage
 from langchain_core.documents import Document
 
+from app.utils.chunking import chunk_by_chars
+
 # Load Environment Variables
 load_dotenv()
 
@@ -21,15 +23,15 @@ _tavily_tool = None
 def get_llm():
     global _llm
     if _llm is None:
-        from langchain_groq import ChatGroq
-        _llm = ChatGroq(model="llama-3.3-70b-versatile", api_key=GROQ_API_KEY)
+        from app.utils.rate_governor import governed_chat_groq
+        _llm = governed_chat_groq("llama-3.3-70b-versatile", api_key=GROQ_API_KEY)
     return _llm
 
 def get_embeddings():
     global _embeddings
     if _embeddings is None:
-        from langchain_huggingface import HuggingFaceEmbeddings
-        _embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+        from app.services.providers import embeddings
+        _embeddings = embeddings("sentence-transformers/all-MiniLM-L6-v2")
     return _embeddings
 
 def get_tavily():
@@ -161,8 +163,9 @@ def run_agent(user_query: str, history: list = []):
     result = app_graph.invoke(inputs)
     return result["final_answer"]
 
-def load_book_into_agent(full_text: str):
-    if not full_text:
-        return
-    chunks = [full_text[i:i+1000] for i in range(0, len(full_text), 1000)]
+def load_book_into_agent(full_text: str = "", chunks: List[str] = None):
+    if chunks is None:
+        if not full_text:
+            return
+        chunks = chunk_by_chars(full_text, 1000).texts()
     book_memory.ingest_book(chunks)
@@ -0,0 +1,169 @@
+import logging
+from datetime import date, datetime, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models import DailyStat, User, Book, Summary, ProcessingJob
+
+logger = logging.getLogger(__name__)
+
+# =========================================
+# ✅ CONFIGURATION
+# =========================================
+COUNTERS = (
+    "new_users",
+    "books_uploaded",
+    "summaries_generated",
+    "failures",
+    "processing_count",
+    "processing_seconds",
+)
+
+# Dialects with a native INSERT ... ON CONFLICT DO UPDATE
+_UPSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def _as_day(value) -> date:
+    """Rollup day for a timestamp; naive values are UTC (SQLite's CURRENT_TIMESTAMP)."""
+    if value is None:
+        return today()
+    if isinstance(value, str):  # func.date() on SQLite
+        return date.fromisoformat(value[:10])
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value.date()
+    return value
+
+
+# =========================================
+# ✅ INCREMENTAL UPDATES (caller commits)
+# =========================================
+def bump(db: Session, when=None, **deltas) -> None:
+    """
+    Adds `deltas` to the counters of the day containing `when` (default: now).
+    Runs in the caller's transaction, so the rollup commits or rolls back with the event.
+    """
+    deltas = {k: v for k, v in deltas.items() if v}
+    unknown = set(deltas) - set(COUNTERS)
+    if unknown:
+        raise ValueError(f"Unknown rollup counters: {sorted(unknown)}")
+    if not deltas:
+        return
+    day = _as_day(when)
+
+    insert = _UPSERTS.get(db.bind.dialect.name)
+    if insert is not None:
+        stmt = insert(DailyStat).values(day=day, **deltas)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[DailyStat.day],
+            set_={k: getattr(DailyStat, k) + stmt.excluded[k] for k in deltas},
+        ))
+        return
+
+    # Other dialects: update in place, insert when the day is new
+    updated = (
+        db.query(DailyStat)
+        .filter(DailyStat.day == day)
+        .update({getattr(DailyStat, k): getattr(DailyStat, k) + v for k, v in deltas.items()}, synchronize_session=False)
+    )
+    if not updated:
+        db.add(DailyStat(day=day, **deltas))
+        db.flush()
+
+
+def record_processing(db: Session, when: Optional[datetime], seconds: Optional[float]) -> None:
+    """One finished processing job (ingestion or summary) that ran for `seconds`."""
+    if when is None or seconds is None:
+        return
+    bump(db, when, processing_count=1, processing_seconds=round(max(seconds, 0.0), 3))
+
+
+def _retract(db: Session, column, counter: str, *criteria) -> None:
+    """Takes rows about to be deleted back out of the day they were counted on."""
+    rows = db.query(func.date(column), func.count()).filter(*criteria).group_by(func.date(column)).all()
+    for day, count in rows:
+        bump(db, _as_day(day), **{counter: -count})
+
+
+def retract_summary(db: Session, summary: Summary) -> None:
+    bump(db, summary.created_at, summaries_generated=-1)
+
+
+def retract_book(db: Session, book: Book) -> None:
+    """Call before deleting `book`; its summaries go with it (cascade)."""
+    bump(db, book.created_at, books_uploaded=-1)
+    _retract(db, Summary.created_at, "summaries_generated", Summary.book_id == book.book_id)
+
+
+def retract_user(db: Session, user: User) -> None:
+    """Call before deleting `user`; their books and summaries go with them (cascade)."""
+    bump(db, user.created_at, new_users=-1)
+    _retract(db, Book.created_at, "books_uploaded", Book.user_id == user.user_id)
+    _retract(db, Summary.created_at, "summaries_generated", Summary.user_id == user.user_id)
+
+
+# =========================================
+# ✅ READS (a handful of rows, whatever the table sizes)
+# =========================================
+def totals(db: Session) -> Dict[str, float]:
+    row = db.query(*[func.coalesce(func.sum(getattr(DailyStat, k)), 0) for k in COUNTERS]).one()
+    return dict(zip(COUNTERS, row))
+
+
+def daily(db: Session, start: date, end: date) -> Dict[date, DailyStat]:
+    rows = db.query(DailyStat).filter(DailyStat.day >= start, DailyStat.day <= end).all()
+    return {row.day: row for row in rows}
+
+
+# =========================================
+# ✅ BACKFILL (existing data, or after manual DB surgery)
+# =========================================
+def rebuild(db: Session) -> int:
+    """Recomputes every rollup row from the source tables. The caller commits."""
+    # Imported here: job_queue bumps rollups itself
+    from app.services.job_queue import BOOK_STATUS_KINDS
+
+    finished_runs = [
+        ProcessingJob.kind.in_(BOOK_STATUS_KINDS),
+        ProcessingJob.status.in_(("completed", "failed")),
+        ProcessingJob.duration_seconds.isnot(None),
+    ]
+    sources = [
+        ("new_users", User.created_at, func.count(User.user_id), []),
+        ("books_uploaded", Book.created_at, func.count(Book.book_id), []),
+        ("summaries_generated", Summary.created_at, func.count(Summary.summary_id), []),
+        ("failures", ProcessingJob.finished_at, func.count(ProcessingJob.job_id),
+         [ProcessingJob.status == "failed", ProcessingJob.kind.in_(BOOK_STATUS_KINDS)]),
+        # One run per finished job, exactly as execute_job records them
+        ("processing_count", ProcessingJob.finished_at, func.count(ProcessingJob.job_id), finished_runs),
+        ("processing_seconds", ProcessingJob.finished_at, func.sum(ProcessingJob.duration_seconds), finished_runs),
+    ]
+
+    days: Dict[date, Dict[str, float]] = {}
+    for counter, column, aggregate, criteria in sources:
+        rows = db.query(func.date(column), aggregate).filter(column.isnot(None), *criteria).group_by(func.date(column)).all()
+        for day, value in rows:
+            days.setdefault(_as_day(day), {})[counter] = value or 0
+
+    db.query(DailyStat).delete(synchronize_session=False)
+    for day, counters in days.items():
+        db.add(DailyStat(day=day, **{k: counters.get(k, 0) for k in COUNTERS}))
+    db.flush()
+    logger.info(f"📊 Rebuilt analytics rollups for {len(days)} days.")
+    return len(days)
+
+
+def ensure_backfilled(db: Session) -> None:
+    """First start after the rollup tables were added: seed them from existing data."""
+    if db.query(DailyStat.day).first() is not None or db.query(User.user_id).first() is None:
+        return
+    rebuild(db)
+    db.commit()
@@ -0,0 +1,18 @@
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.models import AuditLog
+
+
+def log_action(
+    db: Session,
+    user_id: Optional[int],
+    action: str,
+    details: str = None,
+    ip_address: str = None,
+) -> AuditLog:
+    """Adds an audit row for the admin activity feed. The caller commits."""
+    entry = AuditLog(user_id=user_id, action=action, details=(details or "")[:500], ip_address=ip_address)
+    db.add(entry)
+    return entry
@@ -0,0 +1,53 @@
+import logging
+import threading
+
+from sqlalchemy.orm import Session, undefer
+
+from app.models import Book
+from app.utils.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_BATCH_SIZE = 20
+
+
+def migrate_legacy_texts(db: Session, batch_size: int = MIGRATION_BATCH_SIZE) -> int:
+    """
+    Moves text still stored on the books row into compressed BookContent rows,
+    a batch per commit so the big rows never pile up in memory.
+    """
+    moved = 0
+    while True:
+        books = (
+            db.query(Book)
+            .filter(Book.legacy_text.isnot(None))
+            .options(undefer(Book.legacy_text))
+            .limit(batch_size)
+            .all()
+        )
+        if not books:
+            break
+        for book in books:
+            book.extracted_text = book.legacy_text  # compresses into BookContent, clears the column
+        db.commit()
+        db.expunge_all()
+        moved += len(books)
+    if moved:
+        logger.info(f"🗜️ Moved the text of {moved} books into compressed storage.")
+    return moved
+
+
+def start_legacy_text_migration() -> threading.Thread:
+    """Runs migrate_legacy_texts off the startup path; reads work throughout (legacy fallback)."""
+    def run():
+        db = SessionLocal()
+        try:
+            migrate_legacy_texts(db)
+        except Exception as e:
+            logger.error(f"❌ Legacy text migration failed: {e}", exc_info=True)
+        finally:
+            db.close()
+
+    thread = threading.Thread(target=run, name="legacy-text-migration", daemon=True)
+    thread.start()
+    return thread
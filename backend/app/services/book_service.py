@@ -1,16 +1,24 @@
 import os
 import time
-import fitz  # PyMuPDF
 import docx
 from typing import List
 
-import google.generativeai as genai
 
 from pptx import Presentation
 from PIL import Image, ImageDraw, ImageFont
 
+from app.services.providers import legacy_genai
+from app.services.pdf_extractor import extract_pdf_text
+from app.utils.chunking import chunk_by_words
+from app.utils.rate_governor import governed
+
 
 class BookService:
+    @property
+    def genai(self):
+        # google.generativeai, or its stand-in under PROVIDER_MODE=fake
+        return legacy_genai()
+
     # ------------------------------------------------------------------
     # MAIN ENTRY
     # ------------------------------------------------------------------
@@ -41,14 +49,7 @@ class BookService:
     # BASIC FILE TYPES
     # ------------------------------------------------------------------
     def _extract_pdf(self, path: str) -> str:
-        try:
-            doc = fitz.open(path)
-            text = ""
-            for page in doc:
-                text += page.get_text()
-            return text
-        except Exception as e:
-            raise ValueError(f"Error reading PDF: {e}")
+        return extract_pdf_text(path)
 
     def _extract_docx(self, path: str) -> str:
         try:
@@ -79,20 +80,20 @@ class BookService:
             raise ValueError("No slides found in PPT")
 
         # Upload slides to Gemini
-        uploaded_files = [genai.upload_file(path=img) for img in slide_images]
+        uploaded_files = [self.genai.upload_file(path=img) for img in slide_images]
 
         # ✅ CRITICAL: wait for OCR readiness
         self.wait_for_files_active(uploaded_files)
 
         # Gemini Vision OCR + summarization
-        model = genai.GenerativeModel("gemini-1.5-flash")
-        response = model.generate_content(
-            [
-                "Extract ALL readable text from these slides accurately. "
-                "Do not summarize yet. Preserve headings and bullet points.",
-                *uploaded_files,
-            ]
+        model = self.genai.GenerativeModel("gemini-1.5-flash")
+        prompt = (
+            "Extract ALL readable text from these slides accurately. "
+            "Do not summarize yet. Preserve headings and bullet points."
         )
+        with governed("gemini", "gemini-1.5-flash", prompt) as usage:
+            response = model.generate_content([prompt, *uploaded_files])
+            usage.tokens = getattr(getattr(response, "usage_metadata", None), "total_token_count", None)
 
         return response.text or ""
 
@@ -107,7 +108,7 @@ class BookService:
 
         for f in files:
             while True:
-                current = genai.get_file(f.name)
+                current = self.genai.get_file(f.name)
                 state = current.state.name
 
                 if state == "ACTIVE":
@@ -168,20 +169,8 @@ class BookService:
     # ------------------------------------------------------------------
     # CHUNKING (FOR SUMMARIZATION)
     # ------------------------------------------------------------------
-    def chunk_text(self, text: str, chunk_size: int = 500) -> List[str]:
-        words = text.split()
-        chunks, current = [], []
-
-        for w in words:
-            current.append(w)
-            if len(current) >= chunk_size:
-                chunks.append(" ".join(current))
-                current = []
-
-        if current:
-            chunks.append(" ".join(current))
-
-        return chunks
+    def chunk_text(self, text: str, chunk_size: int = 500, overlap: int = 0) -> List[str]:
+        return chunk_by_words(text, chunk_size, overlap).texts()
 
 
 # ✅ SINGLE INSTANCE
@@ -1,88 +1,101 @@
-import nltk
-from transformers import AutoTokenizer
+import os
 import logging
+import threading
+from typing import Dict, List, Tuple
+
+from app.utils.chunking import build_chunks
+from app.utils.preprocessing import segment_sentence_spans
 
 # Configure Logging
 logger = logging.getLogger(__name__)
 
+# Sentences whose token count is remembered between calls
+TOKEN_CACHE_SIZE = int(os.getenv("CHUNK_TOKEN_CACHE_SIZE", 100000))
+
 class ChunkingService:
     def __init__(self, model_name="facebook/bart-large-cnn"):
-        # We use the same tokenizer as the model to ensure accurate token counts
-        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-        
+        # We use the same tokenizer as the model to ensure accurate token counts.
+        # Loaded on first use: most workers never chunk with it.
+        self.model_name = model_name
+        self._tokenizer = None
+        self._load_lock = threading.Lock()
+        self._token_counts: Dict[str, int] = {}
+
         # BART max is 1024. We set limit lower to be safe and leave room for special tokens.
-        self.max_chunk_tokens = 800 
-        self.overlap_tokens = 150 
+        self.max_chunk_tokens = 800
+        self.overlap_tokens = 150
 
-    def chunk_text(self, text: str):
+    @property
+    def tokenizer(self):
+        if self._tokenizer is None:
+            with self._load_lock:
+                if self._tokenizer is None:
+                    from transformers import AutoTokenizer
+                    logger.info(f"🔤 Loading tokenizer {self.model_name}...")
+                    self._tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        return self._tokenizer
+
+    def chunk_text(self, text: str, spans=None):
         """
         Splits text into chunks with overlaps, respecting sentence boundaries.
-        (Task 10 Implementation)
+        (Task 10 Implementation) The whole book costs one batched tokenizer call.
         """
-        # 1. Split into natural sentences (Natural Breaking Points)
-        sentences = nltk.sent_tokenize(text)
-        
-        chunks = []
-        current_chunk_sents = []
-        current_tokens = 0
-        
-        i = 0
-        while i < len(sentences):
-            sentence = sentences[i]
-            sent_tokens = len(self.tokenizer.encode(sentence, add_special_tokens=False))
-            
-            # Case A: A single sentence is huge (edge case)
-            if sent_tokens > self.max_chunk_tokens:
-                # If we have a current chunk, save it first
-                if current_chunk_sents:
-                    chunks.append(" ".join(current_chunk_sents))
-                    current_chunk_sents = []
-                    current_tokens = 0
-                
-                # Treat this long sentence as its own chunk (truncated if needed by model later)
-                chunks.append(sentence)
-                i += 1
+        if spans is None:
+            spans = segment_sentence_spans(text)
+        spans = self.token_spans(text, spans)
+        index = build_chunks(
+            text,
+            self.max_chunk_tokens,
+            self.overlap_tokens,
+            counter=self.count_tokens,
+            spans=spans,
+        )
+        logger.info(f"🧩 Smart Chunking: Split text into {len(index)} overlapping chunks.")
+        return index.texts()
+
+    def token_spans(self, text: str, spans: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """
+        Encodes every uncached sentence in one batch and caches its count.
+        Offset mappings let over-budget sentences be cut at exact token boundaries.
+        """
+        sentences = [text[s:e] for s, e in spans]
+        missing = [s for s in dict.fromkeys(sentences) if s not in self._token_counts]
+
+        offsets = {}
+        if missing:
+            encoded = self.tokenizer(
+                missing,
+                add_special_tokens=False,
+                return_attention_mask=False,
+                return_offsets_mapping=True,
+            )
+            if len(self._token_counts) + len(missing) > TOKEN_CACHE_SIZE:
+                self._token_counts.clear()
+            for sentence, ids, mapping in zip(missing, encoded["input_ids"], encoded["offset_mapping"]):
+                self._token_counts[sentence] = len(ids)
+                if len(ids) > self.max_chunk_tokens:
+                    offsets[sentence] = mapping
+
+        result = []
+        for (start, end), sentence in zip(spans, sentences):
+            mapping = offsets.get(sentence)
+            if mapping is None:
+                result.append((start, end))
                 continue
+            # Slice the sentence into token windows of the chunk budget
+            for i in range(0, len(mapping), self.max_chunk_tokens):
+                window = mapping[i:i + self.max_chunk_tokens]
+                piece = (start + window[0][0], start + window[-1][1])
+                self._token_counts[text[piece[0]:piece[1]]] = len(window)
+                result.append(piece)
+        return result
 
-            # Case B: Sentence fits in current chunk
-            if current_tokens + sent_tokens <= self.max_chunk_tokens:
-                current_chunk_sents.append(sentence)
-                current_tokens += sent_tokens
-                i += 1
-            
-            # Case C: Chunk is full -> Save & Create Overlap
-            else:
-                # Save current chunk
-                chunks.append(" ".join(current_chunk_sents))
-                
-                # --- OVERLAP LOGIC ---
-                # Backtrack to keep the last few sentences for the next chunk
-                overlap_buffer = []
-                overlap_len = 0
-                backtrack_idx = i - 1
-                
-                while backtrack_idx >= 0:
-                    prev_sent = sentences[backtrack_idx]
-                    prev_len = len(self.tokenizer.encode(prev_sent, add_special_tokens=False))
-                    
-                    if overlap_len + prev_len <= self.overlap_tokens:
-                        overlap_buffer.insert(0, prev_sent) # Prepend
-                        overlap_len += prev_len
-                        backtrack_idx -= 1
-                    else:
-                        break
-                
-                # Start new chunk with the overlap
-                current_chunk_sents = overlap_buffer
-                current_tokens = overlap_len
-                # Loop continues to try adding the current sentence again
-        
-        # Add the last chunk
-        if current_chunk_sents:
-            chunks.append(" ".join(current_chunk_sents))
-            
-        logger.info(f"🧩 Smart Chunking: Split text into {len(chunks)} overlapping chunks.")
-        return chunks
+    def count_tokens(self, text: str) -> int:
+        count = self._token_counts.get(text)
+        if count is None:
+            count = len(self.tokenizer.encode(text, add_special_tokens=False))
+            self._token_counts[text] = count
+        return count
 
 # Singleton Instance
-chunker = ChunkingService()
\ No newline at end of file
+chunker = ChunkingService()
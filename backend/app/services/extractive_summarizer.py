@@ -0,0 +1,167 @@
+import re
+import math
+import logging
+from collections import Counter
+from typing import Dict, Any, List
+
+import numpy as np
+from scipy import sparse
+
+from app.utils.preprocessing import segment_sentences, calculate_text_stats
+from app.utils.postprocessing import is_bullet_style, reshape_summary
+
+logger = logging.getLogger(__name__)
+
+# =========================================
+# ✅ CONFIGURATION
+# =========================================
+DAMPING = 0.85
+MAX_ITERATIONS = 100
+TOLERANCE = 1e-6
+MIN_SENTENCE_WORDS = 5
+
+# Share of the book's words to keep, clamped to a readable range
+LENGTH_TARGETS = {
+    "short": (0.02, 80, 200),
+    "medium": (0.05, 200, 500),
+    "long": (0.10, 400, 1200),
+}
+
+TOKEN_RE = re.compile(r"[a-z][a-z0-9']+")
+
+STOP_WORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further had
+has have having he her here hers herself him himself his how however i if in into is it its itself
+just let like may me might more most must my myself no nor not now of off on once one only or
+other our ours ourselves out over own same shall she should so some such than that the their
+theirs them themselves then there these they this those through to too under until up upon us
+very was we were what when where which while who whom why will with within without would yet you
+your yours yourself yourselves
+""".split())
+
+
+# =========================================
+# ✅ VECTORIZED TEXTRANK
+# =========================================
+def tfidf_matrix(sentences: List[str]):
+    """
+    Builds L2-normalized sublinear TF-IDF sentence vectors as a CSR matrix.
+    Returns (matrix, vocabulary list).
+    """
+    vocab: Dict[str, int] = {}
+    indptr, indices, counts = [0], [], []
+
+    for sentence in sentences:
+        terms = Counter(t for t in TOKEN_RE.findall(sentence.lower()) if t not in STOP_WORDS)
+        for term, count in terms.items():
+            indices.append(vocab.setdefault(term, len(vocab)))
+            counts.append(count)
+        indptr.append(len(indices))
+
+    n_docs, n_terms = len(sentences), len(vocab)
+    matrix = sparse.csr_matrix(
+        (np.asarray(counts, dtype=np.float64), np.asarray(indices, dtype=np.int64), np.asarray(indptr)),
+        shape=(n_docs, n_terms),
+    )
+
+    doc_freq = np.bincount(matrix.indices, minlength=n_terms)
+    idf = np.log((1.0 + n_docs) / (1.0 + doc_freq)) + 1.0
+    matrix.data = (1.0 + np.log(matrix.data)) * idf[matrix.indices]
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    matrix = sparse.diags(1.0 / norms) @ matrix
+
+    terms = [None] * n_terms
+    for term, idx in vocab.items():
+        terms[idx] = term
+    return matrix.tocsr(), terms
+
+
+def textrank_scores(matrix, damping: float = DAMPING, max_iter: int = MAX_ITERATIONS, tol: float = TOLERANCE):
+    """
+    PageRank over the cosine-similarity graph S = X·Xᵀ (without self loops).
+    S is never materialized: each iteration is two sparse mat-vecs, O(nnz).
+    """
+    n = matrix.shape[0]
+    if n == 0:
+        return np.zeros(0)
+
+    # Self-similarity is 1 for every non-empty (normalized) row
+    self_sim = np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel()
+    degree = matrix @ (matrix.T @ np.ones(n)) - self_sim
+    has_edges = degree > 1e-12
+    inv_degree = np.where(has_edges, 1.0 / np.where(has_edges, degree, 1.0), 0.0)
+
+    scores = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        weighted = scores * inv_degree
+        spread = matrix @ (matrix.T @ weighted) - self_sim * weighted
+        dangling = scores[~has_edges].sum()
+        updated = (1.0 - damping) / n + damping * (spread + dangling / n)
+        if np.abs(updated - scores).sum() < tol:
+            scores = updated
+            break
+        scores = updated
+    return scores
+
+
+def rank_sentences(sentences: List[str], count: int, matrix=None) -> List[int]:
+    """Indices of the `count` best sentences, returned in original order."""
+    if matrix is None:
+        matrix, _ = tfidf_matrix(sentences)
+    scores = textrank_scores(matrix)
+
+    # Fragments rarely make good summary sentences
+    word_counts = np.fromiter((len(s.split()) for s in sentences), dtype=np.int64, count=len(sentences))
+    scores = np.where(word_counts >= MIN_SENTENCE_WORDS, scores, scores * 0.1)
+
+    count = max(1, min(count, len(sentences)))
+    top = np.argpartition(-scores, count - 1)[:count]
+    return sorted(top.tolist())
+
+
+def top_terms(matrix, terms: List[str], num_keywords: int = 5) -> List[str]:
+    if not terms:
+        return []
+    weights = np.asarray(matrix.sum(axis=0)).ravel()
+    best = np.argsort(-weights)[:num_keywords]
+    return [terms[i] for i in best]
+
+
+# =========================================
+# ✅ PUBLIC ENTRY
+# =========================================
+def summarize_extractive(text: str, length: str = "medium", style: str = "paragraph", spans=None) -> Dict[str, Any]:
+    """
+    Zero-API "fast" summary: TextRank picks the most central sentences and
+    returns them in reading order. Same result shape as SummarizerService.
+    Pass the book's stored sentence spans to skip segmentation.
+    """
+    sentences = segment_sentences(text or "", spans)
+    if not sentences:
+        return {"summary_text": "", "keywords": [], "status": "failed", "engine": "fast"}
+
+    stats = calculate_text_stats(text, sentences)
+    ratio, low, high = LENGTH_TARGETS.get((length or "medium").strip().lower(), LENGTH_TARGETS["medium"])
+    target_words = min(max(stats["word_count"] * ratio, low), high)
+    avg_len = stats.get("avg_sentence_length") or 20
+    count = math.ceil(target_words / max(avg_len, 1))
+
+    matrix, terms = tfidf_matrix(sentences)
+    chosen = [sentences[i] for i in rank_sentences(sentences, count, matrix)]
+
+    if is_bullet_style(style):
+        summary_text = reshape_summary("\n".join(chosen), style)
+    else:
+        paragraphs = [" ".join(chosen[i:i + 5]) for i in range(0, len(chosen), 5)]
+        summary_text = reshape_summary("\n\n".join(paragraphs), style)
+
+    logger.info(f"⚡ Extractive summary: {len(chosen)}/{len(sentences)} sentences.")
+    return {
+        "summary_text": summary_text,
+        "keywords": top_terms(matrix, terms),
+        "status": "completed",
+        "engine": "fast",
+    }
@@ -0,0 +1,379 @@
+import os
+import re
+import json
+import math
+import time
+import random
+import hashlib
+import logging
+import threading
+from types import SimpleNamespace
+from typing import Any, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Offline stand-ins for Groq, Gemini, Sarvam and Google Translate (PROVIDER_MODE=fake).
+# Outputs are a pure function of the input, so runs are reproducible; latency,
+# throughput and error rate are configurable so load tests see realistic timing.
+
+# =========================================
+# ✅ CONFIGURATION
+# =========================================
+# Median time to first token and its spread (lognormal sigma; 0 = constant)
+FAKE_LATENCY_MS = float(os.getenv("FAKE_LATENCY_MS", 300))
+FAKE_LATENCY_SIGMA = float(os.getenv("FAKE_LATENCY_SIGMA", 0.5))
+# Generation speed once the first token is out (0 = instant)
+FAKE_TOKENS_PER_SECOND = float(os.getenv("FAKE_TOKENS_PER_SECOND", 400))
+FAKE_OUTPUT_TOKENS = int(os.getenv("FAKE_OUTPUT_TOKENS", 200))
+# Share of calls that fail with a 429 (exercises retries and the rate governor)
+FAKE_ERROR_RATE = float(os.getenv("FAKE_ERROR_RATE", 0.0))
+FAKE_SEED = int(os.getenv("FAKE_SEED", 42))
+
+_rng = random.Random(FAKE_SEED)
+_rng_lock = threading.Lock()
+
+_WORD_RE = re.compile(r"[A-Za-z][A-Za-z']{2,}")
+_FILLER = ("summary key point theme chapter idea result author argument evidence "
+           "context example detail insight conclusion").split()
+
+
+class FakeProviderError(Exception):
+    """Injected failure; looks like a provider 429 to retry and governor logic."""
+    status_code = 429
+
+    def __init__(self, provider: str):
+        super().__init__(f"429 rate limit (fake {provider} error injection)")
+        self.response = SimpleNamespace(headers={"retry-after": "1"})
+
+
+# =========================================
+# ✅ SIMULATION PRIMITIVES
+# =========================================
+def _draw(fn):
+    with _rng_lock:
+        return fn(_rng)
+
+
+def simulate_call(provider: str, output_tokens: int = 0) -> None:
+    """Sleeps for one call's latency and maybe raises an injected error."""
+    if FAKE_ERROR_RATE > 0 and _draw(lambda r: r.random()) < FAKE_ERROR_RATE:
+        time.sleep(FAKE_LATENCY_MS / 1000 / 4)
+        raise FakeProviderError(provider)
+    first_token = FAKE_LATENCY_MS / 1000
+    if FAKE_LATENCY_SIGMA > 0:
+        first_token *= _draw(lambda r: math.exp(r.gauss(0, FAKE_LATENCY_SIGMA)))
+    generation = output_tokens / FAKE_TOKENS_PER_SECOND if FAKE_TOKENS_PER_SECOND > 0 else 0
+    time.sleep(first_token + generation)
+
+
+def _seeded(*parts: Any) -> random.Random:
+    digest = hashlib.sha256("\x1f".join(str(p) for p in parts).encode("utf-8", "ignore")).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+def fake_text(seed_text: str, n_words: int = FAKE_OUTPUT_TOKENS, bullets: bool = False) -> str:
+    """Deterministic prose built from the input's own vocabulary."""
+    rng = _seeded(seed_text, n_words, bullets)
+    vocab = _WORD_RE.findall(seed_text[:20000]) or _FILLER
+    sentences, used = [], 0
+    while used < n_words:
+        length = rng.randint(8, 18)
+        words = [rng.choice(vocab).lower() for _ in range(length)]
+        sentences.append(" ".join(words).capitalize() + ".")
+        used += length
+    if bullets:
+        return "\n".join(f"- {s}" for s in sentences)
+    return " ".join(sentences)
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text or "") // 4 + 1
+
+
+# =========================================
+# ✅ JSON-SCHEMA AWARE OUTPUT (parser chains)
+# =========================================
+_FENCED_RE = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.DOTALL)
+
+
+def find_schema(prompt: str) -> Optional[dict]:
+    """The JSON schema a PydanticOutputParser put into the prompt, if any."""
+    for block in reversed(_FENCED_RE.findall(prompt or "")):
+        try:
+            schema = json.loads(block)
+        except ValueError:
+            continue
+        if isinstance(schema, dict) and ("properties" in schema or "type" in schema):
+            return schema
+    return None
+
+
+def instance_for(schema: dict, rng: random.Random, vocab: List[str], defs: dict = None, depth: int = 0) -> Any:
+    defs = defs if defs is not None else {**schema.get("$defs", {}), **schema.get("definitions", {})}
+    if "$ref" in schema:
+        return instance_for(defs.get(schema["$ref"].split("/")[-1], {}), rng, vocab, defs, depth)
+    for combinator in ("anyOf", "oneOf", "allOf"):
+        if combinator in schema:
+            options = [s for s in schema[combinator] if s.get("type") != "null"] or schema[combinator]
+            return instance_for(options[0], rng, vocab, defs, depth)
+    if "enum" in schema:
+        return schema["enum"][0]
+
+    kind = schema.get("type", "object" if "properties" in schema else "string")
+    if kind == "object":
+        return {
+            name: instance_for(prop, rng, vocab, defs, depth + 1)
+            for name, prop in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        count = 4 if depth > 1 else (5 if depth == 1 else 3)
+        return [instance_for(schema.get("items", {}), rng, vocab, defs, depth + 1) for _ in range(count)]
+    if kind == "integer":
+        return rng.randint(1, 10)
+    if kind == "number":
+        return round(rng.uniform(0, 1), 3)
+    if kind == "boolean":
+        return True
+    return " ".join(rng.choice(vocab) for _ in range(rng.randint(2, 6))).capitalize()
+
+
+def fake_completion(prompt: str, max_tokens: Optional[int] = None) -> str:
+    schema = find_schema(prompt)
+    if schema is not None:
+        vocab = [w.lower() for w in _WORD_RE.findall(prompt[:20000])] or _FILLER
+        return json.dumps(instance_for(schema, _seeded(prompt), vocab))
+    return fake_text(prompt, min(max_tokens or FAKE_OUTPUT_TOKENS, FAKE_OUTPUT_TOKENS))
+
+
+# =========================================
+# ✅ LANGCHAIN CHAT MODEL (Groq stand-in)
+# =========================================
+try:
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.messages import AIMessage
+    from langchain_core.outputs import ChatGeneration, ChatResult
+
+    class FakeChatModel(BaseChatModel):
+        model_name: str = "fake"
+
+        @property
+        def _llm_type(self) -> str:
+            return "fake-chat"
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+            prompt = "\n".join(str(m.content) for m in messages)
+            text = fake_completion(prompt)
+            simulate_call("groq", estimate_tokens(text))
+            usage = {"prompt_tokens": estimate_tokens(prompt), "completion_tokens": estimate_tokens(text)}
+            usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+            return ChatResult(
+                generations=[ChatGeneration(message=AIMessage(content=text))],
+                llm_output={"token_usage": usage, "model_name": self.model_name},
+            )
+except ImportError:  # LangChain is optional for the SDK fakes below
+    FakeChatModel = None
+
+
+# =========================================
+# ✅ GROQ SDK (chat + Whisper)
+# =========================================
+class _FakeGroqCompletions:
+    def create(self, model: str, messages: list, max_tokens: Optional[int] = None, **kwargs):
+        prompt = "\n".join(str(m.get("content", "")) for m in messages)
+        text = fake_completion(prompt, max_tokens)
+        simulate_call("groq", estimate_tokens(text))
+        prompt_tokens, completion_tokens = estimate_tokens(prompt), estimate_tokens(text)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=text))],
+            usage=SimpleNamespace(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=prompt_tokens + completion_tokens,
+            ),
+            model=model,
+        )
+
+
+class _FakeGroqTranscriptions:
+    def create(self, file, model: str, **kwargs):
+        name, data = file if isinstance(file, tuple) else (getattr(file, "name", "audio"), file.read())
+        digest = hashlib.sha256(data if isinstance(data, bytes) else str(data).encode()).hexdigest()
+        # ~1 minute of speech per MB of audio
+        words = max(50, len(data) // 1_000_000 * 150)
+        simulate_call("groq-whisper", words // 4)
+        return SimpleNamespace(text=fake_text(f"{name}:{digest}", words))
+
+
+class FakeGroqClient:
+    def __init__(self, *args, **kwargs):
+        self.chat = SimpleNamespace(completions=_FakeGroqCompletions())
+        self.audio = SimpleNamespace(transcriptions=_FakeGroqTranscriptions())
+
+
+# =========================================
+# ✅ GEMINI (google-genai client + legacy google.generativeai)
+# =========================================
+class _FakeState:
+    name = "ACTIVE"
+
+    def __str__(self) -> str:
+        return "FileState.ACTIVE"
+
+
+class _FakeFile:
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self.digest = hashlib.sha256(f.read()).hexdigest()
+        self.name = f"files/{self.digest[:16]}"
+        self.state = _FakeState()
+
+
+def _seed_text(contents) -> str:
+    """Prompt text plus file identities; plain-text uploads contribute their words."""
+    parts = []
+    for item in contents if isinstance(contents, (list, tuple)) else [contents]:
+        if isinstance(item, _FakeFile):
+            parts.append(item.digest)
+            if item.path.endswith(".txt"):
+                with open(item.path, "r", encoding="utf-8", errors="ignore") as f:
+                    parts.append(f.read(20000))
+        else:
+            parts.append(str(item))
+    return "\n".join(parts)
+
+
+def _gemini_response(text: str, prompt: str):
+    total = estimate_tokens(prompt) + estimate_tokens(text)
+    return SimpleNamespace(text=text, usage_metadata=SimpleNamespace(total_token_count=total))
+
+
+class _FakeGeminiFiles:
+    def __init__(self):
+        self._files = {}
+
+    def upload(self, file: str, **kwargs):
+        uploaded = _FakeFile(file)
+        self._files[uploaded.name] = uploaded
+        return uploaded
+
+    def get(self, name: str):
+        return self._files.get(name) or SimpleNamespace(name=name, state=_FakeState())
+
+    def delete(self, name: str):
+        self._files.pop(name, None)
+
+
+class _FakeGeminiModels:
+    def generate_content(self, model: str, contents, **kwargs):
+        prompt = _seed_text(contents)
+        text = fake_text(prompt, bullets="bullet" in prompt.lower())
+        simulate_call("gemini", estimate_tokens(text))
+        return _gemini_response(text, prompt)
+
+    def generate_content_stream(self, model: str, contents, **kwargs) -> Iterator[Any]:
+        prompt = _seed_text(contents)
+        text = fake_text(prompt, bullets="bullet" in prompt.lower())
+        simulate_call("gemini", 0)
+        words = text.split(" ")
+        step = 12
+        for i in range(0, len(words), step):
+            piece = " ".join(words[i:i + step]) + (" " if i + step < len(words) else "")
+            if FAKE_TOKENS_PER_SECOND > 0:
+                time.sleep(estimate_tokens(piece) / FAKE_TOKENS_PER_SECOND)
+            yield _gemini_response(piece, prompt if i + step >= len(words) else "")
+
+
+class FakeGeminiClient:
+    def __init__(self, *args, **kwargs):
+        self.files = _FakeGeminiFiles()
+        self.models = _FakeGeminiModels()
+
+
+class _FakeLegacyModel:
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    def generate_content(self, contents, **kwargs):
+        return _FakeGeminiModels().generate_content(self.model_name, contents)
+
+
+class FakeLegacyGenAI:
+    """The subset of google.generativeai used by BookService."""
+    def __init__(self):
+        self._files = _FakeGeminiFiles()
+
+    def configure(self, **kwargs):
+        pass
+
+    def upload_file(self, path: str, **kwargs):
+        return self._files.upload(path)
+
+    def get_file(self, name: str):
+        return self._files.get(name)
+
+    def GenerativeModel(self, model_name: str, **kwargs):
+        return _FakeLegacyModel(model_name)
+
+
+# =========================================
+# ✅ TRANSLATION (Sarvam HTTP + GoogleTranslator)
+# =========================================
+def fake_translation(text: str, target: str) -> str:
+    """Marks the text instead of translating it; same length, so chunking behaves the same."""
+    return f"[{target}] {text}"
+
+
+class _FakeResponse:
+    def __init__(self, payload: dict, status_code: int = 200):
+        self.status_code = status_code
+        self._payload = payload
+        self.text = json.dumps(payload)
+
+    def json(self) -> dict:
+        return self._payload
+
+
+class FakeSarvamHTTP:
+    """Drop-in for the `requests.post` calls SarvamService makes."""
+    def post(self, url: str, json: dict = None, headers: dict = None, timeout: float = None):
+        payload = json or {}
+        try:
+            if url.endswith("/translate"):
+                text = payload.get("input", "")
+                simulate_call("sarvam", estimate_tokens(text))
+                return _FakeResponse({"translated_text": fake_translation(text, payload.get("target_language_code", ""))})
+            if url.endswith("/text-to-speech"):
+                text = " ".join(payload.get("inputs", []))
+                simulate_call("sarvam-tts", estimate_tokens(text))
+                return _FakeResponse({"audios": [fake_wav_base64(text, payload.get("speech_sample_rate", 8000))]})
+        except FakeProviderError as e:
+            return _FakeResponse({"error": str(e)}, status_code=429)
+        return _FakeResponse({"error": "unknown fake endpoint"}, status_code=404)
+
+
+def fake_wav_base64(text: str, sample_rate: int = 8000) -> str:
+    """A silent WAV whose duration follows the text length (~15 chars per second)."""
+    import io
+    import wave
+    import base64
+
+    seconds = max(1, len(text) // 15)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(b"\x00\x00" * sample_rate * seconds)
+    return base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+class FakeTranslator:
+    """Drop-in for deep_translator.GoogleTranslator."""
+    def __init__(self, source: str = "auto", target: str = "en"):
+        self.source = source
+        self.target = target
+
+    def translate(self, text: str) -> str:
+        simulate_call("google-translate", estimate_tokens(text))
+        return fake_translation(text, self.target)
@@ -0,0 +1,74 @@
+import os
+import logging
+
+from sqlalchemy.orm import Session
+
+from app.models import Book, ProcessingJob
+from app.services import job_queue
+from app.services.job_queue import PermanentJobError
+from app.services.pdf_extractor import extract_pdf_text
+from app.services.text_extractor import extract_from_txt, extract_from_docx
+from app.services.sentence_index import build_sentence_index
+from app.utils.preprocessing import detect_language
+from app.utils.stage_timer import stage
+
+logger = logging.getLogger(__name__)
+
+# Build the multi-resolution summary tree once a book is ingested
+SUMMARY_TREE_ON_UPLOAD = os.getenv("SUMMARY_TREE_ON_UPLOAD", "true").lower() in ("1", "true", "yes")
+
+
+def extract_book_text(file_path: str) -> str:
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext == ".pdf":
+        return extract_pdf_text(file_path)
+    if ext == ".docx":
+        return extract_from_docx(file_path)
+    if ext == ".txt":
+        return extract_from_txt(file_path)
+    raise PermanentJobError(f"Unsupported file format: {ext}")
+
+
+def run_ingestion_task(db: Session, job: ProcessingJob) -> None:
+    """
+    Job handler for kind="ingest": uploaded -> extracting -> ready. Raises on
+    failure so the queue can retry; the queue marks the book failed once
+    attempts are exhausted (at once for PermanentJobError).
+    """
+    book = db.query(Book).filter(Book.book_id == job.book_id).first()
+    if not book:
+        raise LookupError(f"Book {job.book_id} not found.")
+    if not book.file_path or not os.path.exists(book.file_path):
+        raise PermanentJobError(f"Book {book.book_id} file is missing.")
+
+    if book.status in ("uploaded", "failed"):
+        book.status = "extracting"
+    job_queue.heartbeat(db, job)
+
+    with stage("text_extraction"):
+        try:
+            text = extract_book_text(book.file_path)
+        except ValueError as e:  # unreadable / encrypted: a retry reads the same bytes
+            raise PermanentJobError(str(e))
+    if not text.strip():
+        # Scanned / image-only: still summarizable, Gemini OCRs the uploaded file itself
+        logger.warning(f"⚠️ [Worker] Book {book.book_id} has no extractable text; summaries will OCR the file.")
+        text = ""
+
+    with stage("indexing"):
+        book.extracted_text = text
+        book.word_count = len(text.split())
+        book.char_count = len(text)
+        if text:
+            book.content.language = detect_language(text)
+            # Segment once; quiz, graph, agent and summarizer slice by these offsets
+            build_sentence_index(db, book)
+
+    # A summary requested meanwhile owns the status from here on
+    if book.status == "extracting":
+        book.status = "ready"
+    if SUMMARY_TREE_ON_UPLOAD and text:
+        job_queue.enqueue(db, book, kind="tree")
+    with stage("db_commit"):
+        db.commit()
+    logger.info(f"📥 [Worker] Book {book.book_id} ingested: {book.word_count} words, language={book.language}.")
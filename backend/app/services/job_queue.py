@@ -0,0 +1,438 @@
+import os
+import time
+import socket
+import logging
+import threading
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List
+
+from sqlalchemy import update, desc, select, func
+from sqlalchemy.orm import Session
+
+from app.utils.database import SessionLocal
+from app.models import Book, ProcessingJob, SummaryBatch, StageTiming
+from app.utils.stage_timer import recording, job_seconds
+from app.services import analytics_rollup
+
+logger = logging.getLogger(__name__)
+
+# =========================================
+# ✅ CONFIGURATION
+# =========================================
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+# A running job whose heartbeat is older than this is assumed lost (crash / deploy).
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", 300))
+# Running jobs refresh their heartbeat this often, however long the handler takes
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", 60))
+JOB_RETRY_BASE_SECONDS = int(os.getenv("JOB_RETRY_BASE_SECONDS", 30))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 2.0))
+
+# "external" (default): the web process only enqueues; run `python worker.py` next to it,
+#   so extraction and provider calls never take CPU or threads from request handling.
+# "embedded": worker threads inside the web process; for local development and tests only.
+JOB_WORKER_MODE = os.getenv("JOB_WORKER_MODE", "external").strip().lower()
+JOB_WORKER_CONCURRENCY = int(os.getenv("JOB_WORKER_CONCURRENCY", 2))
+
+# Provider concurrency: at most this many jobs of a kind run at once, across all workers
+KIND_CONCURRENCY = {
+    "summary": int(os.getenv("GEMINI_MAX_CONCURRENCY", 4)),
+    "tree": int(os.getenv("GROQ_MAX_CONCURRENCY", 2)),
+    # CPU bound (PDF parsing, segmentation): one book per core is plenty
+    "ingest": int(os.getenv("INGEST_MAX_CONCURRENCY", os.cpu_count() or 2)),
+}
+
+ACTIVE_STATUSES = ("queued", "running")
+# New uploads are unusable until ingested, so ingestion jumps the queue
+INGEST_PRIORITY = -1
+# Job kinds whose final failure is reflected in Book.status
+BOOK_STATUS_KINDS = {"summary", "ingest"}
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying cannot help (e.g. a PDF with no text layer)."""
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{threading.get_ident()}"
+
+
+# =========================================
+# ✅ QUEUE OPERATIONS
+# =========================================
+def enqueue(
+    db: Session,
+    book: Book,
+    length: str = "medium",
+    style: str = "paragraph",
+    kind: str = "summary",
+    batch_id: Optional[int] = None,
+    priority: int = 0,
+) -> ProcessingJob:
+    """Persists a job. The caller commits, together with its own status change."""
+    job = ProcessingJob(
+        kind=kind,
+        book_id=book.book_id,
+        user_id=book.user_id,
+        length_setting=length,
+        style_setting=style,
+        batch_id=batch_id,
+        priority=priority,
+        status="queued",
+        max_attempts=JOB_MAX_ATTEMPTS,
+        available_at=_utcnow(),
+    )
+    db.add(job)
+    return job
+
+
+def _running_count(kind: str):
+    return (
+        select(func.count(ProcessingJob.job_id))
+        .where(ProcessingJob.status == "running", ProcessingJob.kind == kind)
+        .scalar_subquery()
+    )
+
+
+def _lock_kind(db: Session, kind: str) -> None:
+    """
+    Serializes claims of one kind until commit. Under Postgres READ COMMITTED two
+    workers could both count the last free slot; SQLite already serializes writers.
+    """
+    if db.bind.dialect.name == "postgresql":
+        # crc32, not hash(): the key must be the same in every worker process
+        db.execute(select(func.pg_advisory_xact_lock(zlib.crc32(kind.encode("utf-8")))))
+
+
+def claim_next(db: Session, worker_id: str) -> Optional[ProcessingJob]:
+    """
+    Claims the best runnable job: lowest priority first (ingestion of new uploads is
+    INGEST_PRIORITY, interactive requests 0, batch jobs their book's word count), then oldest. Kinds at their provider
+    concurrency limit are skipped. FOR UPDATE SKIP LOCKED keeps Postgres workers
+    off each other's rows; the per-kind cap is re-checked in the claiming UPDATE
+    while holding the kind's lock (see _lock_kind).
+    """
+    now = _utcnow()
+    running = dict(
+        db.query(ProcessingJob.kind, func.count(ProcessingJob.job_id))
+        .filter(ProcessingJob.status == "running")
+        .group_by(ProcessingJob.kind)
+        .all()
+    )
+    saturated = [k for k, cap in KIND_CONCURRENCY.items() if running.get(k, 0) >= cap]
+
+    query = db.query(ProcessingJob.job_id, ProcessingJob.kind).filter(
+        ProcessingJob.status == "queued", ProcessingJob.available_at <= now
+    )
+    if saturated:
+        query = query.filter(ProcessingJob.kind.notin_(saturated))
+    candidate = (
+        query.order_by(ProcessingJob.priority, ProcessingJob.available_at, ProcessingJob.job_id)
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+    if not candidate:
+        db.rollback()
+        return None
+
+    conditions = [ProcessingJob.job_id == candidate.job_id, ProcessingJob.status == "queued"]
+    if candidate.kind in KIND_CONCURRENCY:
+        # Re-checked inside the UPDATE, under the kind's lock, so two workers can't both take the last slot
+        _lock_kind(db, candidate.kind)
+        conditions.append(_running_count(candidate.kind) < KIND_CONCURRENCY[candidate.kind])
+
+    claimed = db.execute(
+        update(ProcessingJob)
+        .where(*conditions)
+        .values(
+            status="running",
+            attempts=ProcessingJob.attempts + 1,
+            worker_id=worker_id,
+            started_at=now,
+            heartbeat_at=now,
+        )
+    ).rowcount
+    db.commit()
+
+    if not claimed:
+        return None
+    return db.get(ProcessingJob, candidate.job_id)
+
+
+def heartbeat(db: Session, job: ProcessingJob) -> None:
+    job.heartbeat_at = _utcnow()
+    db.commit()
+
+
+@contextmanager
+def _keep_alive(job_id: int, interval: float = None):
+    """Refreshes the job's heartbeat every `interval` seconds (own session) while the block runs."""
+    interval = JOB_HEARTBEAT_SECONDS if interval is None else interval
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(interval):
+            db = SessionLocal()
+            try:
+                db.execute(
+                    update(ProcessingJob)
+                    .where(ProcessingJob.job_id == job_id, ProcessingJob.status == "running")
+                    .values(heartbeat_at=_utcnow())
+                )
+                db.commit()
+            except Exception as e:
+                logger.warning(f"⚠️ Heartbeat for job {job_id} failed: {e}")
+            finally:
+                db.close()
+
+    thread = threading.Thread(target=beat, daemon=True, name=f"job-{job_id}-heartbeat")
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join(timeout=5)
+
+
+def recover_stale(db: Session, lease_seconds: int = JOB_LEASE_SECONDS) -> int:
+    """Puts jobs abandoned by a dead worker back on the queue (or fails them for good)."""
+    cutoff = _utcnow() - timedelta(seconds=lease_seconds)
+    stale = (
+        db.query(ProcessingJob)
+        .filter(ProcessingJob.status == "running", ProcessingJob.heartbeat_at < cutoff)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    for job in stale:
+        logger.warning(f"♻️ Recovering stale job {job.job_id} (worker {job.worker_id}).")
+        _schedule_retry_or_fail(db, job, "Worker lost (lease expired).")
+    db.commit()
+    return len(stale)
+
+
+def _schedule_retry_or_fail(db: Session, job: ProcessingJob, error: str, retry: bool = True) -> None:
+    job.last_error = error[:2000]
+    job.worker_id = None
+    if retry and (job.attempts or 0) < (job.max_attempts or JOB_MAX_ATTEMPTS):
+        delay = JOB_RETRY_BASE_SECONDS * (2 ** max((job.attempts or 1) - 1, 0))
+        job.status = "queued"
+        job.available_at = _utcnow() + timedelta(seconds=delay)
+        logger.info(f"🔁 Job {job.job_id} retry {job.attempts}/{job.max_attempts} in {delay}s.")
+        return
+
+    job.status = "failed"
+    job.finished_at = _utcnow()
+    book = db.get(Book, job.book_id) if job.kind in BOOK_STATUS_KINDS else None
+    if book:
+        book.status = "failed"
+        analytics_rollup.bump(db, job.finished_at, failures=1)
+    logger.error(f"❌ Job {job.job_id} failed after {job.attempts} attempts: {error}")
+
+
+def find_active(db: Session, book_id: int, kind: str = "summary", length: str = None, style: str = None) -> Optional[ProcessingJob]:
+    """An identical job that is still queued or running, if any (settings compared case-insensitively)."""
+    query = db.query(ProcessingJob).filter(
+        ProcessingJob.book_id == book_id,
+        ProcessingJob.kind == kind,
+        ProcessingJob.status.in_(ACTIVE_STATUSES),
+    )
+    if length is not None:
+        query = query.filter(func.lower(ProcessingJob.length_setting) == length.strip().lower())
+    if style is not None:
+        query = query.filter(func.lower(ProcessingJob.style_setting) == style.strip().lower())
+    return query.order_by(ProcessingJob.job_id).first()
+
+
+def latest_job(db: Session, book_id: int) -> Optional[ProcessingJob]:
+    return (
+        db.query(ProcessingJob)
+        .filter(ProcessingJob.book_id == book_id)
+        .order_by(desc(ProcessingJob.job_id))
+        .first()
+    )
+
+
+def batch_progress(db: Session, batch: SummaryBatch) -> dict:
+    """Aggregate status of a batch plus one row per book, in scheduling order."""
+    rows = (
+        db.query(ProcessingJob, Book.title)
+        .join(Book, Book.book_id == ProcessingJob.book_id)
+        .filter(ProcessingJob.batch_id == batch.batch_id)
+        .order_by(ProcessingJob.priority, ProcessingJob.job_id)
+        .all()
+    )
+    counts = {status: 0 for status in ("queued", "running", "completed", "failed")}
+    for job, _ in rows:
+        counts[job.status] = counts.get(job.status, 0) + 1
+
+    finished = counts["completed"] + counts["failed"]
+    total = batch.total or len(rows)
+    if finished >= total:
+        status = "completed" if not counts["failed"] else "completed_with_errors"
+    else:
+        status = "running" if counts["running"] or finished else "queued"
+
+    return {
+        "batch_id": batch.batch_id,
+        "status": status,
+        "total": total,
+        "counts": counts,
+        "progress": round(100 * finished / total, 1) if total else 100.0,
+        "length_setting": batch.length_setting,
+        "style_setting": batch.style_setting,
+        "created_at": batch.created_at,
+        "books": [
+            {"book_id": job.book_id, "title": title, **job_to_dict(job)}
+            for job, title in rows
+        ],
+    }
+
+
+def job_to_dict(job: ProcessingJob) -> dict:
+    return {
+        "job_id": job.job_id,
+        "kind": job.kind,
+        "status": job.status,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "duration_seconds": job.duration_seconds,
+        "last_error": job.last_error,
+    }
+
+
+# =========================================
+# ✅ EXECUTION
+# =========================================
+def _handler_for(kind: str):
+    # Imported lazily: handlers pull in the Gemini / Groq clients.
+    if kind == "summary":
+        from app.services.summary_tasks import run_summarization_task
+        return run_summarization_task
+    if kind == "tree":
+        from app.services.summary_tasks import build_summary_tree_task
+        return build_summary_tree_task
+    if kind == "ingest":
+        from app.services.ingest_tasks import run_ingestion_task
+        return run_ingestion_task
+    raise ValueError(f"Unknown job kind: {kind}")
+
+
+def record_stage_timings(db: Session, book_id: int, stages, job_id: Optional[int] = None) -> None:
+    """One StageTiming row per timed stage. The caller commits."""
+    for name, seconds in stages:
+        db.add(StageTiming(book_id=book_id, job_id=job_id, stage=name, duration_seconds=round(seconds, 4)))
+
+
+def _mark_processing_started(db: Session, job: ProcessingJob) -> None:
+    """Book.processing_start is the first attempt's start; retries keep it."""
+    if job.kind not in BOOK_STATUS_KINDS or job.attempts != 1:
+        return
+    book = db.get(Book, job.book_id)
+    if book:
+        book.processing_start = job.started_at or _utcnow()
+        book.processing_end = None
+        db.commit()
+
+
+def execute_job(job_id: int) -> None:
+    """Runs one claimed job in its own session and records the outcome and timings."""
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        job = db.get(ProcessingJob, job_id)
+        if not job:
+            return
+        kind, book_id = job.kind, job.book_id
+        _mark_processing_started(db, job)
+
+        with recording() as recorder:
+            try:
+                # The lease stays fresh for as long as the handler runs, not just at its start
+                with _keep_alive(job_id):
+                    _handler_for(kind)(db, job)
+                job.status = "completed"
+                job.last_error = None
+            except Exception as e:
+                logger.error(f"❌ [Worker] Job {job_id} attempt {job.attempts} failed: {e}", exc_info=True)
+                db.rollback()
+                job = db.get(ProcessingJob, job_id)
+                _schedule_retry_or_fail(db, job, str(e), retry=not isinstance(e, PermanentJobError))
+
+        job.duration_seconds = round(time.perf_counter() - started, 3)
+        if job.status in ("completed", "failed"):
+            job.finished_at = _utcnow()
+            book = db.get(Book, book_id) if kind in BOOK_STATUS_KINDS else None
+            if book:
+                book.processing_end = job.finished_at
+                analytics_rollup.record_processing(db, job.finished_at, job.duration_seconds)
+        record_stage_timings(db, book_id, recorder.stages, job_id)
+        db.commit()
+        job_seconds.observe(kind, job.duration_seconds)
+    finally:
+        db.close()
+
+
+def worker_loop(worker_id: str, stop_event: threading.Event, poll_interval: float = JOB_POLL_INTERVAL) -> None:
+    """Claims and runs jobs until stop_event is set. Safe to run in many threads or processes."""
+    logger.info(f"👷 Worker {worker_id} started.")
+    last_recovery = 0.0
+
+    while not stop_event.is_set():
+        job_id = None
+        db = SessionLocal()
+        try:
+            if time.monotonic() - last_recovery > poll_interval * 30:
+                recover_stale(db)
+                last_recovery = time.monotonic()
+            job = claim_next(db, worker_id)
+            job_id = job.job_id if job else None
+        except Exception as e:
+            logger.error(f"❌ Worker {worker_id} poll failed: {e}")
+        finally:
+            db.close()
+
+        if job_id is None:
+            stop_event.wait(poll_interval)
+            continue
+
+        logger.info(f"🏗️ [Worker] {worker_id} picked up job {job_id}.")
+        execute_job(job_id)
+
+    logger.info(f"👋 Worker {worker_id} stopped.")
+
+
+# =========================================
+# ✅ EMBEDDED WORKERS (web process)
+# =========================================
+_embedded_stop = threading.Event()
+_embedded_threads: List[threading.Thread] = []
+
+
+def start_embedded_workers(concurrency: int = JOB_WORKER_CONCURRENCY) -> None:
+    if JOB_WORKER_MODE != "embedded" or _embedded_threads:
+        return
+    _embedded_stop.clear()
+    for i in range(concurrency):
+        t = threading.Thread(
+            target=worker_loop,
+            args=(f"{socket.gethostname()}-{os.getpid()}-embedded-{i}", _embedded_stop),
+            daemon=True,
+            name=f"job-worker-{i}",
+        )
+        t.start()
+        _embedded_threads.append(t)
+
+
+def stop_embedded_workers(timeout: float = 5.0) -> None:
+    _embedded_stop.set()
+    for t in _embedded_threads:
+        t.join(timeout=timeout)
+    _embedded_threads.clear()
@@ -1,11 +1,13 @@
 import os
-from groq import Groq
 from moviepy.video.io.VideoFileClip import VideoFileClip
 from dotenv import load_dotenv
 
+from app.services.providers import groq_client
+from app.utils.rate_governor import governed
+
 load_dotenv()
 
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+client = groq_client(os.getenv("GROQ_API_KEY"))
 
 def extract_audio(video_path: str, audio_output: str = "meeting_audio.mp3") -> str:
     """Extract audio from video file."""
@@ -30,7 +32,7 @@ def extract_audio(video_path: str, audio_output: str = "meeting_audio.mp3") -> s
 def transcribe_audio(audio_path: str) -> str:
     """Transcribe audio using Whisper Large V3 Turbo via Groq."""
     print(f"🎙️ Transcribing audio...")
-    with open(audio_path, "rb") as file:
+    with open(audio_path, "rb") as file, governed("groq", "whisper-large-v3-turbo", max_output_tokens=0):
         transcription = client.audio.transcriptions.create(
             file=(audio_path, file.read()),
             model="whisper-large-v3-turbo",
@@ -44,29 +46,31 @@ def transcribe_audio(audio_path: str) -> str:
 def generate_summary(transcript_text: str) -> str:
     """Generate meeting summary using LLaMA 3.3 70B via Groq."""
     print("📝 Generating summary...")
-    response = client.chat.completions.create(
-        model="llama-3.3-70b-versatile",
-        messages=[
-            {
-                "role": "system",
-                "content": (
-                    "You are an expert meeting summarizer. "
-                    "Summarize the following meeting transcript clearly and concisely. "
-                    "Structure your response with these sections:\n\n"
-                    "## 📌 Key Discussion Points\n"
-                    "## ✅ Decisions Made\n"
-                    "## 🎯 Action Items\n"
-                    "## 📋 Overall Summary"
-                )
-            },
-            {
-                "role": "user",
-                "content": transcript_text
-            }
-        ],
-        temperature=0.5,
-        max_tokens=1024
-    )
+    with governed("groq", "llama-3.3-70b-versatile", transcript_text, max_output_tokens=1024) as usage:
+        response = client.chat.completions.create(
+            model="llama-3.3-70b-versatile",
+            messages=[
+                {
+                    "role": "system",
+                    "content": (
+                        "You are an expert meeting summarizer. "
+                        "Summarize the following meeting transcript clearly and concisely. "
+                        "Structure your response with these sections:\n\n"
+                        "## 📌 Key Discussion Points\n"
+                        "## ✅ Decisions Made\n"
+                        "## 🎯 Action Items\n"
+                        "## 📋 Overall Summary"
+                    )
+                },
+                {
+                    "role": "user",
+                    "content": transcript_text
+                }
+            ],
+            temperature=0.5,
+            max_tokens=1024
+        )
+        usage.tokens = getattr(response.usage, "total_tokens", None)
     return response.choices[0].message.content
 
 def process_meeting(source_path: str) -> dict:
@@ -0,0 +1,177 @@
+import os
+import re
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+logger = logging.getLogger(__name__)
+
+# =========================================
+# ✅ CONFIGURATION
+# =========================================
+# Worker processes for page-range extraction (0 or 1 = always in-process)
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", os.cpu_count() or 1))
+# Smaller documents are cheaper to read in-process than to ship to the pool
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", 64))
+# Each worker gets several ranges so a slow (dense) range does not hold up the rest
+PDF_RANGES_PER_WORKER = 4
+PDF_MIN_PAGES_PER_RANGE = 8
+
+# Page quality: above this share of unreadable glyphs a page is re-extracted...
+PDF_GARBAGE_RATIO = float(os.getenv("PDF_GARBAGE_RATIO", 0.1))
+# ...and likewise when most of its text sits in "words" this long (spaces lost)
+PDF_RUN_ON_TOKEN_CHARS = 30
+PDF_RUN_ON_RATIO = 0.5
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_size = 0
+_pool_lock = threading.Lock()
+
+
+# =========================================
+# ✅ PAGE QUALITY
+# =========================================
+# Replacement char, private-use glyphs and control characters: unmapped font glyphs
+_GARBAGE = re.compile("[\ufffd\ue000-\uf8ff\x00-\x08\x0b\x0e-\x1f\x7f]")
+# Long runs of Latin letters: Chinese, Japanese or Thai are written without spaces, so only Latin runs count
+_RUN_ON = re.compile("[A-Za-z\u00c0-\u024f]{%d,}" % (PDF_RUN_ON_TOKEN_CHARS + 1))
+
+
+def page_issue(text: str) -> Optional[str]:
+    """Why a page's extracted text looks unusable ("empty", "garbage", "missing_spaces"), or None."""
+    chars = len(text) - sum(map(text.count, " \n\t\r\f\v"))
+    if not chars:
+        return "empty"
+    if len(_GARBAGE.findall(text)) / chars > PDF_GARBAGE_RATIO:
+        return "garbage"
+    if sum(map(len, _RUN_ON.findall(text))) / chars > PDF_RUN_ON_RATIO:
+        return "missing_spaces"
+    return None
+
+
+def _fallback_pages(file_path: str, indices: List[int]) -> Dict[int, str]:
+    """Slower pdfplumber pass over just the given pages."""
+    import pdfplumber
+
+    with pdfplumber.open(file_path) as pdf:
+        return {i: pdf.pages[i].extract_text() or "" for i in indices}
+
+
+# =========================================
+# ✅ WORKER SIDE (runs in the pool processes)
+# =========================================
+def _extract_range(file_path: str, start: int, stop: int) -> Tuple[List[str], List[int]]:
+    """
+    Text of pages [start, stop), one string per page, and the indices of pages
+    whose PyMuPDF text was unusable and came from the fallback parser instead.
+    """
+    with fitz.open(file_path) as doc:
+        pages = [doc[i].get_text() for i in range(start, stop)]
+
+    bad = [start + i for i, text in enumerate(pages) if page_issue(text)]
+    if not bad:
+        return pages, []
+    try:
+        retried = _fallback_pages(file_path, bad)
+    except Exception as e:
+        logger.warning(f"⚠️ Fallback extraction failed for {file_path}: {e}")
+        return pages, []
+
+    repaired = []
+    for i, text in retried.items():
+        old = pages[i - start]
+        # Take the fallback text when it is clean, or at least something where there was nothing
+        if page_issue(text) is None or (not old.strip() and text.strip()):
+            pages[i - start] = text
+            repaired.append(i)
+    return pages, repaired
+
+
+# =========================================
+# ✅ POOL
+# =========================================
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_size
+    with _pool_lock:
+        if _pool is None or _pool_size != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # spawn: the web process runs threads (job workers), which fork does not copy safely
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_size = workers
+        return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def page_ranges(page_count: int, workers: int) -> List[Tuple[int, int]]:
+    """Splits [0, page_count) into contiguous ranges, in page order."""
+    if page_count <= 0:
+        return []
+    n_ranges = max(1, min(workers * PDF_RANGES_PER_WORKER, page_count // PDF_MIN_PAGES_PER_RANGE))
+    size, extra = divmod(page_count, n_ranges)
+    ranges, start = [], 0
+    for i in range(n_ranges):
+        stop = start + size + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+# =========================================
+# ✅ PUBLIC API
+# =========================================
+def extract_pages(file_path: str, workers: int = None) -> List[str]:
+    """
+    Page-aligned text: element i is the text of page i. Large documents are split
+    into page ranges and read by a pool of PyMuPDF processes; pages whose text
+    looks unusable (see page_issue) are re-read with pdfplumber, and only those.
+    """
+    workers = PDF_EXTRACT_WORKERS if workers is None else workers
+    try:
+        with fitz.open(file_path) as doc:
+            if doc.needs_pass:
+                raise ValueError("PDF is password protected.")
+            page_count = doc.page_count
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"Error reading PDF: {e}")
+
+    try:
+        if workers <= 1 or page_count < PDF_PARALLEL_MIN_PAGES:
+            pages, repaired = _extract_range(file_path, 0, page_count)
+        else:
+            pool = _get_pool(workers)
+            futures = [pool.submit(_extract_range, file_path, start, stop) for start, stop in page_ranges(page_count, workers)]
+            pages, repaired = [], []
+            for future in futures:
+                range_pages, range_repaired = future.result()
+                pages.extend(range_pages)
+                repaired.extend(range_repaired)
+    except BrokenProcessPool as e:
+        logger.warning(f"⚠️ PDF extraction pool broke ({e}); reading {file_path} in-process.")
+        shutdown_pool()
+        pages, repaired = _extract_range(file_path, 0, page_count)
+    except Exception as e:
+        raise ValueError(f"Error reading PDF: {e}")
+
+    if repaired:
+        logger.info(f"🩹 Re-extracted {len(repaired)}/{page_count} pages of {file_path} with pdfplumber.")
+    return pages
+
+
+def extract_pdf_text(file_path: str, workers: int = None) -> str:
+    """Whole-document text, pages joined by newlines."""
+    return "\n".join(extract_pages(file_path, workers))
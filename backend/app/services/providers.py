@@ -0,0 +1,78 @@
+import os
+import logging
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# Every external provider client is built here, so PROVIDER_MODE=fake can swap
+# all of them for the deterministic stand-ins in fake_providers.
+
+# "live" (default) or "fake"
+PROVIDER_MODE = os.getenv("PROVIDER_MODE", "live").strip().lower()
+
+if PROVIDER_MODE == "fake":
+    logger.warning("🧪 PROVIDER_MODE=fake: LLM, ASR and translation calls are simulated.")
+
+
+def use_fake() -> bool:
+    return PROVIDER_MODE == "fake"
+
+
+def groq_client(api_key: str = None):
+    if use_fake():
+        from app.services.fake_providers import FakeGroqClient
+        return FakeGroqClient()
+    from groq import Groq
+    return Groq(api_key=api_key or os.getenv("GROQ_API_KEY"))
+
+
+def gemini_client(api_key: str = None):
+    if use_fake():
+        from app.services.fake_providers import FakeGeminiClient
+        return FakeGeminiClient()
+    from google import genai
+    return genai.Client(api_key=api_key)
+
+
+@lru_cache(maxsize=None)
+def legacy_genai():
+    """The google.generativeai module (or its fake)."""
+    if use_fake():
+        from app.services.fake_providers import FakeLegacyGenAI
+        return FakeLegacyGenAI()
+    import google.generativeai as genai
+    return genai
+
+
+def sarvam_http():
+    """Anything with a requests-compatible `.post`."""
+    if use_fake():
+        from app.services.fake_providers import FakeSarvamHTTP
+        return FakeSarvamHTTP()
+    import requests
+    return requests
+
+
+def google_translator(source: str = "auto", target: str = "en"):
+    if use_fake():
+        from app.services.fake_providers import FakeTranslator
+        return FakeTranslator(source=source, target=target)
+    from deep_translator import GoogleTranslator
+    return GoogleTranslator(source=source, target=target)
+
+
+def embeddings(model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
+    if use_fake():
+        from langchain_core.embeddings import DeterministicFakeEmbedding
+        return DeterministicFakeEmbedding(size=384)
+    from langchain_huggingface import HuggingFaceEmbeddings
+    return HuggingFaceEmbeddings(model_name=model_name)
+
+
+def make_chat_model(model: str, **kwargs):
+    """ChatGroq, or a LangChain-compatible fake that still fires callbacks."""
+    if use_fake():
+        from app.services.fake_providers import FakeChatModel
+        return FakeChatModel(model_name=model, callbacks=kwargs.get("callbacks"))
+    from langchain_groq import ChatGroq
+    return ChatGroq(model=model, **kwargs)
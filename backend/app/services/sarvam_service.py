@@ -1,14 +1,16 @@
 import os
-import requests
 import logging
 import base64
 from typing import Optional, List
 
+from app.services.providers import sarvam_http, use_fake
+
 logger = logging.getLogger(__name__)
 
 class SarvamService:
     def __init__(self):
-        self.api_key = os.getenv("SARVAM_API_KEY")
+        self.api_key = os.getenv("SARVAM_API_KEY") or ("fake" if use_fake() else None)
+        self.http = sarvam_http()
         self.base_url = "https://api.sarvam.ai"
 
         # Translate limit is 2000; we use 900 for a safe buffer and better translation context
@@ -108,7 +110,7 @@ class SarvamService:
         }
 
         try:
-            res = requests.post(url, json=payload, headers=self._headers(), timeout=30)
+            res = self.http.post(url, json=payload, headers=self._headers(), timeout=30)
             if res.status_code == 200:
                 return res.json().get("translated_text")
             
@@ -181,7 +183,7 @@ class SarvamService:
         }
 
         try:
-            res = requests.post(url, json=payload, headers=self._headers(), timeout=60)
+            res = self.http.post(url, json=payload, headers=self._headers(), timeout=60)
             if res.status_code == 200:
                 audios = res.json().get("audios", [])
                 if audios and audios[0]:
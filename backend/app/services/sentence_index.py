@@ -0,0 +1,131 @@
+import sys
+import logging
+from array import array
+from bisect import bisect_right
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models import Book, SentenceIndex
+from app.utils.preprocessing import segment_sentence_spans
+
+logger = logging.getLogger(__name__)
+
+Span = Tuple[int, int]
+
+
+# =========================================
+# ✅ PACKING (int32 start/end pairs)
+# =========================================
+def pack_spans(spans: Iterable[Span]) -> bytes:
+    packed = array("i")
+    for start, end in spans:
+        packed.append(start)
+        packed.append(end)
+    if sys.byteorder != "little":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def unpack_spans(blob: bytes) -> array:
+    packed = array("i")
+    packed.frombytes(blob or b"")
+    if sys.byteorder != "little":
+        packed.byteswap()
+    return packed
+
+
+# =========================================
+# ✅ READ API
+# =========================================
+class SentenceView:
+    """
+    O(1) access to the sentences of a text through its stored offsets.
+    Sentences are sliced from the text on demand, never copied up front.
+    """
+    __slots__ = ("text", "_offsets")
+
+    def __init__(self, text: str, offsets: array):
+        self.text = text
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) // 2
+
+    def span(self, i: int) -> Span:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("sentence index out of range")
+        return self._offsets[2 * i], self._offsets[2 * i + 1]
+
+    def sentence(self, i: int) -> str:
+        start, end = self.span(i)
+        return self.text[start:end]
+
+    def sentences(self, start: int = 0, stop: Optional[int] = None) -> List[str]:
+        stop = len(self) if stop is None else min(stop, len(self))
+        o = self._offsets
+        return [self.text[o[2 * i]:o[2 * i + 1]] for i in range(start, stop)]
+
+    def range_text(self, start: int, stop: int) -> str:
+        """Original text from sentence `start` through sentence `stop - 1`, one slice."""
+        stop = min(stop, len(self))
+        if start >= stop:
+            return ""
+        return self.text[self._offsets[2 * start]:self._offsets[2 * stop - 1]]
+
+    def sentence_at(self, char_offset: int) -> int:
+        """Index of the sentence containing (or preceding) a character offset."""
+        # Offsets interleave (start, end) and are sorted, so one bisect finds the pair
+        return max((bisect_right(self._offsets, char_offset) - 1) // 2, 0)
+
+    def window(self, max_chars: int, start: int = 0) -> str:
+        """Whole sentences from `start` fitting in `max_chars`; a longer first sentence is cut to the budget."""
+        if start >= len(self):
+            return ""
+        first = self._offsets[2 * start]
+        if self._offsets[2 * start + 1] - first > max_chars:
+            return self.text[first:first + max_chars]
+        lo, hi = start + 1, len(self)
+        # Ends are sorted: binary search the last sentence that still fits
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self._offsets[2 * mid - 1] - first <= max_chars:
+                lo = mid
+            else:
+                hi = mid - 1
+        return self.range_text(start, lo)
+
+    def spans(self) -> List[Span]:
+        o = self._offsets
+        return list(zip(o[0::2], o[1::2]))
+
+
+# =========================================
+# ✅ BUILD / LOAD
+# =========================================
+def build_sentence_index(db: Session, book: Book) -> SentenceIndex:
+    """Segments Book.extracted_text once and stores the offsets. The caller commits."""
+    text = book.extracted_text or ""
+    spans = segment_sentence_spans(text)
+
+    index = db.query(SentenceIndex).filter(SentenceIndex.book_id == book.book_id).first()
+    if index is None:
+        index = SentenceIndex(book_id=book.book_id)
+        db.add(index)
+    index.offsets = pack_spans(spans)
+    index.sentence_count = len(spans)
+    index.text_length = len(text)
+    logger.info(f"🔖 Sentence index for Book {book.book_id}: {len(spans)} sentences.")
+    return index
+
+
+def get_sentence_view(db: Session, book: Book) -> SentenceView:
+    """Loads the stored index; books from before the index (or edited since) are indexed now."""
+    text = book.extracted_text or ""
+    index = db.query(SentenceIndex).filter(SentenceIndex.book_id == book.book_id).first()
+    if index is None or index.text_length != len(text):
+        index = build_sentence_index(db, book)
+        db.commit()
+    return SentenceView(text, unpack_spans(index.offsets))
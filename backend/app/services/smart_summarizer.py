@@ -1,24 +1,83 @@
 import os
 import re
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from dotenv import load_dotenv
+from tenacity import retry, wait_exponential_jitter, stop_after_attempt
 
 # 1. Load Env
 load_dotenv()
 
 # --- IMPORTS ---
-from langchain_groq import ChatGroq
-# Use the new text splitter package
-from langchain_text_splitters import RecursiveCharacterTextSplitter 
 # Use Core prompts
 from langchain_core.prompts import PromptTemplate
 from langchain_core.documents import Document
 
+from app.utils.chunking import chunk_by_chars, count_chars
+from app.services.providers import use_fake
+from app.utils.rate_governor import governed_chat_groq
+from app.utils.preprocessing import iter_preprocessed_chunks
+
 # Setup LLM
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-if not GROQ_API_KEY:
+if not GROQ_API_KEY and not use_fake():
     raise ValueError("GROQ_API_KEY missing in .env")
 
-llm = ChatGroq(model="llama-3.3-70b-versatile", api_key=GROQ_API_KEY)
+# Every call waits on the shared Groq governor (requests/min + tokens/min)
+llm = governed_chat_groq("llama-3.3-70b-versatile", api_key=GROQ_API_KEY)
+
+# Map-stage parallelism; the provider quota itself is enforced by the governor
+MAP_MAX_CONCURRENCY = int(os.getenv("SMART_SUMMARY_MAX_CONCURRENCY", 4))
+
+# Reduce-stage budget: the most summary text (in tokens) sent to one merge call
+REDUCE_TOKEN_BUDGET = int(os.getenv("SMART_SUMMARY_REDUCE_TOKEN_BUDGET", 6000))
+MAX_REDUCE_LEVELS = 8
+
+logger = logging.getLogger(__name__)
+
+@retry(wait=wait_exponential_jitter(initial=2, max=30), stop=stop_after_attempt(4), reraise=True)
+def invoke_llm(prompt: str) -> str:
+    """Single rate-limited LLM call. Retried on its own so one bad chunk doesn't redo the book."""
+    return llm.invoke(prompt).content
+
+def parallel_map(func, items, max_workers: int = MAP_MAX_CONCURRENCY, on_done=None):
+    """
+    Runs func over items on a bounded thread pool.
+    Results come back in input order; on_done(done_count, total) reports progress.
+    `items` may be a lazy iterable (e.g. a chunk stream): work starts on the first
+    item, at most 2 x max_workers are pulled ahead, and `total` is the count
+    seen so far until the source is exhausted.
+    """
+    source = iter(items)
+    sized = hasattr(items, "__len__")
+    max_workers = max(1, min(max_workers, len(items))) if sized and len(items) else max(1, max_workers)
+
+    results = {}
+    pending = {}
+    submitted = done = 0
+    exhausted = False
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while True:
+            while not exhausted and len(pending) < 2 * max_workers:
+                try:
+                    item = next(source)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending[pool.submit(func, item)] = submitted
+                submitted += 1
+            if not pending:
+                break
+
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                results[pending.pop(future)] = future.result()
+                done += 1
+                if on_done:
+                    on_done(done, len(items) if sized else submitted)
+    return [results[i] for i in range(submitted)]
 
 def clean_text(text):
     """Task 12: Formatting enhancements"""
@@ -42,34 +101,109 @@ def extract_keywords(text):
     except:
         return "General, Summary"
 
-def custom_map_reduce(docs, length, style, detail_level):
-    """
-    Manually implements Map-Reduce to avoid import errors.
-    1. Map: Summarize each chunk.
-    2. Reduce: Summarize the combined summaries.
-    """
-    
-    # --- STEP 1: MAP (Summarize Chunks) ---
-    map_template = """
+map_prompt = PromptTemplate.from_template("""
     Summarize the following text chunk concisely:
     
     TEXT:
     {text}
-    """
-    map_prompt = PromptTemplate.from_template(map_template)
+    """)
+
+partial_prompt = PromptTemplate.from_template("""
+    Merge the following summaries of consecutive parts of a book into one
+    concise summary. Keep every important fact, name and event.
     
-    chunk_summaries = []
-    print(f"📚 Processing {len(docs)} chunks...")
+    SUMMARIES TO MERGE:
+    {text}
+    """)
+
+book_prompt = PromptTemplate.from_template("""
+    You are an expert editor. Write a complete, well-organized summary of the
+    whole book from the section summaries below.
+    
+    SECTION SUMMARIES:
+    {text}
+    
+    BOOK SUMMARY:
+    """)
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 chars per token for English) used for batching."""
+    return max(1, len(text) // 4)
+
+def batch_by_tokens(texts, budget: int = REDUCE_TOKEN_BUDGET):
+    """Greedily groups consecutive texts so each batch stays within the token budget."""
+    batches, current, used = [], [], 0
+    for t in texts:
+        n = estimate_tokens(t)
+        if current and used + n > budget:
+            batches.append(current)
+            current, used = [], 0
+        current.append(t)
+        used += n
+    if current:
+        batches.append(current)
+    return batches
+
+def tree_reduce(summaries, final_merge, partial_merge, budget: int = REDUCE_TOKEN_BUDGET, levels=None):
+    """
+    Hierarchical reduce: merges token-budgeted batches level by level (in parallel
+    within a level) until everything fits in one final_merge call.
+    If `levels` is a list, each intermediate level's summaries are appended to it.
+    """
+    summaries = list(summaries)
+    level = 1
+
+    while sum(estimate_tokens(s) for s in summaries) > budget and len(summaries) > 1:
+        if level > MAX_REDUCE_LEVELS:
+            logger.warning(f"⚠️ Tree reduce hit {MAX_REDUCE_LEVELS} levels; merging what remains.")
+            break
+
+        batches = batch_by_tokens(summaries, budget)
+        tokens_in = sum(estimate_tokens(s) for s in summaries)
+        start = time.perf_counter()
+
+        summaries = parallel_map(lambda batch: partial_merge("\n\n".join(batch)), batches)
+        if levels is not None:
+            levels.append(list(summaries))
+
+        tokens_out = sum(estimate_tokens(s) for s in summaries)
+        logger.info(
+            f"🌲 Reduce level {level}: {sum(len(b) for b in batches)} summaries -> {len(summaries)} "
+            f"({tokens_in} -> {tokens_out} tokens) "
+            f"in {time.perf_counter() - start:.2f}s"
+        )
+        level += 1
+        # Another round would cost as many LLM calls and shrink nothing: merge what we have
+        if tokens_out >= tokens_in:
+            logger.warning(f"⚠️ Reduce level {level - 1} did not shrink the input; merging what remains.")
+            break
+
+    start = time.perf_counter()
+    combined = "\n\n".join(summaries)
+    result = final_merge(combined)
+    logger.info(
+        f"🌲 Final reduce (level {level}): {len(summaries)} summaries, "
+        f"{estimate_tokens(combined)} tokens in {time.perf_counter() - start:.2f}s"
+    )
+    return result
+
+def custom_map_reduce(docs, length, style, detail_level, on_progress=None):
+    """
+    Manually implements Map-Reduce to avoid import errors.
+    1. Map: Summarize each chunk (concurrently, order preserved).
+    2. Reduce: Merge summaries level by level until one remains.
+    """
     
-    for doc in docs:
-        # Invoke LLM directly for each chunk
-        formatted_prompt = map_prompt.format(text=doc.page_content)
-        response = llm.invoke(formatted_prompt)
-        chunk_summaries.append(response.content)
-
-    # --- STEP 2: REDUCE (Merge) ---
-    combined_summaries = "\n\n".join(chunk_summaries)
+    # --- STEP 1: MAP (Summarize Chunks) ---
+    print(f"📚 Processing chunks (max {MAP_MAX_CONCURRENCY} in flight)...")
     
+    chunk_summaries = parallel_map(
+        lambda doc: invoke_llm(map_prompt.format(text=doc.page_content)),
+        docs,
+        on_done=on_progress,
+    )
+
+    # --- STEP 2: REDUCE (Tree merge, token-budgeted) ---
     reduce_template = f"""
     You are an expert editor. Merge the following summaries into one final result.
     
@@ -85,23 +219,57 @@ def custom_map_reduce(docs, length, style, detail_level):
     """
     reduce_prompt = PromptTemplate.from_template(reduce_template)
     
-    # Invoke LLM for the final merge
-    formatted_reduce_prompt = reduce_prompt.format(text=combined_summaries)
-    final_response = llm.invoke(formatted_reduce_prompt)
-    
-    return final_response.content
+    return tree_reduce(
+        chunk_summaries,
+        final_merge=lambda text: invoke_llm(reduce_prompt.format(text=text)),
+        partial_merge=lambda text: invoke_llm(partial_prompt.format(text=text)),
+    )
+
+def split_into_docs(text: str, spans=None):
+    index = chunk_by_chars(text, 6000, 400, spans=spans)
+    return [
+        Document(page_content=chunk.text, metadata={"start_char": chunk.start, "end_char": chunk.end})
+        for chunk in index
+    ]
+
+def iter_docs(source):
+    """Streaming split_into_docs: chunks are yielded while the text is still being segmented."""
+    for chunk in iter_preprocessed_chunks(source, 6000, 400, counter=count_chars, clean=False):
+        yield Document(
+            page_content=chunk["text"],
+            metadata={"start_char": chunk["start_char"], "end_char": chunk["end_char"]},
+        )
+
+def build_summary_tree(text: str, on_progress=None, spans=None):
+    """
+    Builds the multi-resolution tree stored per book:
+    [chunk summaries, section summaries..., [book summary]].
+    Any length/style can later be served from these nodes without an LLM call.
+    """
+    # Stored sentence offsets make chunking a single pass; otherwise stream it
+    docs = split_into_docs(text, spans) if spans is not None else iter_docs(text)
+    chunk_summaries = parallel_map(
+        lambda doc: invoke_llm(map_prompt.format(text=doc.page_content)),
+        docs,
+        on_done=on_progress,
+    )
+
+    levels = [chunk_summaries]
+    root = tree_reduce(
+        chunk_summaries,
+        final_merge=lambda t: invoke_llm(book_prompt.format(text=t)),
+        partial_merge=lambda t: invoke_llm(partial_prompt.format(text=t)),
+        levels=levels,
+    )
+    levels.append([clean_text(root)])
+    return levels
 
 def generate_smart_summary(text: str, length: str, style: str, detail_level: str):
     """
     Task 11 & 12: Smart Summarization
     """
-    # 1. Chunking
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=6000, 
-        chunk_overlap=400,
-        separators=["\n\n", "\n", ". ", " "]
-    )
-    docs = text_splitter.create_documents([text])
+    # 1. Chunking (streamed into the map stage)
+    docs = iter_docs(text)
     
     # 2. Run Manual Map-Reduce (Bypassing broken chain import)
     raw_summary = custom_map_reduce(docs, length, style, detail_level)
@@ -1,17 +1,28 @@
 import os
 import time
-import re
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Iterator
 
 from google import genai
 from google.genai.errors import ClientError
 from tenacity import retry, wait_exponential_jitter, stop_after_attempt, retry_if_exception_type
 
-from app.utils.postprocessing import clean_formatting, extract_local_keywords
+from app.utils.postprocessing import clean_formatting, extract_local_keywords, is_bullet_style, reshape_summary
+from app.services.providers import gemini_client, use_fake
+from app.utils.rate_governor import governed
+from app.utils.stage_timer import stage
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever the prompt or post-processing changes so cached summaries are not reused.
+PROMPT_VERSION = "v1"
+# Output budget reserved against the tokens/min quota until real usage is known
+GEMINI_OUTPUT_TOKENS = 8192
+
+def _total_tokens(response) -> Optional[int]:
+    metadata = getattr(response, "usage_metadata", None)
+    return getattr(metadata, "total_token_count", None) if metadata else None
+
 def wait_for_files_active(client: genai.Client, files, timeout_seconds: int = 180):
     logger.info("⏳ Gemini performing OCR/Analysis...")
     start = time.time()
@@ -43,10 +54,10 @@ class SummarizerService:
 
     def _initialize_api(self) -> None:
         self.api_key = os.getenv("GEMINI_API_KEY")
-        if not self.api_key:
+        if not self.api_key and not use_fake():
             raise RuntimeError("GEMINI_API_KEY is missing from .env")
 
-        self.client = genai.Client(api_key=self.api_key)
+        self.client = gemini_client(self.api_key)
 
         # ✅ Get primary and fallback from .env
         raw_model = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
@@ -57,6 +68,64 @@ class SummarizerService:
 
         logger.info(f"✅ Gemini API Initialized (Primary: {self.model_name}, Fallback: {self.fallback_model})")
 
+    # ------------------------------------------------------------------
+    # SHARED STEPS
+    # ------------------------------------------------------------------
+    def _build_prompt(self, length_option: str, style: str) -> str:
+        if is_bullet_style(style):
+            style_instruction = (
+                "Format the summary as a vertical list of bullet points. "
+                "Each bullet MUST start with '- ' on a NEW LINE. "
+                "Each bullet should ideally be one sentence. "
+                "Do not use paragraphs."
+            )
+        else:
+            style_instruction = (
+                "Format the summary as cohesive paragraphs. "
+                "Do not use bullet points, dashes, or lists."
+            )
+
+        return (
+            "Summarize the provided document accurately.\n"
+            f"Desired Length: {length_option}\n"
+            f"{style_instruction}\n"
+            "Provide only the summary text."
+        )
+
+    def _upload_file(self, file_path: str):
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"Invalid file path: {file_path}")
+        with stage("gemini_upload"):
+            return self.client.files.upload(file=file_path)
+
+    def _wait_active(self, uploaded_file) -> None:
+        with stage("ocr_wait"):
+            wait_for_files_active(self.client, [uploaded_file])
+
+    def _polish(self, raw_text: str, style: str) -> Dict[str, Any]:
+        with stage("postprocessing"):
+            polished_text = clean_formatting(raw_text).strip()
+
+            # Strict Reconstruction
+            polished_text = reshape_summary(polished_text, style)
+
+            keywords = extract_local_keywords(polished_text) or ""
+        return {
+            "summary_text": polished_text,
+            "keywords": [k.strip() for k in keywords.split(",") if k.strip()],
+            "status": "completed",
+        }
+
+    def _delete_file(self, uploaded_file) -> None:
+        if uploaded_file:
+            try:
+                self.client.files.delete(name=uploaded_file.name)
+            except Exception:
+                pass
+
+    # ------------------------------------------------------------------
+    # ONE-SHOT GENERATION (job worker)
+    # ------------------------------------------------------------------
     @retry(
         wait=wait_exponential_jitter(initial=10, max=120),
         stop=stop_after_attempt(3),
@@ -72,83 +141,75 @@ class SummarizerService:
         uploaded_file = None
 
         try:
-            if not os.path.exists(file_path):
-                raise FileNotFoundError(f"Invalid file path: {file_path}")
-
             # 1) Upload + OCR wait
-            uploaded_file = self.client.files.upload(file=file_path)
-            wait_for_files_active(self.client, [uploaded_file])
+            uploaded_file = self._upload_file(file_path)
+            self._wait_active(uploaded_file)
 
-            # 2) Style normalize
+            # 2) Prompt
             style_norm = (style or "paragraph").strip().lower()
-            is_bullet_mode = style_norm in {"bullet", "bullets", "bullet points", "bullet_points"}
-
-            # 3) Prompt
-            if is_bullet_mode:
-                style_instruction = (
-                    "Format the summary as a vertical list of bullet points. "
-                    "Each bullet MUST start with '- ' on a NEW LINE. "
-                    "Each bullet should ideally be one sentence. "
-                    "Do not use paragraphs."
-                )
-            else:
-                style_instruction = (
-                    "Format the summary as cohesive paragraphs. "
-                    "Do not use bullet points, dashes, or lists."
-                )
+            prompt = self._build_prompt(length_option, style_norm)
 
-            prompt = (
-                "Summarize the provided document accurately.\n"
-                f"Desired Length: {length_option}\n"
-                f"{style_instruction}\n"
-                "Provide only the summary text."
-            )
-
-            # 4) Generate
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=[uploaded_file, prompt],
-            )
+            # 3) Generate (waits on the shared Gemini governor)
+            with stage("generation"):
+                with governed("gemini", self.model_name, prompt, max_output_tokens=GEMINI_OUTPUT_TOKENS) as usage:
+                    response = self.client.models.generate_content(
+                        model=self.model_name,
+                        contents=[uploaded_file, prompt],
+                    )
+                    usage.tokens = _total_tokens(response)
 
-            raw_text = getattr(response, "text", "") or ""
-            polished_text = clean_formatting(raw_text).strip()
-
-            # 5) Strict Reconstruction
-            if is_bullet_mode:
-                raw_points = re.split(r"\n|(?<=\s)[-•*]\s", polished_text)
-                bullets = []
-                for pt in raw_points:
-                    clean_pt = pt.strip().lstrip("-*• ").strip()
-                    if clean_pt:
-                        bullets.append(clean_pt)
-                polished_text = "\n".join([f"- {b}" for b in bullets]).strip()
-            else:
-                paragraphs = [p.strip() for p in polished_text.split("\n\n") if p.strip()]
-                clean_paragraphs = []
-                for p in paragraphs:
-                    lines = [line.strip() for line in p.splitlines() if line.strip()]
-                    lines = [ln.lstrip("-*• ").strip() for ln in lines]
-                    flattened = " ".join(lines).strip()
-                    if flattened:
-                        clean_paragraphs.append(flattened)
-                polished_text = "\n\n".join(clean_paragraphs).strip()
-
-            return {
-                "summary_text": polished_text,
-                "keywords": extract_local_keywords(polished_text) or [],
-                "status": "completed",
-            }
+            # 4) Clean + reconstruct
+            return self._polish(getattr(response, "text", "") or "", style_norm)
 
         except Exception as e:
             logger.error(f"Summarizer Error: {str(e)}", exc_info=True)
             return {"summary_text": f"Error: {str(e)}", "keywords": [], "status": "failed"}
 
         finally:
-            if uploaded_file:
-                try:
-                    self.client.files.delete(name=uploaded_file.name)
-                except Exception:
-                    pass
+            self._delete_file(uploaded_file)
+
+    # ------------------------------------------------------------------
+    # STREAMING GENERATION (SSE endpoint)
+    # ------------------------------------------------------------------
+    def stream_summary(
+        self,
+        file_path: str,
+        length_option: str = "medium",
+        style: str = "paragraph",
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yields progress events while the summary is produced:
+        uploaded -> ocr_active -> token (one per streamed chunk) -> done.
+        Errors propagate to the caller.
+        """
+        uploaded_file = None
+        try:
+            uploaded_file = self._upload_file(file_path)
+            yield {"event": "progress", "stage": "uploaded"}
+
+            self._wait_active(uploaded_file)
+            yield {"event": "progress", "stage": "ocr_active"}
+
+            style_norm = (style or "paragraph").strip().lower()
+            prompt = self._build_prompt(length_option, style_norm)
+
+            parts = []
+            with governed("gemini", self.model_name, prompt, max_output_tokens=GEMINI_OUTPUT_TOKENS) as usage:
+                stream = self.client.models.generate_content_stream(
+                    model=self.model_name,
+                    contents=[uploaded_file, prompt],
+                )
+                for i, chunk in enumerate(stream, start=1):
+                    usage.tokens = _total_tokens(chunk) or usage.tokens
+                    text = getattr(chunk, "text", "") or ""
+                    if text:
+                        parts.append(text)
+                        yield {"event": "token", "text": text, "chunk": i}
+
+            yield {"event": "done", **self._polish("".join(parts), style_norm)}
+
+        finally:
+            self._delete_file(uploaded_file)
 
 # --- THE FIX: Define the instance with the exact name the router expects ---
 summarizer_service = SummarizerService()
@@ -0,0 +1,192 @@
+import os
+import hashlib
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Optional
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models import SummaryCacheEntry
+
+logger = logging.getLogger(__name__)
+
+# Entries older than the TTL are treated as misses and pruned on the next write.
+CACHE_TTL_HOURS = int(os.getenv("SUMMARY_CACHE_TTL_HOURS", 24 * 30))
+# Hard cap on stored entries; least recently used rows are evicted first.
+CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", 5000))
+
+
+# =========================================
+# ✅ KEY HELPERS
+# =========================================
+def file_sha256(file_path: str, block_size: int = 1024 * 1024) -> str:
+    """Hashes a file in fixed-size blocks so large uploads never sit in memory."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def make_cache_key(
+    content_hash: str,
+    length_option: str,
+    style: str,
+    model_name: str,
+    prompt_version: str,
+) -> str:
+    """Builds the cache key. Settings are normalized so 'Medium' and 'medium' share an entry."""
+    parts = [
+        content_hash,
+        (length_option or "").strip().lower(),
+        (style or "").strip().lower(),
+        (model_name or "").strip().lower(),
+        prompt_version or "",
+    ]
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite hands back naive datetimes; Postgres returns aware ones.
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+# =========================================
+# ✅ CACHE
+# =========================================
+class SummaryCache:
+    def __init__(self, ttl_hours: int = CACHE_TTL_HOURS, max_entries: int = CACHE_MAX_ENTRIES):
+        self.ttl = timedelta(hours=ttl_hours)
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, db: Session, cache_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns a result shaped like SummarizerService.generate_summary, or None on a miss.
+        Hit bookkeeping is flushed with the caller's transaction.
+        """
+        entry = db.query(SummaryCacheEntry).filter(SummaryCacheEntry.cache_key == cache_key).first()
+
+        created = _as_utc(entry.created_at) if entry else None
+        if created and datetime.now(timezone.utc) - created > self.ttl:
+            entry = None
+
+        if not entry:
+            self._record(hit=False)
+            return None
+
+        entry.hit_count = (entry.hit_count or 0) + 1
+        entry.last_hit_at = datetime.now(timezone.utc)
+        self._record(hit=True)
+
+        return {
+            "summary_text": entry.summary_text,
+            "keywords": [k for k in (entry.keywords or "").split(",") if k],
+            "status": "completed",
+            "cached": True,
+        }
+
+    def put(
+        self,
+        db: Session,
+        cache_key: str,
+        content_hash: str,
+        length_option: str,
+        style: str,
+        model_name: str,
+        prompt_version: str,
+        summary_text: str,
+        keywords: list,
+    ) -> None:
+        """Stores a finished summary. Commits on its own so a lost race never breaks the caller."""
+        entry = SummaryCacheEntry(
+            cache_key=cache_key,
+            content_hash=content_hash,
+            length_setting=length_option,
+            style_setting=style,
+            model_name=model_name,
+            prompt_version=prompt_version,
+            summary_text=summary_text,
+            keywords=",".join(keywords or []),
+            last_hit_at=datetime.now(timezone.utc),
+        )
+        try:
+            # Replace an expired row with the same key instead of colliding with it.
+            db.query(SummaryCacheEntry).filter(SummaryCacheEntry.cache_key == cache_key).delete(
+                synchronize_session=False
+            )
+            db.add(entry)
+            db.commit()
+        except IntegrityError:
+            # Another worker cached the same key first; theirs is just as good.
+            db.rollback()
+            return
+
+        self.evict(db)
+
+    def evict(self, db: Session) -> int:
+        """Drops expired entries, then trims the least recently used rows over the cap."""
+        cutoff = datetime.now(timezone.utc) - self.ttl
+        removed = (
+            db.query(SummaryCacheEntry)
+            .filter(SummaryCacheEntry.created_at < cutoff)
+            .delete(synchronize_session=False)
+        )
+
+        overflow = db.query(func.count(SummaryCacheEntry.cache_id)).scalar() - self.max_entries
+        if overflow > 0:
+            stale_ids = [
+                row.cache_id
+                for row in db.query(SummaryCacheEntry.cache_id)
+                .order_by(func.coalesce(SummaryCacheEntry.last_hit_at, SummaryCacheEntry.created_at))
+                .limit(overflow)
+            ]
+            removed += (
+                db.query(SummaryCacheEntry)
+                .filter(SummaryCacheEntry.cache_id.in_(stale_ids))
+                .delete(synchronize_session=False)
+            )
+
+        db.commit()
+        if removed:
+            with self._lock:
+                self.evictions += removed
+            logger.info(f"🧹 Summary cache evicted {removed} entries.")
+        return removed
+
+    def stats(self, db: Optional[Session] = None) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            data = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "ttl_hours": self.ttl.total_seconds() / 3600,
+                "max_entries": self.max_entries,
+            }
+        if db is not None:
+            data["entries"] = db.query(func.count(SummaryCacheEntry.cache_id)).scalar()
+        return data
+
+
+# Singleton Instance
+summary_cache = SummaryCache()
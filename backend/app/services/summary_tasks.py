@@ -0,0 +1,154 @@
+import os
+import logging
+from typing import NamedTuple, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models import Book, Summary, ProcessingJob
+from app.services.job_queue import heartbeat
+from app.services.summarizer_service import summarizer_service, PROMPT_VERSION
+from app.services.summary_cache import summary_cache, make_cache_key
+from app.services.upload_store import content_hash_of
+from app.services.summary_tree import save_tree
+from app.services.extractive_summarizer import summarize_extractive
+from app.services.sentence_index import get_sentence_view
+from app.services.audit_log import log_action
+from app.services import analytics_rollup
+from app.utils.stage_timer import stage
+
+logger = logging.getLogger(__name__)
+
+# Serve a local TextRank summary when every Gemini attempt has failed
+EXTRACTIVE_FALLBACK = os.getenv("EXTRACTIVE_FALLBACK", "true").lower() in ("1", "true", "yes")
+
+
+class CacheLookup(NamedTuple):
+    """Result of a cache probe; key/hash are kept so a miss can be stored later."""
+    cache_key: Optional[str] = None
+    content_hash: Optional[str] = None
+    result: Optional[dict] = None
+
+
+def lookup_cached_summary(db: Session, book: Book, length: str, format: str) -> CacheLookup:
+    """Content-addressed cache: same bytes + same settings => no Gemini call."""
+    if not book.file_path or not os.path.exists(book.file_path):
+        return CacheLookup()
+
+    # Content-addressed uploads carry their hash in the file name: no re-read
+    content_hash = content_hash_of(book.file_path)
+    cache_key = make_cache_key(
+        content_hash, length, format, summarizer_service.model_name, PROMPT_VERSION
+    )
+    return CacheLookup(cache_key, content_hash, summary_cache.get(db, cache_key))
+
+
+def save_summary_result(
+    db: Session,
+    book: Book,
+    length: str,
+    format: str,
+    result: dict,
+    lookup: CacheLookup = None,
+) -> Summary:
+    """Writes the Summary row, completes the book and caches fresh results."""
+    summary_text = result.get("summary_text", "")
+    keywords_list = result.get("keywords", []) or []
+
+    new_summary = Summary(
+        book_id=book.book_id,
+        user_id=book.user_id,
+        summary_text=summary_text,
+        keywords=",".join(keywords_list),
+        length_setting=length,
+        style_setting=format
+    )
+    db.add(new_summary)
+    log_action(db, book.user_id, "SUMMARIZE", f"Summarized '{book.title}' ({length}, {format})")
+    analytics_rollup.bump(db, summaries_generated=1)
+
+    book.status = "completed"
+    db.commit()
+
+    # Remember fresh results for the next identical request
+    if lookup and lookup.cache_key and not result.get("cached"):
+        summary_cache.put(
+            db,
+            cache_key=lookup.cache_key,
+            content_hash=lookup.content_hash,
+            length_option=length,
+            style=format,
+            model_name=summarizer_service.model_name,
+            prompt_version=PROMPT_VERSION,
+            summary_text=summary_text,
+            keywords=keywords_list,
+        )
+    return new_summary
+
+
+def run_summarization_task(db: Session, job: ProcessingJob) -> None:
+    """
+    Job handler for kind="summary". Raises on failure so the queue can retry;
+    the queue marks the book failed once attempts are exhausted.
+    """
+    book_id = job.book_id
+    length = job.length_setting
+    format = job.style_setting
+    logger.info(f"🏗️ [Worker] Processing Book {book_id} (job {job.job_id})...")
+
+    # 1) Fetch book
+    book = db.query(Book).filter(Book.book_id == book_id).first()
+    if not book:
+        raise LookupError(f"Book {book_id} not found.")
+
+    if not book.file_path:
+        raise ValueError(f"Book {book_id} missing file_path.")
+
+    # 2) Cache probe
+    with stage("cache_lookup"):
+        lookup = lookup_cached_summary(db, book, length, format)
+    result = lookup.result
+    if result:
+        logger.info(f"⚡ [Worker] Cache hit for Book {book_id}.")
+
+    # 3) Call summarizer service on a miss (✅ uses file_path)
+    if result is None:
+        heartbeat(db, job)
+        result = summarizer_service.generate_summary(
+            file_path=book.file_path,
+            length_option=length,
+            style=format
+        )
+
+    # Providers exhausted (rate limits / outage): fall back to the local engine
+    if result.get("status") != "completed" and EXTRACTIVE_FALLBACK and job.attempts >= job.max_attempts and book.extracted_text:
+        logger.warning(f"⚠️ [Worker] Gemini failed for Book {book_id}; using extractive fallback.")
+        spans = get_sentence_view(db, book).spans()
+        result = summarize_extractive(book.extracted_text, length, format, spans)
+
+    if result.get("status") != "completed":
+        raise RuntimeError(result.get("summary_text") or "Summary generation failed")
+
+    # 4) Save summary + update book status
+    with stage("db_commit"):
+        save_summary_result(db, book, length, format, result, lookup)
+    logger.info(f"✅ [Worker] Book {book_id} Summarization Complete.")
+
+
+def build_summary_tree_task(db: Session, job: ProcessingJob) -> None:
+    """Job handler for kind="tree": builds and persists the book's multi-resolution tree."""
+    # Imported here: pulls in the Groq client
+    from app.services.smart_summarizer import build_summary_tree
+
+    book = db.query(Book).filter(Book.book_id == job.book_id).first()
+    if not book:
+        raise LookupError(f"Book {job.book_id} not found.")
+    if not book.extracted_text:
+        raise ValueError(f"Book {job.book_id} has no extracted text.")
+
+    heartbeat(db, job)
+    with stage("generation"):
+        levels = build_summary_tree(book.extracted_text, spans=get_sentence_view(db, book).spans())
+    with stage("db_commit"):
+        save_tree(db, book.book_id, levels)
+        db.commit()
+    logger.info(f"🌲 [Worker] Summary tree for Book {book.book_id}: {[len(l) for l in levels]} nodes per level.")
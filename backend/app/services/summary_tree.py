@@ -0,0 +1,64 @@
+import re
+import logging
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models import SummaryTree
+from app.utils.postprocessing import is_bullet_style, reshape_summary
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_TREE_MODEL = "llama-3.3-70b-versatile"
+
+
+def get_tree(db: Session, book_id: int) -> Optional[SummaryTree]:
+    return db.query(SummaryTree).filter(SummaryTree.book_id == book_id).first()
+
+
+def save_tree(db: Session, book_id: int, levels: List[List[str]]) -> SummaryTree:
+    """Creates or replaces the book's tree. The caller commits."""
+    tree = get_tree(db, book_id)
+    if tree is None:
+        tree = SummaryTree(book_id=book_id)
+        db.add(tree)
+    tree.levels = levels
+    tree.chunk_count = len(levels[0]) if levels else 0
+    tree.model_name = SUMMARY_TREE_MODEL
+    return tree
+
+
+def pick_level(levels: List[List[str]], length: str) -> List[str]:
+    """
+    short  -> book summary (root)
+    medium -> section summaries (the level just below the root, if the book has one)
+    long   -> chunk summaries (the leaves)
+    """
+    length_norm = (length or "medium").strip().lower()
+    if length_norm == "long":
+        return levels[0]
+    if length_norm == "medium" and len(levels) > 2:
+        return levels[-2]
+    return levels[-1]
+
+
+def render_summary(levels: List[List[str]], length: str, style: str) -> str:
+    """Serves any length/style from stored nodes; a local reformat, no LLM call."""
+    nodes = [n.strip() for n in pick_level(levels, length) if n and n.strip()]
+    if is_bullet_style(style):
+        # One bullet per sentence across the chosen nodes
+        sentences = [s for n in nodes for s in re.split(r"(?<=[.!?])\s+", n) if s.strip()]
+        return reshape_summary("\n".join(sentences), style)
+    return reshape_summary("\n\n".join(nodes), style)
+
+
+def describe_tree(tree: SummaryTree) -> dict:
+    return {
+        "book_id": tree.book_id,
+        "chunk_count": tree.chunk_count,
+        "depth": len(tree.levels or []),
+        "level_sizes": [len(level) for level in (tree.levels or [])],
+        "model_name": tree.model_name,
+        "created_at": tree.created_at,
+        "levels": tree.levels,
+    }
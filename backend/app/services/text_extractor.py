@@ -1,9 +1,9 @@
 import os
 import re
-import PyPDF2
-import pdfplumber
 import docx
 
+from app.services.pdf_extractor import extract_pages
+
 # --------------------------------------------------
 # BASIC CLEANING
 # --------------------------------------------------
@@ -36,34 +36,14 @@ def extract_from_txt(file_path: str) -> str:
 # PDF EXTRACTOR
 # --------------------------------------------------
 def extract_from_pdf(file_path: str) -> str:
-    """Extracts text from PDF. Uses PyPDF2 first, falls back to pdfplumber."""
-    text = ""
-
-    # ---- METHOD 1: PyPDF2 (Fast) ----
+    """
+    Extracts text from PDF in a single PyMuPDF pass; only pages whose text
+    looks broken are re-read with pdfplumber (see pdf_extractor.page_issue).
+    """
     try:
-        with open(file_path, "rb") as f:
-            reader = PyPDF2.PdfReader(f)
-
-            if reader.is_encrypted:
-                raise ValueError("PDF is password protected.")
-
-            for page in reader.pages:
-                t = page.extract_text()
-                if t:
-                    text += t + "\n"
-    except Exception:
-        pass  # fallback below
-
-    # ---- METHOD 2: pdfplumber (More accurate) ----
-    if not text.strip():
-        try:
-            with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    t = page.extract_text()
-                    if t:
-                        text += t + "\n"
-        except Exception as e:
-            raise ValueError(f"PDF extraction failed: {str(e)}")
+        text = "\n".join(t for t in extract_pages(file_path) if t)
+    except Exception as e:
+        raise ValueError(f"PDF extraction failed: {str(e)}")
 
     # Detect scanned PDFs → no text
     if not text.strip():
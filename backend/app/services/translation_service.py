@@ -1,6 +1,7 @@
-from deep_translator import GoogleTranslator
 import logging
 
+from app.services.providers import google_translator
+
 logger = logging.getLogger(__name__)
 
 def translate_text(text: str, target_lang: str):
@@ -27,7 +28,7 @@ def translate_text(text: str, target_lang: str):
             else:
                 clean = "zh-CN"
 
-        translator = GoogleTranslator(source="auto", target=clean)
+        translator = google_translator(source="auto", target=clean)
 
         # ✅ Safety chunking (Google works best under ~2000 chars)
         max_chunk_size = 2000
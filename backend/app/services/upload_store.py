@@ -0,0 +1,177 @@
+import os
+import re
+import uuid
+import hashlib
+import logging
+from typing import Callable, NamedTuple, Optional
+
+from fastapi import Request, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+
+from app.services.summary_cache import file_sha256
+
+logger = logging.getLogger(__name__)
+
+# =========================================
+# ✅ CONFIGURATION
+# =========================================
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+MAX_UPLOAD_MB = float(os.getenv("MAX_UPLOAD_MB", 50))
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+# Room for the multipart boundaries and the small form fields next to the file
+FORM_OVERHEAD_BYTES = 64 * 1024
+
+# Extensions we accept, and the content they must actually start with
+SUPPORTED_TYPES = (".pdf", ".docx", ".txt")
+
+_HASHED_NAME = re.compile(r"^[0-9a-f]{64}$")
+
+
+class UploadRejected(ValueError):
+    """Upload refused before it was stored; `status_code` is the HTTP status to answer with."""
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class StoredUpload(NamedTuple):
+    file_path: str
+    content_hash: str
+    size: int
+    duplicate: bool  # the same bytes were already stored
+
+
+# =========================================
+# ✅ CONTENT SNIFFING
+# =========================================
+def sniff_type(head: bytes) -> Optional[str]:
+    """Extension matching the file's leading bytes, or None when it is none of ours."""
+    if b"%PDF-" in head[:1024]:  # the header may follow a little junk
+        return ".pdf"
+    if head.startswith(b"PK\x03\x04"):
+        return ".docx"
+    if head and b"\x00" not in head:
+        return ".txt"
+    return None
+
+
+def _check_type(filename: str, head: bytes) -> str:
+    ext = os.path.splitext(filename or "")[1].lower()
+    if ext not in SUPPORTED_TYPES:
+        raise UploadRejected(f"Unsupported file type '{ext or filename}'. Allowed: PDF, DOCX, TXT.")
+    detected = sniff_type(head)
+    if detected != ext:
+        raise UploadRejected(f"File content does not look like a {ext[1:].upper()} file.")
+    return ext
+
+
+# =========================================
+# ✅ CONTENT-ADDRESSED STORAGE
+# =========================================
+def stored_path(content_hash: str, ext: str) -> str:
+    """uploads/ab/abcdef....pdf: identical bytes share one file, different bytes never collide."""
+    return os.path.join(UPLOAD_DIR, content_hash[:2], content_hash + ext)
+
+
+def content_hash_of(file_path: str) -> str:
+    """SHA-256 of a stored file; free for content-addressed paths, hashed otherwise."""
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    if _HASHED_NAME.match(stem):
+        return stem
+    return file_sha256(file_path)
+
+
+def _open_part() -> tuple:
+    incoming = os.path.join(UPLOAD_DIR, ".incoming")
+    os.makedirs(incoming, exist_ok=True)
+    path = os.path.join(incoming, f"{uuid.uuid4().hex}.part")
+    return path, open(path, "wb")
+
+
+def _write(out, digest, chunk: bytes) -> None:
+    digest.update(chunk)
+    out.write(chunk)
+
+
+def _commit(part_path: str, final_path: str) -> bool:
+    """Moves the finished upload into place; False when the content was already stored."""
+    os.makedirs(os.path.dirname(final_path), exist_ok=True)
+    if os.path.exists(final_path):
+        os.remove(part_path)
+        return False
+    os.replace(part_path, final_path)
+    return True
+
+
+def _discard(out, part_path: str) -> None:
+    out.close()
+    if os.path.exists(part_path):
+        os.remove(part_path)
+
+
+def max_upload_bytes() -> int:
+    return int(MAX_UPLOAD_MB * 1024 * 1024)
+
+
+def _too_large(max_bytes: int) -> str:
+    return f"File exceeds the {max_bytes // (1024 * 1024)} MB upload limit."
+
+
+class UploadLimitRoute(APIRoute):
+    """
+    Route class that answers 413 from the Content-Length header alone, before
+    FastAPI reads and spools the multipart body. Chunked requests carry no
+    length; those are only capped by save_upload, after Starlette spooled them.
+    """
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def limited_handler(request: Request) -> Response:
+            length = request.headers.get("content-length", "")
+            max_bytes = max_upload_bytes()
+            if length.isdigit() and int(length) > max_bytes + FORM_OVERHEAD_BYTES:
+                return JSONResponse({"detail": _too_large(max_bytes)}, status_code=413)
+            return await handler(request)
+
+        return limited_handler
+
+
+async def save_upload(upload: UploadFile, max_bytes: int = None) -> StoredUpload:
+    """
+    Copies `upload` (already spooled by Starlette) to content-addressed storage
+    in chunks, hashing as it goes. The type is checked on the first chunk and the
+    size on every chunk; oversized requests with a Content-Length never get here
+    (UploadLimitRoute). All file I/O runs on the threadpool.
+    """
+    max_bytes = max_upload_bytes() if max_bytes is None else max_bytes
+    too_large = UploadRejected(_too_large(max_bytes), status_code=413)
+    if upload.size is not None and upload.size > max_bytes:
+        raise too_large
+
+    first = await upload.read(UPLOAD_CHUNK_BYTES)
+    ext = _check_type(upload.filename, first)
+
+    digest = hashlib.sha256()
+    part_path, out = await run_in_threadpool(_open_part)
+    size = 0
+    try:
+        chunk = first
+        while chunk:
+            size += len(chunk)
+            if size > max_bytes:
+                raise too_large
+            await run_in_threadpool(_write, out, digest, chunk)
+            chunk = await upload.read(UPLOAD_CHUNK_BYTES)
+        await run_in_threadpool(out.close)
+    except BaseException:
+        await run_in_threadpool(_discard, out, part_path)
+        raise
+
+    content_hash = digest.hexdigest()
+    final_path = stored_path(content_hash, ext)
+    created = await run_in_threadpool(_commit, part_path, final_path)
+    if not created:
+        logger.info(f"♻️ Upload {upload.filename} matches stored content {content_hash[:12]}.")
+    return StoredUpload(final_path, content_hash, size, duplicate=not created)
@@ -1,11 +1,13 @@
 import os
-from groq import Groq
 from youtube_transcript_api import YouTubeTranscriptApi
 from dotenv import load_dotenv
 
+from app.services.providers import groq_client
+from app.utils.rate_governor import governed
+
 load_dotenv()
 
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+client = groq_client(os.getenv("GROQ_API_KEY"))
 
 PROMPT = """You are a YouTube video summarizer. You will be taking the transcript text
 and summarizing the entire video and providing the important summary in points
@@ -34,11 +36,13 @@ def extract_transcript_details(youtube_video_url):
 
 # ✅ Keep old name so youtube.py router import doesn't break
 def generate_gemini_content(transcript_text):
-    response = client.chat.completions.create(
-        model="llama-3.3-70b-versatile",
-        messages=[
-            {"role": "user", "content": PROMPT + transcript_text}
-        ]
-    )
+    with governed("groq", "llama-3.3-70b-versatile", PROMPT + transcript_text) as usage:
+        response = client.chat.completions.create(
+            model="llama-3.3-70b-versatile",
+            messages=[
+                {"role": "user", "content": PROMPT + transcript_text}
+            ]
+        )
+        usage.tokens = getattr(response.usage, "total_tokens", None)
     return response.choices[0].message.content
 
@@ -0,0 +1,281 @@
+import re
+import logging
+from array import array
+from collections import deque
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+from app.utils.preprocessing import segment_sentence_spans
+
+logger = logging.getLogger(__name__)
+
+Span = Tuple[int, int]
+TokenCounter = Callable[[str], int]
+
+_WORD_RE = re.compile(r"\S+")
+
+
+# ---------------------------------------------------------
+# 1. TOKEN COUNTERS
+# ---------------------------------------------------------
+def count_words(text: str) -> int:
+    return len(text.split())
+
+
+def count_chars(text: str) -> int:
+    return len(text)
+
+
+# ---------------------------------------------------------
+# 2. CHUNK RECORDS
+# ---------------------------------------------------------
+class Chunk:
+    """One chunk as offsets into the source text; the string is sliced on demand."""
+    __slots__ = ("index", "start", "end", "token_count", "_source")
+
+    def __init__(self, index: int, start: int, end: int, token_count: int, source: str):
+        self.index = index
+        self.start = start
+        self.end = end
+        self.token_count = token_count
+        self._source = source
+
+    @property
+    def text(self) -> str:
+        return self._source[self.start:self.end]
+
+    def __repr__(self) -> str:
+        return f"Chunk(index={self.index}, start={self.start}, end={self.end}, token_count={self.token_count})"
+
+
+class ChunkIndex:
+    """
+    All chunks of one text, stored as three packed int64 arrays
+    (start_char, end_char, token_count) instead of copied strings.
+    """
+    __slots__ = ("source", "starts", "ends", "token_counts")
+
+    def __init__(self, source: str):
+        self.source = source
+        self.starts = array("q")
+        self.ends = array("q")
+        self.token_counts = array("q")
+
+    def append(self, start: int, end: int, token_count: int) -> None:
+        self.starts.append(start)
+        self.ends.append(end)
+        self.token_counts.append(token_count)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, i: int) -> Chunk:
+        if i < 0:
+            i += len(self)
+        return Chunk(i, self.starts[i], self.ends[i], self.token_counts[i], self.source)
+
+    def __iter__(self) -> Iterator[Chunk]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def offsets(self) -> List[Span]:
+        return list(zip(self.starts, self.ends))
+
+    def texts(self) -> List[str]:
+        return [self.source[s:e] for s, e in zip(self.starts, self.ends)]
+
+
+# ---------------------------------------------------------
+# 3. SENTENCE UNITS
+# ---------------------------------------------------------
+def _split_oversized(text: str, start: int, end: int, max_tokens: int, counter: TokenCounter) -> List[Span]:
+    """Cuts a sentence longer than the budget at word boundaries."""
+    pieces = []
+    piece_start, prev_end, used = None, start, 0
+    for match in _WORD_RE.finditer(text, start, end):
+        # The gap is counted too, so a character budget stays exact
+        cost = counter(text[prev_end:match.end()]) if piece_start is not None else counter(match.group())
+        if piece_start is not None and used + cost > max_tokens:
+            pieces.append((piece_start, prev_end))
+            piece_start, used, cost = None, 0, counter(match.group())
+        if piece_start is None:
+            piece_start = match.start()
+        used += cost
+        prev_end = match.end()
+    if piece_start is not None:
+        pieces.append((piece_start, prev_end))
+    return pieces
+
+
+def sentence_units(
+    text: str,
+    max_tokens: int,
+    counter: TokenCounter = count_words,
+    spans: Optional[Sequence[Span]] = None,
+) -> Tuple[List[Span], List[int]]:
+    """Sentence spans and their token counts, each sentence counted exactly once."""
+    if spans is None:
+        spans = segment_sentence_spans(text)
+
+    units, lengths = [], []
+    for start, end in spans:
+        tokens = counter(text[start:end])
+        if tokens <= max_tokens:
+            units.append((start, end))
+            lengths.append(tokens)
+            continue
+        for piece_start, piece_end in _split_oversized(text, start, end, max_tokens, counter):
+            units.append((piece_start, piece_end))
+            lengths.append(counter(text[piece_start:piece_end]))
+    return units, lengths
+
+
+# ---------------------------------------------------------
+# 4. SINGLE-PASS CHUNKER
+# ---------------------------------------------------------
+def build_chunks(
+    text: str,
+    max_tokens: int,
+    overlap_tokens: int = 0,
+    counter: TokenCounter = count_words,
+    spans: Optional[Sequence[Span]] = None,
+) -> ChunkIndex:
+    """
+    Packs whole sentences into chunks of at most `max_tokens`; each chunk starts
+    with up to `overlap_tokens` of the previous chunk's trailing sentences.
+
+    Two-pointer window over the sentence units: the end pointer visits each unit
+    once and the start pointer only moves forward, so the pass is O(n).
+    """
+    index = ChunkIndex(text or "")
+    if not text or max_tokens <= 0:
+        return index
+
+    units, lengths = sentence_units(text, max_tokens, counter, spans)
+    overlap_tokens = max(0, min(overlap_tokens, max_tokens - 1))
+
+    lo, window = 0, 0
+    for hi, tokens in enumerate(lengths):
+        if lo < hi and window + tokens > max_tokens:
+            index.append(units[lo][0], units[hi - 1][1], window)
+            # Keep the longest tail that fits the overlap budget...
+            while lo < hi and window > overlap_tokens:
+                window -= lengths[lo]
+                lo += 1
+            # ...and that still leaves room for the incoming sentence
+            while lo < hi and window + tokens > max_tokens:
+                window -= lengths[lo]
+                lo += 1
+        window += tokens
+
+    if lo < len(units):
+        index.append(units[lo][0], units[-1][1], window)
+
+    logger.debug(f"🧩 Chunking: {len(units)} sentences -> {len(index)} chunks.")
+    return index
+
+
+def chunk_by_words(text: str, max_words: int, overlap_words: int = 0, spans=None) -> ChunkIndex:
+    return build_chunks(text, max_words, overlap_words, count_words, spans)
+
+
+def chunk_by_chars(text: str, max_chars: int, overlap_chars: int = 0, spans=None) -> ChunkIndex:
+    """
+    build_chunks with a character budget measured on the chunk's whole span
+    (end - start), so the whitespace between sentences counts too and no
+    chunk's text is longer than `max_chars`.
+    """
+    index = ChunkIndex(text or "")
+    if not text or max_chars <= 0:
+        return index
+
+    units, _ = sentence_units(text, max_chars, count_chars, spans)
+    overlap_chars = max(0, min(overlap_chars, max_chars - 1))
+
+    lo = 0
+    for hi in range(1, len(units)):
+        if units[hi][1] - units[lo][0] <= max_chars:
+            continue
+        end = units[hi - 1][1]
+        index.append(units[lo][0], end, end - units[lo][0])
+        while lo < hi and end - units[lo][0] > overlap_chars:
+            lo += 1
+        while lo < hi and units[hi][1] - units[lo][0] > max_chars:
+            lo += 1
+
+    if lo < len(units):
+        index.append(units[lo][0], units[-1][1], units[-1][1] - units[lo][0])
+    return index
+
+
+# ---------------------------------------------------------
+# 5. STREAMING CHUNKER
+# ---------------------------------------------------------
+class StreamingChunker:
+    """
+    Incremental build_chunks for text that arrives sentence by sentence.
+    Only the current window is held; feed() returns chunks as soon as they close.
+    Offsets are positions in the fed stream; chunk text is the sentences joined by spaces,
+    and the budget covers those joins (they cost counter(" "): 0 words, 1 char).
+    """
+    __slots__ = ("max_tokens", "overlap_tokens", "counter", "_separator", "_window", "_total", "_count")
+
+    def __init__(self, max_tokens: int, overlap_tokens: int = 0, counter: TokenCounter = count_words):
+        self.max_tokens = max_tokens
+        self.overlap_tokens = max(0, min(overlap_tokens, max_tokens - 1))
+        self.counter = counter
+        self._separator = counter(" ")
+        self._window = deque()  # (start, end, text, tokens)
+        self._total = 0
+        self._count = 0
+
+    def feed(self, sentence: str, start: int) -> List[dict]:
+        tokens = self.counter(sentence)
+        if tokens <= self.max_tokens:
+            closed = self._push(start, start + len(sentence), sentence, tokens)
+            return [closed] if closed else []
+
+        ready = []
+        for piece_start, piece_end in _split_oversized(sentence, 0, len(sentence), self.max_tokens, self.counter):
+            piece = sentence[piece_start:piece_end]
+            closed = self._push(start + piece_start, start + piece_end, piece, self.counter(piece))
+            if closed:
+                ready.append(closed)
+        return ready
+
+    def flush(self) -> Optional[dict]:
+        if not self._window:
+            return None
+        chunk = self._emit()
+        self._window.clear()
+        self._total = 0
+        return chunk
+
+    def _push(self, start: int, end: int, text: str, tokens: int) -> Optional[dict]:
+        # _total is the size of the joined window text, separators included
+        closed = None
+        if self._window and self._total + self._separator + tokens > self.max_tokens:
+            closed = self._emit()
+            while self._window and self._total > self.overlap_tokens:
+                self._drop_oldest()
+            while self._window and self._total + self._separator + tokens > self.max_tokens:
+                self._drop_oldest()
+        if self._window:
+            self._total += self._separator
+        self._window.append((start, end, text, tokens))
+        self._total += tokens
+        return closed
+
+    def _drop_oldest(self) -> None:
+        self._total -= self._window.popleft()[3]
+        if self._window:
+            self._total -= self._separator
+
+    def _emit(self) -> dict:
+        self._count += 1
+        return {
+            "chunk_id": self._count,
+            "text": " ".join(unit[2] for unit in self._window),
+            "token_count": self._total,
+            "start_char": self._window[0][0],
+            "end_char": self._window[-1][1],
+        }
@@ -63,4 +63,36 @@ def extract_local_keywords(text: str, num_keywords=5) -> str:
     freq = Counter(filtered_words)
     common = freq.most_common(num_keywords)
     
-    return ", ".join([word for word, count in common])
\ No newline at end of file
+    return ", ".join([word for word, count in common])
+
+# ---------------------------------------------------------
+# SUMMARY STYLE RECONSTRUCTION
+# ---------------------------------------------------------
+BULLET_STYLES = {"bullet", "bullets", "bullet points", "bullet_points"}
+
+def is_bullet_style(style: str) -> bool:
+    return (style or "paragraph").strip().lower() in BULLET_STYLES
+
+def reshape_summary(text: str, style: str) -> str:
+    """
+    Strictly rebuilds a summary as '- ' bullets (one per line) or as
+    cohesive paragraphs with list markers removed.
+    """
+    if is_bullet_style(style):
+        raw_points = re.split(r"\n|(?<=\s)[-•*]\s", text)
+        bullets = []
+        for pt in raw_points:
+            clean_pt = pt.strip().lstrip("-*• ").strip()
+            if clean_pt:
+                bullets.append(clean_pt)
+        return "\n".join([f"- {b}" for b in bullets]).strip()
+
+    paragraphs = [p.strip() for p in text.split("\n\n") if p.strip()]
+    clean_paragraphs = []
+    for p in paragraphs:
+        lines = [line.strip() for line in p.splitlines() if line.strip()]
+        lines = [ln.lstrip("-*• ").strip() for ln in lines]
+        flattened = " ".join(lines).strip()
+        if flattened:
+            clean_paragraphs.append(flattened)
+    return "\n\n".join(clean_paragraphs).strip()
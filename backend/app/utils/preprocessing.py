@@ -1,6 +1,6 @@
 import re
 import nltk
-from nltk.tokenize import sent_tokenize, word_tokenize
+from nltk.tokenize import word_tokenize
 from nltk.corpus import stopwords
 from langdetect import detect, LangDetectException
 
@@ -26,7 +26,10 @@ setup_nltk()
 def clean_text(text: str) -> str:
     if not isinstance(text, str) or not text:
         return ""
+    return normalize_text(text).strip()
 
+def normalize_text(text: str) -> str:
+    """clean_text without the final strip, so it can run block by block on a stream."""
     # Normalize line breaks
     text = text.replace("\r\n", "\n").replace("\r", "\n")
     # Replace tabs with spaces
@@ -38,7 +41,7 @@ def clean_text(text: str) -> str:
     # Normalize paragraph breaks (max 2 newlines)
     text = re.sub(r"\n{3,}", "\n\n", text)
 
-    return text.strip()
+    return text
 
 # ---------------------------------------------------------
 # 2. LANGUAGE DETECTION
@@ -61,35 +64,43 @@ try:
 except:
     tokenizer = None
 
-def protect_abbreviations(text: str) -> str:
-    for abbr in ABBREVIATIONS:
-        # Protect Mr. -> Mr<prd>
-        text = re.sub(rf"\b{abbr}\.", f"{abbr}<prd>", text, flags=re.IGNORECASE)
-    return text
+# Protected periods are swapped for a same-length placeholder, so sentence spans
+# found on the protected copy are valid character offsets into the original text.
+_ABBREVIATION_RE = re.compile(rf"\b(?:{'|'.join(ABBREVIATIONS)})\.", re.IGNORECASE)
+_DECIMAL_RE = re.compile(r"(?<=\d)\.(?=\d)")
+_FALLBACK_SENTENCE_RE = re.compile(r"[^.!?]+(?:[.!?]+|$)")
+_SPAN_PLACEHOLDER = "_"
 
-def protect_decimals(text: str) -> str:
-    # Protect 1.5 -> 1<prd>5
-    return re.sub(r"(\d)\.(\d)", r"\1<prd>\2", text)
+def segment_sentence_spans(text: str):
+    """Returns (start, end) character offsets of each sentence in `text`."""
+    if not text or not text.strip():
+        return []
 
-def restore_placeholders(text: str) -> str:
-    return text.replace("<prd>", ".")
+    # 1. Protect special cases (length-preserving)
+    protected = _ABBREVIATION_RE.sub(lambda m: m.group(0)[:-1] + _SPAN_PLACEHOLDER, text)
+    protected = _DECIMAL_RE.sub(_SPAN_PLACEHOLDER, protected)
 
-def segment_sentences(text: str):
-    if not text.strip():
-        return []
-    
-    # 1. Protect special cases
-    protected = protect_abbreviations(text)
-    protected = protect_decimals(protected)
-    
     # 2. Tokenize
     if tokenizer:
-        raw_sentences = tokenizer.tokenize(protected)
+        raw_spans = tokenizer.span_tokenize(protected)
     else:
-        raw_sentences = sent_tokenize(protected) # Fallback
+        raw_spans = (m.span() for m in _FALLBACK_SENTENCE_RE.finditer(protected))
+
+    # 3. Trim whitespace and filter
+    spans = []
+    for start, end in raw_spans:
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if end - start > 1:
+            spans.append((start, end))
+    return spans
 
-    # 3. Restore and Filter
-    return [restore_placeholders(s).strip() for s in raw_sentences if len(s.strip()) > 1]
+def segment_sentences(text: str, spans=None):
+    if spans is None:
+        spans = segment_sentence_spans(text)
+    return [text[start:end] for start, end in spans]
 
 # ---------------------------------------------------------
 # 4. STOP WORD HANDLING (Task Requirement)
@@ -131,55 +142,21 @@ def calculate_text_stats(text: str, sentences: list = None):
 # ---------------------------------------------------------
 # 6. CHUNKING
 # ---------------------------------------------------------
-def chunk_text(text: str, chunk_size=600, overlap=100):
-    sentences = segment_sentences(text)
-    if not sentences:
-        return []
+def chunk_text(text: str, chunk_size=600, overlap=100, spans=None):
+    # Imported here: app.utils.chunking builds on segment_sentence_spans above
+    from app.utils.chunking import chunk_by_words
 
-    chunks = []
-    current_chunk = []
-    current_word_count = 0
-    chunk_id = 1
-
-    for sentence in sentences:
-        sent_word_count = len(word_tokenize(sentence))
-        
-        # Check if adding this sentence exceeds chunk size
-        if current_word_count + sent_word_count > chunk_size and current_chunk:
-            # Save current chunk
-            chunks.append({
-                "chunk_id": chunk_id,
-                "text": " ".join(current_chunk),
-                "word_count": current_word_count
-            })
-            chunk_id += 1
-            
-            # Create Overlap (Backtrack)
-            overlap_buffer = []
-            overlap_count = 0
-            for s in reversed(current_chunk):
-                s_len = len(word_tokenize(s))
-                if overlap_count + s_len < overlap:
-                    overlap_buffer.insert(0, s)
-                    overlap_count += s_len
-                else:
-                    break
-            
-            current_chunk = overlap_buffer
-            current_word_count = overlap_count
-
-        current_chunk.append(sentence)
-        current_word_count += sent_word_count
-
-    # Add final chunk
-    if current_chunk:
-        chunks.append({
-            "chunk_id": chunk_id,
-            "text": " ".join(current_chunk),
-            "word_count": current_word_count
-        })
-
-    return chunks
+    index = chunk_by_words(text, chunk_size, overlap, spans=spans)
+    return [
+        {
+            "chunk_id": chunk.index + 1,
+            "text": chunk.text,
+            "word_count": chunk.token_count,
+            "start_char": chunk.start,
+            "end_char": chunk.end,
+        }
+        for chunk in index
+    ]
 
 # ---------------------------------------------------------
 # 7. ORCHESTRATOR (The Pipeline)
@@ -188,6 +165,7 @@ def preprocess_for_summarization(text: str, chunk_size=1000, remove_stops=False)
     """
     Returns the bundle of data required for the summarizer.
     Does NOT run the AI model itself (Separation of Concerns).
+    Holds the whole book in memory; see iter_preprocessed_chunks for the streaming mode.
     """
     validation_warnings = []
 
@@ -207,8 +185,9 @@ def preprocess_for_summarization(text: str, chunk_size=1000, remove_stops=False)
     if remove_stops and language == 'en':
         cleaned_text = remove_stop_words(cleaned_text)
 
-    # 5. Segment
-    sentences = segment_sentences(cleaned_text)
+    # 5. Segment (spans are reused by the chunker)
+    spans = segment_sentence_spans(cleaned_text)
+    sentences = segment_sentences(cleaned_text, spans)
 
     # 6. Stats
     stats = calculate_text_stats(cleaned_text, sentences)
@@ -216,7 +195,7 @@ def preprocess_for_summarization(text: str, chunk_size=1000, remove_stops=False)
         validation_warnings.append("Text is very long (>100k words).")
 
     # 7. Chunk
-    chunks = chunk_text(cleaned_text, chunk_size=chunk_size)
+    chunks = chunk_text(cleaned_text, chunk_size=chunk_size, spans=spans)
 
     # Return the Data Bundle (As requested in Task 8)
     return {
@@ -226,4 +205,147 @@ def preprocess_for_summarization(text: str, chunk_size=1000, remove_stops=False)
         "stats": stats,
         "chunks": chunks,
         "warnings": validation_warnings
-    } 
\ No newline at end of file
+    }
+
+# ---------------------------------------------------------
+# 8. STREAMING PIPELINE (Bounded Memory)
+# ---------------------------------------------------------
+STREAM_BLOCK_CHARS = 64 * 1024
+# An unterminated "sentence" longer than this is released anyway
+MAX_CARRY_CHARS = 256 * 1024
+LANGUAGE_SAMPLE_CHARS = 500
+
+class RunningTextStats:
+    """calculate_text_stats as running counters, updated one sentence at a time."""
+    def __init__(self):
+        self.word_count = 0
+        self.char_count = 0
+        self.sentence_count = 0
+        self.language = None
+        self.warnings = []
+
+    def add_sentence(self, sentence: str):
+        self.sentence_count += 1
+        self.word_count += len(sentence.split())
+        self.char_count += len(sentence)
+
+    def as_dict(self):
+        return {
+            "word_count": self.word_count,
+            "char_count": self.char_count,
+            "sentence_count": self.sentence_count,
+            "avg_sentence_length": round(self.word_count / self.sentence_count, 1) if self.sentence_count else 0,
+            "reading_time_minutes": round(self.word_count / 200, 2),
+        }
+
+def iter_text_blocks(source, block_chars: int = STREAM_BLOCK_CHARS):
+    """Accepts a string, a file object (read in blocks) or any iterable of strings (pages, lines)."""
+    if isinstance(source, str):
+        for i in range(0, len(source), block_chars):
+            yield source[i:i + block_chars]
+    elif hasattr(source, "read"):
+        while True:
+            block = source.read(block_chars)
+            if not block:
+                break
+            yield block
+    else:
+        for block in source:
+            if block:
+                yield block
+
+# Characters normalize_text may merge with what follows (CRLF, tabs, space/newline runs, non-ASCII runs)
+_UNSETTLED_CHARS = "\r\n\t "
+
+def _iter_normalized_blocks(source):
+    """
+    normalize_text block by block, with the same output as one call on the whole text:
+    each block's trailing whitespace / non-ASCII run is held back and normalized
+    together with the start of the next block.
+    """
+    pending = ""
+    for block in iter_text_blocks(source):
+        raw = pending + block
+        cut = len(raw)
+        while cut and (raw[cut - 1] in _UNSETTLED_CHARS or raw[cut - 1] > "\x7f"):
+            cut -= 1
+        pending = raw[cut:]
+        if cut:
+            yield normalize_text(raw[:cut])
+    if pending:
+        yield normalize_text(pending)
+
+def iter_sentences(source, clean: bool = True):
+    """
+    Yields (sentence, start_offset) pairs, segmenting block by block.
+    The trailing, possibly unfinished sentence of each block is carried into the next.
+    With clean=True, offsets index the cleaned stream (normalize_text of the whole text).
+    """
+    carry, carry_offset = "", 0
+    for block in (_iter_normalized_blocks(source) if clean else iter_text_blocks(source)):
+        buffer = carry + block
+        spans = segment_sentence_spans(buffer)
+        if not spans:
+            # Too short to be a sentence yet (e.g. a one-letter fragment): keep it for the next block
+            if not buffer.strip() or len(buffer) > MAX_CARRY_CHARS:
+                carry, carry_offset = "", carry_offset + len(buffer)
+            else:
+                carry = buffer
+            continue
+
+        keep_from = spans[-1][0]
+        if keep_from == 0 and len(buffer) > MAX_CARRY_CHARS:
+            keep_from = len(buffer)
+        for start, end in spans:
+            if start >= keep_from:
+                break
+            yield buffer[start:end], carry_offset + start
+
+        carry, carry_offset = buffer[keep_from:], carry_offset + keep_from
+
+    for start, end in segment_sentence_spans(carry):
+        yield carry[start:end], carry_offset + start
+
+def iter_preprocessed_chunks(source, chunk_size=1000, overlap=100, remove_stops=False,
+                             stats: RunningTextStats = None, counter=None, clean=True):
+    """
+    Generator mode of preprocess_for_summarization: reads, segments and chunks
+    in one pass and yields each chunk as soon as it closes, so consumers (the
+    map stage) can start before the book is fully read. Memory stays bounded by
+    one block plus one chunk window. Pass a RunningTextStats to collect stats.
+    """
+    # Imported here: app.utils.chunking builds on segment_sentence_spans above
+    from app.utils.chunking import StreamingChunker, count_words
+
+    stats = stats if stats is not None else RunningTextStats()
+    chunker = StreamingChunker(chunk_size, overlap, counter or count_words)
+    sample = []
+
+    def _finish(chunk):
+        chunk["word_count"] = chunk.pop("token_count")
+        return chunk
+
+    for sentence, start in iter_sentences(source, clean=clean):
+        if stats.language is None:
+            sample.append(sentence)
+            if sum(len(s) for s in sample) >= LANGUAGE_SAMPLE_CHARS:
+                stats.language = detect_language(" ".join(sample))
+                sample = []
+                if stats.language != 'en':
+                    stats.warnings.append(f"Detected non-English text ({stats.language}).")
+
+        if remove_stops and stats.language == 'en':
+            sentence = remove_stop_words(sentence)
+
+        stats.add_sentence(sentence)
+        for chunk in chunker.feed(sentence, start):
+            yield _finish(chunk)
+
+    last = chunker.flush()
+    if last:
+        yield _finish(last)
+
+    if stats.language is None and sample:
+        stats.language = detect_language(" ".join(sample))
+    if stats.word_count > 100000:
+        stats.warnings.append("Text is very long (>100k words).")
@@ -0,0 +1,309 @@
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# =========================================
+# ✅ CONFIGURATION
+# =========================================
+# Published per-model quotas; override with <PROVIDER>_REQUESTS_PER_MINUTE / <PROVIDER>_TOKENS_PER_MINUTE
+PROVIDER_LIMITS = {
+    "groq": {
+        "requests_per_minute": int(os.getenv("GROQ_REQUESTS_PER_MINUTE", 30)),
+        "tokens_per_minute": int(os.getenv("GROQ_TOKENS_PER_MINUTE", 12000)),
+    },
+    "gemini": {
+        "requests_per_minute": int(os.getenv("GEMINI_REQUESTS_PER_MINUTE", 15)),
+        "tokens_per_minute": int(os.getenv("GEMINI_TOKENS_PER_MINUTE", 1000000)),
+    },
+}
+# Aim just under the quota instead of at it
+RATE_GOVERNOR_HEADROOM = float(os.getenv("RATE_GOVERNOR_HEADROOM", 0.9))
+# Largest burst allowed, as seconds' worth of quota
+RATE_GOVERNOR_BURST_SECONDS = float(os.getenv("RATE_GOVERNOR_BURST_SECONDS", 10))
+# Cross-worker mode: each of N processes takes 1/N of the quota
+RATE_GOVERNOR_WORKERS = max(1, int(os.getenv("RATE_GOVERNOR_WORKERS", 1)))
+# Pause after a 429 that carries no Retry-After header
+DEFAULT_RETRY_AFTER_SECONDS = float(os.getenv("RATE_GOVERNOR_DEFAULT_BACKOFF", 10))
+# Completion tokens assumed when the caller doesn't cap them
+DEFAULT_OUTPUT_TOKENS = 1024
+
+
+def estimate_tokens(text: str) -> int:
+    """~4 characters per token; enough for budgeting, settled against real usage later."""
+    return len(text or "") // 4 + 1
+
+
+# =========================================
+# ✅ TOKEN BUCKET
+# =========================================
+class TokenBucket:
+    """Refills continuously at `rate_per_second` up to `capacity`. Not thread-safe on its own."""
+    __slots__ = ("capacity", "rate", "tokens", "updated")
+
+    def __init__(self, per_minute: float, burst_seconds: float = RATE_GOVERNOR_BURST_SECONDS):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` is available (after refill)."""
+        missing = min(amount, self.capacity) - self.tokens
+        return max(0.0, missing / self.rate) if self.rate > 0 else float("inf")
+
+
+# =========================================
+# ✅ GOVERNOR (one per provider + model)
+# =========================================
+class RateGovernor:
+    """
+    Requests/min and tokens/min buckets for one provider model, shared by every
+    call site in the process. Callers are served strictly in arrival order
+    (ticket queue), so a burst drains at the quota rate instead of racing into 429s.
+    """
+    def __init__(self, provider: str, model: str, requests_per_minute: float, tokens_per_minute: float):
+        self.provider = provider
+        self.model = model
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self._cond = threading.Condition()
+        self._next_ticket = 0
+        self._serving = 0
+        self._blocked_until = 0.0
+
+        # Metrics
+        self.total_requests = 0
+        self.total_wait_seconds = 0.0
+        self.rate_limited = 0
+
+    def acquire(self, tokens: int = 1) -> float:
+        """Blocks until both buckets allow the call; returns the seconds waited."""
+        start = time.monotonic()
+        with self._cond:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            # FIFO: only the head of the line may take capacity
+            while ticket != self._serving:
+                self._cond.wait()
+
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._requests.refill(now)
+                    self._tokens.refill(now)
+                    delay = max(
+                        self._blocked_until - now,
+                        self._requests.wait_time(1),
+                        self._tokens.wait_time(tokens),
+                    )
+                    if delay <= 0:
+                        break
+                    self._cond.wait(timeout=delay)
+
+                self._requests.tokens -= 1
+                self._tokens.tokens -= self.charge_for(tokens)
+            finally:
+                self._serving += 1
+                self._cond.notify_all()
+
+            waited = time.monotonic() - start
+            self.total_requests += 1
+            self.total_wait_seconds += waited
+        if waited > 1:
+            logger.info(f"⏳ [{self.provider}/{self.model}] Waited {waited:.1f}s for quota.")
+        return waited
+
+    def charge_for(self, tokens: int) -> float:
+        """What acquire(tokens) takes from the token bucket: estimates above one burst are capped."""
+        return min(tokens, self._tokens.capacity)
+
+    def settle(self, charged: float, actual: int) -> None:
+        """
+        Corrects the token bucket once the real usage is known (refund or extra
+        charge). `charged` is what acquire took, i.e. charge_for(estimate).
+        """
+        with self._cond:
+            self._tokens.tokens = min(self._tokens.capacity, self._tokens.tokens + charged - actual)
+
+    def penalize(self, retry_after: Optional[float] = None) -> None:
+        """A 429 got through anyway: stop everyone until the provider's window resets."""
+        pause = retry_after if retry_after is not None else DEFAULT_RETRY_AFTER_SECONDS
+        with self._cond:
+            self.rate_limited += 1
+            self._blocked_until = max(self._blocked_until, time.monotonic() + pause)
+            self._requests.tokens = min(self._requests.tokens, 0)
+            self._cond.notify_all()
+        logger.warning(f"🚦 [{self.provider}/{self.model}] Rate limited; pausing {pause:.0f}s.")
+
+    def saturation(self) -> dict:
+        with self._cond:
+            now = time.monotonic()
+            self._requests.refill(now)
+            self._tokens.refill(now)
+            rpm_used = 1 - self._requests.tokens / self._requests.capacity
+            tpm_used = 1 - self._tokens.tokens / self._tokens.capacity
+            return {
+                "provider": self.provider,
+                "model": self.model,
+                "requests_per_minute": self.requests_per_minute,
+                "tokens_per_minute": self.tokens_per_minute,
+                "request_bucket_used": round(max(rpm_used, 0.0), 3),
+                "token_bucket_used": round(max(tpm_used, 0.0), 3),
+                "saturation": round(min(max(rpm_used, tpm_used, 0.0), 1.0), 3),
+                "queue_depth": self._next_ticket - self._serving,
+                "blocked_for_seconds": round(max(self._blocked_until - now, 0.0), 1),
+                "total_requests": self.total_requests,
+                "total_wait_seconds": round(self.total_wait_seconds, 2),
+                "rate_limited": self.rate_limited,
+            }
+
+
+# =========================================
+# ✅ REGISTRY
+# =========================================
+_governors: Dict[Tuple[str, str], RateGovernor] = {}
+_registry_lock = threading.Lock()
+
+
+def get_governor(provider: str, model: str) -> RateGovernor:
+    key = (provider, model)
+    with _registry_lock:
+        if key not in _governors:
+            limits = PROVIDER_LIMITS.get(provider, PROVIDER_LIMITS["groq"])
+            share = RATE_GOVERNOR_HEADROOM / RATE_GOVERNOR_WORKERS
+            _governors[key] = RateGovernor(
+                provider,
+                model,
+                limits["requests_per_minute"] * share,
+                limits["tokens_per_minute"] * share,
+            )
+        return _governors[key]
+
+
+def all_saturation() -> list:
+    with _registry_lock:
+        governors = list(_governors.values())
+    return [g.saturation() for g in governors]
+
+
+# =========================================
+# ✅ CALL-SITE HELPERS
+# =========================================
+def is_rate_limit_error(error: Exception) -> bool:
+    code = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if code == 429:
+        return True
+    text = str(error).lower()
+    return "429" in text or "rate limit" in text or "resource_exhausted" in text
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        value = headers.get("retry-after")
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class Usage:
+    """Filled in by the caller with the provider-reported token count, if any."""
+    __slots__ = ("tokens", "charged")
+
+    def __init__(self, charged: float = 0):
+        self.tokens: Optional[int] = None
+        self.charged = charged  # taken from the token bucket up front
+
+
+@contextmanager
+def governed(provider: str, model: str, prompt: str = "", max_output_tokens: int = DEFAULT_OUTPUT_TOKENS):
+    """
+    Wraps one raw SDK call:
+        with governed("groq", model, prompt) as usage:
+            resp = client.chat.completions.create(...)
+            usage.tokens = resp.usage.total_tokens
+    """
+    governor = get_governor(provider, model)
+    estimated = estimate_tokens(prompt) + max_output_tokens
+    governor.acquire(estimated)
+    usage = Usage(governor.charge_for(estimated))
+    try:
+        yield usage
+    except Exception as e:
+        if is_rate_limit_error(e):
+            governor.penalize(retry_after_seconds(e))
+        raise
+    finally:
+        if usage.tokens is not None:
+            governor.settle(usage.charged, usage.tokens)
+
+
+# =========================================
+# ✅ LANGCHAIN INTEGRATION
+# =========================================
+try:
+    from langchain_core.callbacks import BaseCallbackHandler
+except ImportError:  # LangChain is optional for this module
+    BaseCallbackHandler = object
+
+
+class GovernorCallbackHandler(BaseCallbackHandler):
+    """
+    Attach to a LangChain chat model (callbacks=[...]) and every invoke, including
+    inside `prompt | llm | parser` chains, waits for quota first.
+    """
+    run_inline = True
+
+    def __init__(self, provider: str, model: str, max_output_tokens: int = DEFAULT_OUTPUT_TOKENS):
+        self.governor = get_governor(provider, model)
+        self.max_output_tokens = max_output_tokens
+        self._charged: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        text = "".join(str(getattr(m, "content", m)) for batch in messages for m in batch)
+        self._start(run_id, text)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._start(run_id, "".join(prompts))
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        charged = self._pop(run_id)
+        usage = (getattr(response, "llm_output", None) or {}).get("token_usage") or {}
+        actual = usage.get("total_tokens")
+        if charged is not None and actual:
+            self.governor.settle(charged, actual)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._pop(run_id)
+        if is_rate_limit_error(error):
+            self.governor.penalize(retry_after_seconds(error))
+
+    def _start(self, run_id, text: str):
+        estimated = estimate_tokens(text) + self.max_output_tokens
+        with self._lock:
+            self._charged[str(run_id)] = self.governor.charge_for(estimated)
+        self.governor.acquire(estimated)
+
+    def _pop(self, run_id) -> Optional[float]:
+        with self._lock:
+            return self._charged.pop(str(run_id), None)
+
+
+def governed_chat_groq(model: str = "llama-3.3-70b-versatile", **kwargs):
+    """ChatGroq (or its PROVIDER_MODE=fake stand-in) wired to the shared governor for its model."""
+    from app.services.providers import make_chat_model
+    callbacks = list(kwargs.pop("callbacks", None) or []) + [GovernorCallbackHandler("groq", model)]
+    return make_chat_model(model, callbacks=callbacks, **kwargs)
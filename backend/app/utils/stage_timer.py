@@ -0,0 +1,150 @@
+import time
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# =========================================
+# ✅ CONFIGURATION
+# =========================================
+# Upper bounds (seconds) of the histogram buckets; OCR waits and generation run to minutes
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+# =========================================
+# ✅ HISTOGRAMS (Prometheus semantics, no dependency)
+# =========================================
+class Histogram:
+    """Cumulative-bucket histogram per label value, rendered in Prometheus text format."""
+    def __init__(self, name: str, help_text: str, label: str, buckets=STAGE_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.buckets = tuple(buckets)
+        self._series: Dict[str, List[float]] = {}  # label -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, label_value: str, seconds: float) -> None:
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = self._series[label_value] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect_left(self.buckets, seconds)] += 1
+            series[-1] += seconds
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            series = {k: list(v) for k, v in self._series.items()}
+        result = {}
+        for label_value, counts in series.items():
+            count = sum(counts[:-1])
+            result[label_value] = {"count": count, "sum": counts[-1], "buckets": counts[:-1]}
+        return result
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for label_value, data in sorted(self.snapshot().items()):
+            label = f'{self.label}="{label_value}"'
+            cumulative = 0
+            for bound, n in zip(self.buckets, data["buckets"]):
+                cumulative += n
+                lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {data["count"]}')
+            lines.append(f"{self.name}_sum{{{label}}} {data['sum']:.6f}")
+            lines.append(f"{self.name}_count{{{label}}} {data['count']}")
+        return lines
+
+
+stage_seconds = Histogram(
+    "book_summarizer_stage_duration_seconds", "Time spent in each processing stage.", "stage"
+)
+job_seconds = Histogram(
+    "book_summarizer_job_duration_seconds", "Wall time of background jobs, per kind.", "kind"
+)
+
+
+# =========================================
+# ✅ STAGE TIMERS
+# =========================================
+class StageRecorder:
+    """Collects the stages of one unit of work (a job or a request) for persisting."""
+    __slots__ = ("stages",)
+
+    def __init__(self):
+        self.stages: List[Tuple[str, float]] = []
+
+    def totals(self) -> Dict[str, float]:
+        totals: Dict[str, float] = {}
+        for name, seconds in self.stages:
+            totals[name] = totals.get(name, 0.0) + seconds
+        return totals
+
+
+_current: ContextVar[Optional[StageRecorder]] = ContextVar("stage_recorder", default=None)
+
+
+@contextmanager
+def recording(recorder: Optional[StageRecorder] = None):
+    """
+    Every `stage()` inside this block (same thread / task) is also kept on the
+    recorder. Pass an existing recorder to keep adding to it.
+    """
+    recorder = recorder or StageRecorder()
+    token = _current.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def stage(name: str):
+    """Times a block into the stage histogram, and into the active recorder if any."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        stage_seconds.observe(name, seconds)
+        recorder = _current.get()
+        if recorder is not None:
+            recorder.stages.append((name, seconds))
+        if seconds > 30:
+            logger.info(f"⏱️ Stage '{name}' took {seconds:.1f}s.")
+
+
+def render_prometheus() -> str:
+    lines = stage_seconds.render() + job_seconds.render()
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # scrapes every few seconds would flood the worker log
+
+
+def serve_prometheus(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """
+    Serves this process's histograms on http://host:port/metrics from a daemon thread.
+    For processes without the API (job workers), whose stages never reach the API's /metrics.
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics").start()
+    logger.info(f"📈 Metrics on http://{host}:{server.server_port}/metrics")
+    return server
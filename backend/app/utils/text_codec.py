@@ -0,0 +1,38 @@
+import os
+import zlib
+from typing import Tuple
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; zlib is always there
+    zstandard = None
+
+# =========================================
+# ✅ CONFIGURATION
+# =========================================
+# "zstd" (faster, smaller) when zstandard is installed, otherwise "zlib"
+TEXT_CODEC = os.getenv("TEXT_CODEC", "zstd" if zstandard else "zlib").strip().lower()
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+# =========================================
+# ✅ COMPRESS / DECOMPRESS
+# =========================================
+def compress_text(text: str, codec: str = None) -> Tuple[str, bytes]:
+    """UTF-8 encodes and compresses `text`; returns (codec, data) so readers know how to undo it."""
+    codec = codec or TEXT_CODEC
+    raw = text.encode("utf-8")
+    if codec == "zstd" and zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    return "zlib", zlib.compress(raw, ZLIB_LEVEL)
+
+
+def decompress_text(codec: str, data: bytes) -> str:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Text was stored with zstd but the zstandard package is not installed.")
+        return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+    if codec == "zlib":
+        return zlib.decompress(data).decode("utf-8")
+    raise ValueError(f"Unknown text codec: {codec}")
@@ -0,0 +1,39 @@
+import time
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from app.utils.single_flight import SingleFlight
+
+
+# =========================================
+# ✅ TTL CACHE (per process)
+# =========================================
+class TTLCache:
+    """
+    Keeps computed values for `ttl_seconds`. Concurrent misses on the same key
+    share one computation, so a dashboard refresh storm runs each query once.
+    """
+    def __init__(self, name: str, ttl_seconds: float):
+        self.ttl = ttl_seconds
+        self._values: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        self._flight = SingleFlight(name)
+
+    def get_or_compute(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._values.get(key)
+        if entry is not None and now - entry[0] < self.ttl:
+            return entry[1]
+
+        def compute():
+            value = fn()
+            with self._lock:
+                self._values[key] = (time.monotonic(), value)
+            return value
+
+        return self._flight.do(key, compute)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
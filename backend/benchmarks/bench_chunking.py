@@ -0,0 +1,63 @@
+# backend/benchmarks/bench_chunking.py
+# Scaling check for app.utils.chunking: doubling the input should roughly
+# double the time. Run from backend/:  python benchmarks/bench_chunking.py
+import os
+import sys
+import math
+import time
+import random
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.chunking import chunk_by_words
+from app.utils.preprocessing import segment_sentence_spans
+
+WORDS = ("river valley rain farmer harvest city council winter market story "
+         "letter village road bridge school teacher").split()
+
+
+def make_text(n_sentences: int, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    return " ".join(
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 30))).capitalize() + "."
+        for _ in range(n_sentences)
+    )
+
+
+def best_of(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunker scaling benchmark")
+    parser.add_argument("--sizes", default="5000,10000,20000,40000", help="Sentence counts")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    rows = []
+    for n in sizes:
+        text = make_text(n)
+        spans = segment_sentence_spans(text)
+        seg = best_of(lambda: segment_sentence_spans(text), args.repeat)
+        chunk = best_of(lambda: chunk_by_words(text, 600, 100, spans=spans), args.repeat)
+        rows.append((n, len(text.split()), seg, chunk))
+
+    print(f"{'sentences':>10} {'words':>9} {'segment s':>10} {'chunk s':>9} {'us/sent':>8}")
+    for n, words, seg, chunk in rows:
+        print(f"{n:>10} {words:>9} {seg:>10.3f} {chunk:>9.3f} {1e6 * chunk / n:>8.2f}")
+
+    # Log-log slope of chunking time vs input size: ~1.0 is linear
+    (n0, _, _, t0), (n1, _, _, t1) = rows[0], rows[-1]
+    slope = math.log(t1 / t0) / math.log(n1 / n0)
+    print(f"\nScaling exponent: {slope:.2f} ({'linear' if slope < 1.25 else 'SUPERLINEAR'})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# backend/benchmarks/bench_pdf_extraction.py
+# Compares PDF text extraction paths on a synthetic book: the old serial
+# PyPDF2 loop (text += page), serial PyMuPDF, and the page-range process pool
+# at increasing worker counts. Run from backend/:
+#   python benchmarks/bench_pdf_extraction.py --pages 1000 --workers 1,2,4,8
+# Speedups only show when the machine has that many free cores.
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz
+
+from app.services import pdf_extractor
+from benchmarks.run_suite import make_book
+
+WORDS_PER_PAGE = 450
+
+
+def write_pdf(path: str, pages: int) -> None:
+    words = make_book(pages * WORDS_PER_PAGE).split()
+    pdf = fitz.open()
+    for i in range(0, len(words), WORDS_PER_PAGE):
+        page = pdf.new_page()
+        page.insert_textbox(fitz.Rect(36, 36, 559, 806), " ".join(words[i:i + WORDS_PER_PAGE]), fontsize=9)
+    pdf.save(path)
+    pdf.close()
+
+
+def legacy_pypdf2(path: str) -> str:
+    """The pre-pool text_extractor path, kept here as the reference point."""
+    import PyPDF2
+
+    text = ""
+    with open(path, "rb") as f:
+        for page in PyPDF2.PdfReader(f).pages:
+            t = page.extract_text()
+            if t:
+                text += t + "\n"
+    return text
+
+
+def best_of(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF extraction benchmark")
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--workers", default=f"1,2,4,{os.cpu_count() or 1}", help="Pool sizes to try")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-legacy", action="store_true", help="Skip the (slow) PyPDF2 reference")
+    args = parser.parse_args()
+
+    workers = sorted({int(w) for w in args.workers.split(",") if int(w) > 1})
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "book.pdf")
+        write_pdf(path, args.pages)
+
+        if not args.skip_legacy:
+            try:
+                rows.append(("PyPDF2 serial (legacy)", best_of(lambda: legacy_pypdf2(path), args.repeat)))
+            except ImportError:
+                print("PyPDF2 not installed; skipping the legacy reference.")
+
+        serial = best_of(lambda: pdf_extractor.extract_pages(path, workers=1), args.repeat)
+        rows.append(("PyMuPDF serial", serial))
+        for w in workers:
+            pdf_extractor.extract_pages(path, workers=w)  # warm-up: spawn the pool processes
+            rows.append((f"PyMuPDF pool x{w}", best_of(lambda: pdf_extractor.extract_pages(path, workers=w), args.repeat)))
+        pdf_extractor.shutdown_pool()
+
+    print(f"\n{args.pages} pages, {os.cpu_count()} CPUs\n")
+    print(f"{'path':<26} {'seconds':>9} {'pages/s':>9} {'vs serial':>10}")
+    for name, seconds in rows:
+        print(f"{name:<26} {seconds:>9.3f} {args.pages / seconds:>9.0f} {serial / seconds:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
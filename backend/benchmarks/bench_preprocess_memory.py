@@ -0,0 +1,54 @@
+# backend/benchmarks/bench_preprocess_memory.py
+# Peak traced memory of the streaming preprocessor as the book grows; it should
+# stay roughly flat. Run from backend/:  python benchmarks/bench_preprocess_memory.py
+import os
+import sys
+import time
+import random
+import argparse
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.preprocessing import iter_preprocessed_chunks, RunningTextStats, detect_language
+
+WORDS = ("river valley rain farmer harvest city council winter market story "
+         "letter village road bridge school teacher").split()
+
+
+def generate_book(n_words: int, seed: int = 7, page_words: int = 400):
+    """Yields the book page by page, like a PDF extractor would."""
+    rng = random.Random(seed)
+    remaining = n_words
+    while remaining > 0:
+        page, count = [], 0
+        while count < page_words and remaining > 0:
+            length = min(rng.randint(6, 30), remaining)
+            page.append(" ".join(rng.choice(WORDS) for _ in range(length)).capitalize() + ".")
+            count += length
+            remaining -= length
+        yield " ".join(page) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming preprocess memory benchmark")
+    parser.add_argument("--sizes", default="50000,125000,250000,500000", help="Book sizes in words")
+    args = parser.parse_args()
+
+    # Load langdetect's profiles up front so they don't count against the first run
+    detect_language("warm up the language detector profiles")
+
+    print(f"{'words':>9} {'chunks':>7} {'peak KiB':>9} {'seconds':>8}")
+    for n_words in (int(s) for s in args.sizes.split(",")):
+        stats = RunningTextStats()
+        tracemalloc.start()
+        start = time.perf_counter()
+        chunks = sum(1 for _ in iter_preprocessed_chunks(generate_book(n_words), stats=stats))
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{stats.word_count:>9} {chunks:>7} {peak / 1024:>9.0f} {elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
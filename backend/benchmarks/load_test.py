@@ -0,0 +1,390 @@
+# backend/benchmarks/load_test.py
+# End-to-end load test: virtual users drive a weighted mix of upload, summary
+# (generate + poll), agent chat, translate, quiz and graph requests and the
+# run reports throughput, p50/p95/p99, error rate and event-loop lag per route.
+#
+# In-process (default): the app runs inside this event loop through httpx's
+# ASGI transport with PROVIDER_MODE=fake and a throwaway SQLite database, so a
+# handler that blocks the loop shows up as "block" time on its route.
+#   python benchmarks/load_test.py --users 20 --duration 30
+# Against a running server (e.g. uvicorn --workers N), to size workers:
+#   python benchmarks/load_test.py --url http://localhost:8000 --users 50
+import os
+import sys
+import json
+import math
+import time
+import asyncio
+import random
+import argparse
+import tempfile
+from collections import defaultdict
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.run_suite import make_book
+
+DEFAULT_MIX = "upload=5,summary=25,agent=15,translate=20,quiz=15,graph=15"
+LAG_INTERVAL_SECONDS = 0.01
+SUMMARY_POLL_SECONDS = 0.5
+SUMMARY_POLL_TIMEOUT = 60
+LANGUAGES = ["hi", "bn", "ta", "fr", "de"]
+
+
+# ---------------------------------------------------------
+# 1. METRICS
+# ---------------------------------------------------------
+def percentile(values, q: float) -> float:
+    """Nearest-rank percentile (q in 0-100) of an unsorted list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), math.ceil(q / 100 * len(ordered))))
+    return ordered[rank - 1]
+
+
+class RouteStats:
+    __slots__ = ("latencies", "errors", "statuses", "blocked", "max_block")
+
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self.statuses = defaultdict(int)
+        self.blocked = 0.0
+        self.max_block = 0.0
+
+
+class _Stepped:
+    """
+    Awaits a coroutine one step at a time, timing each step. In-process, a
+    request's handler runs inside these steps, so the longest step is exactly
+    how long that request held the event loop without yielding.
+    """
+    def __init__(self, coro):
+        self.coro = coro
+        self.total = 0.0
+        self.longest = 0.0
+
+    def _record(self, start: float) -> None:
+        step = time.perf_counter() - start
+        self.total += step
+        self.longest = max(self.longest, step)
+
+    def __await__(self):
+        value, error = None, None
+        while True:
+            start = time.perf_counter()
+            try:
+                yielded = self.coro.throw(error) if error is not None else self.coro.send(value)
+            except StopIteration as done:
+                self._record(start)
+                return done.value
+            except BaseException:
+                self._record(start)
+                raise
+            self._record(start)
+            try:
+                value, error = (yield yielded), None
+            except BaseException as e:  # cancellation and the like go to the coroutine
+                value, error = None, e
+
+
+class Recorder:
+    """Per-route latencies and event-loop blocking, plus overall loop lag."""
+    def __init__(self):
+        self.routes = defaultdict(RouteStats)
+        self.loop_lags = []
+
+    async def request(self, client, route: str, method: str, url: str, **kwargs):
+        stats = self.routes[route]
+        stepped = _Stepped(client.request(method, url, **kwargs))
+        start = time.perf_counter()
+        try:
+            response = await stepped
+            status = response.status_code
+        except Exception as e:
+            response, status = None, type(e).__name__
+        stats.latencies.append(time.perf_counter() - start)
+        stats.blocked += stepped.total
+        stats.max_block = max(stats.max_block, stepped.longest)
+        stats.statuses[status] += 1
+        if response is None or response.status_code >= 400:
+            stats.errors += 1
+        return response
+
+    async def monitor_loop(self, stop: asyncio.Event):
+        """Overshoot of a short sleep: how late the loop gets around to ready tasks."""
+        while not stop.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(LAG_INTERVAL_SECONDS)
+            self.loop_lags.append(time.perf_counter() - start - LAG_INTERVAL_SECONDS)
+
+    def report(self, elapsed: float) -> dict:
+        routes = {}
+        for route, stats in sorted(self.routes.items()):
+            count = len(stats.latencies)
+            routes[route] = {
+                "requests": count,
+                "throughput_rps": round(count / elapsed, 2),
+                "p50_ms": round(percentile(stats.latencies, 50) * 1000, 1),
+                "p95_ms": round(percentile(stats.latencies, 95) * 1000, 1),
+                "p99_ms": round(percentile(stats.latencies, 99) * 1000, 1),
+                "max_ms": round(max(stats.latencies, default=0) * 1000, 1),
+                "error_rate": round(stats.errors / count, 3) if count else 0.0,
+                "statuses": {str(k): v for k, v in stats.statuses.items()},
+                "loop_blocked_ms_per_request": round(stats.blocked / count * 1000, 1) if count else 0.0,
+                "loop_blocked_max_ms": round(stats.max_block * 1000, 1),
+            }
+        total = sum(r["requests"] for r in routes.values())
+        return {
+            "elapsed_seconds": round(elapsed, 1),
+            "total_requests": total,
+            "throughput_rps": round(total / elapsed, 2),
+            "loop_lag_ms": {
+                "p50": round(percentile(self.loop_lags, 50) * 1000, 1),
+                "p99": round(percentile(self.loop_lags, 99) * 1000, 1),
+                "max": round(max(self.loop_lags, default=0) * 1000, 1),
+            },
+            "routes": routes,
+        }
+
+
+# ---------------------------------------------------------
+# 2. SCENARIOS
+# ---------------------------------------------------------
+class Session:
+    """What a virtual user knows: its auth header and the books it can use."""
+    def __init__(self, headers: dict, book_ids: list, rng: random.Random, deadline: float):
+        self.headers = headers
+        self.book_ids = book_ids
+        self.rng = rng
+        self.deadline = deadline
+
+    def book(self) -> int:
+        return self.rng.choice(self.book_ids)
+
+
+async def scenario_upload(client, rec: Recorder, s: Session):
+    n_words = s.rng.choice([2000, 10000, 40000])
+    body = make_book(n_words, seed=s.rng.randint(0, 10**6)).encode()
+    response = await rec.request(
+        client, "POST /books/", "POST", "/books/",
+        data={"title": f"Load test {n_words}w", "author": "loadtest"},
+        files={"file": (f"load_{s.rng.randint(0, 10**9)}.txt", body, "text/plain")},
+        headers=s.headers,
+    )
+    if response is None or response.status_code != 200:
+        return
+    # Ingestion runs in the background: only ingested books join the pool
+    book_id = response.json()["book_id"]
+    deadline = min(time.perf_counter() + SUMMARY_POLL_TIMEOUT, s.deadline)
+    while time.perf_counter() < deadline:
+        await asyncio.sleep(SUMMARY_POLL_SECONDS)
+        poll = await rec.request(client, "GET /books/{book_id}", "GET", f"/books/{book_id}", headers=s.headers)
+        status = poll.json().get("status") if poll is not None and poll.status_code == 200 else "failed"
+        if status == "failed":
+            return
+        if status not in ("uploaded", "extracting"):
+            s.book_ids.append(book_id)
+            return
+
+
+async def scenario_summary(client, rec: Recorder, s: Session):
+    book_id = s.book()
+    payload = {
+        "book_id": book_id,
+        "summary_length": s.rng.choice(["short", "medium", "long"]),
+        "summary_format": s.rng.choice(["paragraph", "bullet"]),
+        "engine": "fast" if s.rng.random() < 0.2 else "gemini",
+    }
+    response = await rec.request(client, "POST /summary/generate", "POST", "/summary/generate", json=payload)
+    if response is None or response.status_code != 200 or response.json().get("status") == "completed":
+        return
+    # Poll like the frontend does until the job lands
+    deadline = min(time.perf_counter() + SUMMARY_POLL_TIMEOUT, s.deadline)
+    while time.perf_counter() < deadline:
+        await asyncio.sleep(SUMMARY_POLL_SECONDS)
+        poll = await rec.request(client, "GET /summary/{book_id}", "GET", f"/summary/{book_id}")
+        if poll is None or poll.status_code != 200 or poll.json().get("status") in ("completed", "failed"):
+            return
+
+
+async def scenario_agent(client, rec: Recorder, s: Session):
+    question = s.rng.choice(["Who is the main character?", "Summarize chapter one.", "What is the key argument?"])
+    await rec.request(client, "POST /agent/chat", "POST", "/agent/chat",
+                      json={"query": question, "book_ids": [s.book()]})
+
+
+async def scenario_translate(client, rec: Recorder, s: Session):
+    text = make_book(s.rng.choice([50, 300, 1500]), seed=s.rng.randint(0, 10**6))
+    await rec.request(client, "POST /translate/translate", "POST", "/translate/translate",
+                      json={"text": text, "target_lang": s.rng.choice(LANGUAGES)})
+
+
+async def scenario_quiz(client, rec: Recorder, s: Session):
+    await rec.request(client, "GET /quiz/generate/{book_id}", "GET", f"/quiz/generate/{s.book()}",
+                      params={"lang": "en-IN"})
+
+
+async def scenario_graph(client, rec: Recorder, s: Session):
+    await rec.request(client, "GET /graph/generate/{book_id}", "GET", f"/graph/generate/{s.book()}")
+
+
+SCENARIOS = {
+    "upload": scenario_upload,
+    "summary": scenario_summary,
+    "agent": scenario_agent,
+    "translate": scenario_translate,
+    "quiz": scenario_quiz,
+    "graph": scenario_graph,
+}
+
+
+def parse_mix(mix: str) -> dict:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario '{name}'. Choose from: {', '.join(SCENARIOS)}")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+# ---------------------------------------------------------
+# 3. RUNNER
+# ---------------------------------------------------------
+async def setup(client, n_books: int, rng: random.Random):
+    """Registers a load-test user, logs in and uploads the starting books."""
+    email = f"loadtest-{rng.randint(0, 10**9)}@example.com"
+    await client.post("/auth/register", json={"name": "Load Test", "email": email, "password": "loadtest-pass"})
+    login = await client.post("/auth/login", json={"email": email, "password": "loadtest-pass"})
+    login.raise_for_status()
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    book_ids = []
+    for i in range(n_books):
+        body = make_book(rng.choice([5000, 20000]), seed=i).encode()
+        response = await client.post(
+            "/books/", data={"title": f"Seed book {i}"},
+            files={"file": (f"seed_{i}.txt", body, "text/plain")}, headers=headers,
+        )
+        response.raise_for_status()
+        book_ids.append(response.json()["book_id"])
+
+    # Wait for background ingestion so every scenario starts with extracted text
+    pending, deadline = set(book_ids), time.perf_counter() + SUMMARY_POLL_TIMEOUT
+    while pending and time.perf_counter() < deadline:
+        await asyncio.sleep(SUMMARY_POLL_SECONDS)
+        for book_id in list(pending):
+            book = (await client.get(f"/books/{book_id}", headers=headers)).json()
+            if book.get("status") not in ("uploaded", "extracting"):
+                pending.discard(book_id)
+    return headers, book_ids
+
+
+async def virtual_user(client, rec: Recorder, session: Session, weights: dict, think: float):
+    names, values = list(weights), list(weights.values())
+    while time.perf_counter() < session.deadline:
+        name = session.rng.choices(names, values)[0]
+        await SCENARIOS[name](client, rec, session)
+        if think:
+            await asyncio.sleep(session.rng.uniform(0, 2 * think))
+
+
+async def run(client, args) -> dict:
+    rng = random.Random(args.seed)
+    headers, book_ids = await setup(client, args.books, rng)
+    weights = parse_mix(args.mix)
+
+    rec = Recorder()
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(rec.monitor_loop(stop))
+    start = time.perf_counter()
+    deadline = start + args.duration
+    await asyncio.gather(*(
+        virtual_user(client, rec, Session(headers, book_ids, random.Random(args.seed + i), deadline), weights, args.think)
+        for i in range(args.users)
+    ))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await monitor
+
+    report = rec.report(elapsed)
+    report["config"] = {k: v for k, v in vars(args).items()}
+    return report
+
+
+def print_report(report: dict, in_process: bool) -> None:
+    print(f"\n{report['total_requests']} requests in {report['elapsed_seconds']}s "
+          f"({report['throughput_rps']} req/s)")
+    header = f"{'route':<32}{'reqs':>6}{'rps':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'err %':>7}"
+    if in_process:
+        header += f"{'block/req':>10}{'block max':>10}"
+    print(header)
+    for route, r in report["routes"].items():
+        line = (f"{route:<32}{r['requests']:>6}{r['throughput_rps']:>8}{r['p50_ms']:>9}"
+                f"{r['p95_ms']:>9}{r['p99_ms']:>9}{r['error_rate'] * 100:>7.1f}")
+        if in_process:
+            line += f"{r['loop_blocked_ms_per_request']:>10}{r['loop_blocked_max_ms']:>10}"
+        print(line)
+    if in_process:
+        lag = report["loop_lag_ms"]
+        print(f"\nEvent-loop lag: p50 {lag['p50']} ms, p99 {lag['p99']} ms, max {lag['max']} ms")
+        print("block = ms the route held the event loop without yielding; "
+              "a high value means blocking work in an async handler.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end load test")
+    parser.add_argument("--url", help="Target a running server instead of the in-process app")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of load")
+    parser.add_argument("--think", type=float, default=0.2, help="Mean think time between actions (s)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Scenario weights, e.g. 'summary=3,quiz=1'")
+    parser.add_argument("--books", type=int, default=3, help="Books uploaded before the run")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--provider-quotas", action="store_true",
+                        help="In-process: keep the published provider rate limits instead of lifting them")
+    parser.add_argument("--out", help="Write the report JSON here")
+    args = parser.parse_args()
+
+    import httpx
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=120)
+    else:
+        # Must be set before the app (and its provider factories) are imported
+        os.environ.setdefault("PROVIDER_MODE", "fake")
+        os.environ.setdefault("JOB_WORKER_MODE", "embedded")  # one process: the workers run inside it
+        scratch = tempfile.mkdtemp()
+        os.environ.setdefault("DATABASE_URL", f"sqlite:///{scratch}/loadtest.db")
+        os.environ.setdefault("UPLOAD_DIR", os.path.join(scratch, "uploads"))
+        if not args.provider_quotas:
+            # Measure the app, not the free-tier quota the governor would enforce
+            for provider in ("GROQ", "GEMINI"):
+                os.environ.setdefault(f"{provider}_REQUESTS_PER_MINUTE", "1000000")
+                os.environ.setdefault(f"{provider}_TOKENS_PER_MINUTE", "1000000000")
+        from app.main import app
+        from app.utils.database import engine
+        from app.models import Base
+        from app.services.job_queue import start_embedded_workers
+
+        Base.metadata.create_all(bind=engine)
+        # The ASGI transport doesn't send lifespan events, so start the workers here
+        start_embedded_workers()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=120)
+
+    async def go():
+        async with client:
+            return await run(client, args)
+
+    report = asyncio.run(go())
+    print_report(report, in_process=not args.url)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
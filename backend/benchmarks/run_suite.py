@@ -0,0 +1,319 @@
+# backend/benchmarks/run_suite.py
+# Microbenchmarks for the text-processing hot paths over synthetic books of
+# 1k-500k words. Run from backend/:
+#   python benchmarks/run_suite.py --out benchmarks/results/baseline.json   (on main)
+#   python benchmarks/run_suite.py --baseline benchmarks/results/baseline.json
+# Exits 1 when a case regressed against the baseline or scales superlinearly.
+# Timings are machine specific, so no baseline is committed (benchmarks/results/
+# is git-ignored): record one on the machine you compare on, with the NLTK data
+# and optional packages installed so no case is skipped.
+import os
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import platform
+import tempfile
+import statistics
+from datetime import datetime, timezone
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEFAULT_SIZES = "1000,10000,100000,500000"
+# A case is flagged when it gets this much slower than the baseline...
+REGRESSION_TOLERANCE = 0.25
+# ...ignoring timings too small to compare reliably
+NOISE_FLOOR_SECONDS = 0.002
+# Fast cases are re-run until this much time is spent, for a stable best time
+MIN_MEASURE_SECONDS = 0.5
+# Log-log slope of time vs words above which a case counts as superlinear
+# (cache effects alone push linear code to ~1.2 on big inputs; quadratic is 2.0)
+SUPERLINEAR_SLOPE = 1.35
+
+WORDS = ("river valley rain farmer harvest city council winter market story "
+         "letter village road bridge school teacher government economy history "
+         "science energy water climate research student").split()
+
+
+# ---------------------------------------------------------
+# 1. SYNTHETIC CORPUS
+# ---------------------------------------------------------
+def make_book(n_words: int, seed: int = 7) -> str:
+    """Paragraphs of varied sentences, with the abbreviations, decimals and
+    stray spacing that the cleaning and segmentation code has to handle."""
+    rng = random.Random(seed)
+    paragraphs, sentences, remaining = [], [], n_words
+    while remaining > 0:
+        length = min(rng.randint(6, 30), remaining)
+        words = [rng.choice(WORDS) for _ in range(length)]
+        roll = rng.random()
+        if roll < 0.05 and length > 3:
+            words[1] = "Dr."
+        elif roll < 0.10 and length > 3:
+            words[2] = f"{rng.randint(1, 99)}.{rng.randint(0, 9)}"
+        elif roll < 0.15 and length > 3:
+            words[-2] += " \t "
+        sentences.append(" ".join(words).capitalize() + rng.choice(".....?!"))
+        remaining -= length
+        if len(sentences) >= rng.randint(4, 9):
+            paragraphs.append(" ".join(sentences))
+            sentences = []
+    paragraphs.append(" ".join(sentences))
+    return "\n\n".join(p for p in paragraphs if p)
+
+
+def write_fixtures(text: str, directory: str) -> dict:
+    """The same text as .txt, .docx and .pdf files."""
+    import docx
+    import fitz
+
+    paths = {ext: os.path.join(directory, f"book.{ext}") for ext in ("txt", "docx", "pdf")}
+    with open(paths["txt"], "w", encoding="utf-8") as f:
+        f.write(text)
+
+    document = docx.Document()
+    for paragraph in text.split("\n\n"):
+        document.add_paragraph(paragraph)
+    document.save(paths["docx"])
+
+    pdf = fitz.open()
+    words = text.split()
+    for i in range(0, len(words), 450):  # ~450 words per A4 page at 9pt
+        page = pdf.new_page()
+        page.insert_textbox(fitz.Rect(36, 36, 559, 806), " ".join(words[i:i + 450]), fontsize=9)
+    pdf.save(paths["pdf"])
+    pdf.close()
+    return paths
+
+
+# ---------------------------------------------------------
+# 2. CASES
+# ---------------------------------------------------------
+# Each case takes (text, fixture paths) and returns the zero-argument call to time.
+# Anything only needed by the case is imported inside it, so one missing
+# dependency skips that case instead of the whole suite.
+def case_extract_txt(text, paths):
+    from app.services.text_extractor import extract_text
+    return lambda: extract_text(paths["txt"])
+
+
+def case_extract_docx(text, paths):
+    from app.services.text_extractor import extract_text
+    return lambda: extract_text(paths["docx"])
+
+
+def case_extract_pdf(text, paths):
+    from app.services.text_extractor import extract_text
+    return lambda: extract_text(paths["pdf"])
+
+
+def case_clean_text(text, paths):
+    from app.utils.preprocessing import clean_text
+    return lambda: clean_text(text)
+
+
+def case_segment_sentences(text, paths):
+    from app.utils.preprocessing import segment_sentences
+    return lambda: segment_sentences(text)
+
+
+def case_chunk_text(text, paths):
+    from app.utils.preprocessing import chunk_text, segment_sentence_spans
+    spans = segment_sentence_spans(text)
+    return lambda: chunk_text(text, spans=spans)
+
+
+def case_chunking_service(text, paths):
+    from app.services.chunking_service import ChunkingService
+    service = ChunkingService()
+    service.tokenizer  # load outside the timed region
+    # A fresh token cache each round, so repeats measure cold chunking
+    return lambda: (service._token_counts.clear(), service.chunk_text(text))
+
+
+def case_sarvam_split_text(text, paths):
+    from app.services.sarvam_service import SarvamService
+    service = SarvamService()
+    return lambda: service.split_text(text)
+
+
+def case_clean_formatting(text, paths):
+    from app.utils.postprocessing import clean_formatting
+    return lambda: clean_formatting(text)
+
+
+def case_remove_redundancy(text, paths):
+    from app.utils.postprocessing import remove_redundancy
+    return lambda: remove_redundancy(text)
+
+
+def case_extract_local_keywords(text, paths):
+    from app.utils.postprocessing import extract_local_keywords
+    return lambda: extract_local_keywords(text)
+
+
+CASES = {
+    "text_extractor.extract_text[txt]": case_extract_txt,
+    "text_extractor.extract_text[docx]": case_extract_docx,
+    "text_extractor.extract_text[pdf]": case_extract_pdf,
+    "preprocessing.clean_text": case_clean_text,
+    "preprocessing.segment_sentences": case_segment_sentences,
+    "preprocessing.chunk_text": case_chunk_text,
+    "ChunkingService.chunk_text": case_chunking_service,
+    "SarvamService.split_text": case_sarvam_split_text,
+    "postprocessing.clean_formatting": case_clean_formatting,
+    "postprocessing.remove_redundancy": case_remove_redundancy,
+    "postprocessing.extract_local_keywords": case_extract_local_keywords,
+}
+
+
+# ---------------------------------------------------------
+# 3. TIMING
+# ---------------------------------------------------------
+def measure(func, repeat: int, budget_seconds: float) -> dict:
+    """
+    Best and median of at least `repeat` runs (fast cases keep going for
+    MIN_MEASURE_SECONDS so the best run is stable); slow cases stop once over budget.
+    """
+    func()  # warm-up: imports, regex compilation, lazy data
+    timings = []
+    spent = 0.0
+    while (len(timings) < repeat or spent < MIN_MEASURE_SECONDS) and (not timings or spent < budget_seconds):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+        spent += timings[-1]
+    return {"best": min(timings), "median": statistics.median(timings), "runs": len(timings)}
+
+
+def scaling_exponent(points: dict) -> float:
+    """Least-squares slope of log(time) vs log(words); ~1.0 is linear."""
+    # Timings under the noise floor are mostly fixed overhead and would flatten the slope
+    usable = {n: t for n, t in points.items() if t >= NOISE_FLOOR_SECONDS}
+    if len(usable) >= 2:
+        points = usable
+    pairs = [(math.log(int(n)), math.log(t)) for n, t in points.items() if t > 0]
+    if len(pairs) < 2:
+        return None
+    mean_x = sum(x for x, _ in pairs) / len(pairs)
+    mean_y = sum(y for _, y in pairs) / len(pairs)
+    var_x = sum((x - mean_x) ** 2 for x, _ in pairs)
+    if var_x == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in pairs) / var_x
+
+
+def run_suite(sizes, case_names, repeat: int, budget_seconds: float) -> dict:
+    results = {name: {"timings": {}, "skipped": None} for name in case_names}
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_words in sizes:
+            text = make_book(n_words)
+            paths = write_fixtures(text, tmp)
+            for name in case_names:
+                entry = results[name]
+                if entry["skipped"]:
+                    continue
+                try:
+                    func = CASES[name](text, paths)
+                    entry["timings"][str(n_words)] = measure(func, repeat, budget_seconds)
+                except Exception as e:
+                    entry["skipped"] = f"{type(e).__name__}: {' '.join(str(e).replace('*', '').split())}"
+                    continue
+                print(f"  {name:<40} {n_words:>8} words  {entry['timings'][str(n_words)]['best']:>9.4f}s")
+
+    for entry in results.values():
+        exponent = scaling_exponent({n: t["best"] for n, t in entry["timings"].items()})
+        entry["scaling_exponent"] = round(exponent, 3) if exponent is not None else None
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": sizes,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+# ---------------------------------------------------------
+# 4. BASELINE COMPARISON
+# ---------------------------------------------------------
+def compare(current: dict, baseline: dict, tolerance: float = REGRESSION_TOLERANCE,
+            max_slope: float = SUPERLINEAR_SLOPE) -> list:
+    """Human-readable problems; empty when the run is at least as good as the baseline."""
+    problems = []
+    for name, entry in current["results"].items():
+        exponent = entry.get("scaling_exponent")
+        if exponent is not None and exponent > max_slope:
+            problems.append(f"SUPERLINEAR {name}: time grows as words^{exponent:.2f}")
+
+        base_entry = baseline.get("results", {}).get(name)
+        if not base_entry:
+            continue
+        for size, timing in entry["timings"].items():
+            base = base_entry["timings"].get(size)
+            if not base or base["best"] < NOISE_FLOOR_SECONDS:
+                continue
+            ratio = timing["best"] / base["best"]
+            if ratio > 1 + tolerance:
+                problems.append(
+                    f"REGRESSION {name} @ {size} words: {base['best']:.4f}s -> {timing['best']:.4f}s ({ratio:.2f}x)"
+                )
+    return problems
+
+
+def print_table(report: dict) -> None:
+    sizes = [str(s) for s in report["meta"]["sizes"]]
+    print(f"\n{'case':<40}" + "".join(f"{s + 'w':>11}" for s in sizes) + f"{'slope':>7}")
+    for name, entry in report["results"].items():
+        if entry["skipped"] and not entry["timings"]:
+            print(f"{name:<40} skipped ({entry['skipped'][:60]})")
+            continue
+        cells = "".join(
+            f"{entry['timings'][s]['best']:>10.4f}s" if s in entry["timings"] else f"{'-':>11}" for s in sizes
+        )
+        slope = entry["scaling_exponent"]
+        print(f"{name:<40}{cells}{slope if slope is not None else '-':>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Text-processing microbenchmark suite")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Book sizes in words")
+    parser.add_argument("--cases", default="", help="Comma-separated substrings selecting cases")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=5.0, help="Seconds per case and size before stopping early")
+    parser.add_argument("--out", help="Write results JSON here")
+    parser.add_argument("--baseline", help="Compare against this results JSON")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    selectors = [s.strip() for s in args.cases.split(",") if s.strip()]
+    case_names = [n for n in CASES if not selectors or any(s in n for s in selectors)]
+
+    report = run_suite(sizes, case_names, args.repeat, args.budget)
+    print_table(report)
+
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.out}")
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    problems = compare(report, baseline, tolerance=args.tolerance)
+    for problem in problems:
+        print(problem)
+    if not problems:
+        print("\nNo regressions" + (" against the baseline." if args.baseline else "."))
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,7 @@ import nltk
 import logging
 
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
@@ -12,8 +12,13 @@ from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 
 from app.limiter import limiter
-from app.utils.database import engine
+from app.utils.database import engine, SessionLocal
 from app.models import Base
+from app.services.job_queue import start_embedded_workers, stop_embedded_workers
+from app.services.analytics_rollup import ensure_backfilled
+from app.services.pdf_extractor import shutdown_pool as shutdown_pdf_pool
+from app.services.book_content import start_legacy_text_migration
+from app.utils.stage_timer import render_prometheus
 
 # =========================================
 # ✅ PATH SETUP & LOGGING
@@ -41,6 +46,10 @@ def download_nltk():
 download_nltk()
 Base.metadata.create_all(bind=engine)
 
+# Seed the admin dashboard rollups from data that predates them (no-op afterwards)
+with SessionLocal() as _db:
+    ensure_backfilled(_db)
+
 # =========================================
 # ✅ APP INITIALIZATION
 # =========================================
@@ -128,6 +137,13 @@ app.include_router(meeting.router, prefix="/meeting", tags=["Meeting Summarizer"
 def read_root():
     return {"message": "✅ Book Summarizer API is Online", "docs": "/docs"}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    # Prometheus scrape target: per-stage and per-job-kind latency histograms of THIS process.
+    # External workers (the default) serve their own on WORKER_METRICS_PORT + n (see worker.py);
+    # /admin/analytics/stages reads the persisted timings of every process.
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
 @app.get("/api/dashboard/data")
 def get_dashboard_data():
     return {
@@ -148,6 +164,26 @@ def get_dashboard_data():
         ]
     }
 
+# =========================================
+# ✅ JOB WORKERS (only with JOB_WORKER_MODE=embedded; the default runs `python worker.py`)
+# =========================================
+@app.on_event("startup")
+def start_job_workers():
+    start_embedded_workers()
+
+@app.on_event("startup")
+def compact_book_texts():
+    # Books from before BookContent: compress their text off the hot row, in the background
+    start_legacy_text_migration()
+
+@app.on_event("shutdown")
+def stop_job_workers():
+    stop_embedded_workers()
+
+@app.on_event("shutdown")
+def stop_pdf_extraction_pool():
+    shutdown_pdf_pool()
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     logger.error(f"Unhandled error: {exc}", exc_info=True)
@@ -1,8 +1,13 @@
+import itertools
+from contextlib import contextmanager
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from app.main import app
+from app.models import User, Book
 from app.utils.database import Base, get_db
 
 # 1. Create a Temporary Test Database (In-Memory SQLite)
@@ -32,4 +37,63 @@ def test_db():
 @pytest.fixture(scope="module")
 def client():
     with TestClient(app) as c:
-        yield c
\ No newline at end of file
+        yield c
+
+# 5. Fresh In-Memory Database per Test (service-level tests, no HTTP)
+@pytest.fixture
+def db_engine():
+    # StaticPool: every session (and worker code run in the test) sees the same in-memory DB
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def session_factory(db_engine):
+    """Stands in for SessionLocal (monkeypatch it into modules that open their own sessions)."""
+    return sessionmaker(bind=db_engine)
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+@pytest.fixture
+def captured_sql(db_engine):
+    """`with captured_sql() as statements:` collects the SQL run on the test database."""
+    @contextmanager
+    def capture():
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db_engine, "before_cursor_execute", listener)
+        try:
+            yield statements
+        finally:
+            event.remove(db_engine, "before_cursor_execute", listener)
+    return capture
+
+# 6. Factories
+@pytest.fixture
+def make_user(db):
+    numbers = itertools.count(1)
+
+    def make(name: str = "Reader", **fields) -> User:
+        fields.setdefault("email", f"user{next(numbers)}@example.com")
+        fields.setdefault("password_hash", "x")
+        user = User(name=name, **fields)
+        db.add(user)
+        db.commit()
+        return user
+    return make
+
+@pytest.fixture
+def make_book(db, make_user):
+    def make(user: User = None, **fields) -> Book:
+        fields.setdefault("title", "Book")
+        fields.setdefault("file_path", "uploads/book.pdf")
+        book = Book(user_id=(user or make_user()).user_id, **fields)
+        db.add(book)
+        db.commit()
+        return book
+    return make
@@ -0,0 +1,53 @@
+from benchmarks.run_suite import compare, make_book, scaling_exponent
+
+
+def report(timings, exponent=1.0):
+    return {"results": {"case": {
+        "timings": {size: {"best": t} for size, t in timings.items()},
+        "skipped": None,
+        "scaling_exponent": exponent,
+    }}}
+
+
+def test_scaling_exponent_tells_linear_from_quadratic():
+    assert abs(scaling_exponent({"1000": 0.01, "10000": 0.1, "100000": 1.0}) - 1.0) < 1e-6
+    assert abs(scaling_exponent({"1000": 0.01, "10000": 1.0, "100000": 100.0}) - 2.0) < 1e-6
+
+
+def test_compare_flags_regressions_and_superlinear_cases_only():
+    baseline = report({"1000": 0.001, "10000": 0.1})
+    assert compare(report({"1000": 0.0015, "10000": 0.11}), baseline) == []
+
+    problems = compare(report({"1000": 0.001, "10000": 0.2}, exponent=1.6), baseline)
+    assert any(p.startswith("SUPERLINEAR case") for p in problems)
+    assert any(p.startswith("REGRESSION case @ 10000") for p in problems)
+    # 1000 words is under the noise floor and never compared
+    assert not any("@ 1000 " in p for p in problems)
+
+
+def test_synthetic_books_are_deterministic_and_sized():
+    book = make_book(5000)
+    assert book == make_book(5000)
+    assert len(book.split()) == 5000
+
+
+def test_load_test_measures_how_long_a_request_holds_the_event_loop():
+    import asyncio
+    import time
+    from benchmarks.load_test import _Stepped, percentile
+
+    async def handler():
+        await asyncio.sleep(0.01)
+        time.sleep(0.05)  # blocking work in an async handler
+        await asyncio.sleep(0)
+        return "ok"
+
+    async def run():
+        stepped = _Stepped(handler())
+        return await stepped, stepped
+
+    result, stepped = asyncio.run(run())
+    assert result == "ok"
+    assert 0.05 <= stepped.longest < 0.09
+    assert percentile([5, 1, 4, 2, 3], 50) == 3
+    assert percentile(list(range(1, 101)), 99) == 99
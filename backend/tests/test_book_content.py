@@ -0,0 +1,83 @@
+import pytest
+
+from app.models import Book, BookContent
+from app.routers import books as books_router
+from app.services.book_content import migrate_legacy_texts
+from app.utils import text_codec
+
+TEXT = "Chapter one. The river rose slowly through the night, and the valley woke to water. " * 500
+
+
+@pytest.mark.parametrize("codec", ["zlib", "zstd"])
+def test_codecs_round_trip(codec):
+    if codec == "zstd" and text_codec.zstandard is None:
+        pytest.skip("zstandard not installed")
+    used, data = text_codec.compress_text(TEXT, codec)
+    assert used == codec and len(data) < len(TEXT) / 10
+    assert text_codec.decompress_text(used, data) == TEXT
+
+
+def test_text_is_compressed_off_the_row_and_loaded_only_when_read(session_factory, make_book, captured_sql):
+    book_id = make_book(title="River", file_path="uploads/r.txt", extracted_text=TEXT).book_id
+
+    db = session_factory()
+    with captured_sql() as statements:
+        books = db.query(Book).all()
+        listing = [(b.title, b.status) for b in books]
+        assert not any("book_contents" in s or "extracted_text" in s for s in statements)
+
+        book = db.get(Book, book_id)
+        assert book.extracted_text == TEXT
+        assert book.extracted_text is book.extracted_text  # decompressed once
+    assert ("River", "uploaded") in listing
+
+    content = db.get(BookContent, book_id)
+    assert content.text_length == len(TEXT) and len(content.data) < len(TEXT) / 10
+    book.extracted_text = "Shorter now."
+    db.commit()
+    assert db.get(Book, book_id).extracted_text == "Shorter now."
+    db.close()
+
+
+def test_legacy_rows_are_readable_and_migrated(db, make_book):
+    book_id = make_book(title="Old", file_path="uploads/o.txt", legacy_text=TEXT).book_id
+    assert db.get(Book, book_id).extracted_text == TEXT
+
+    assert migrate_legacy_texts(db, batch_size=1) == 1
+    book = db.get(Book, book_id)
+    assert book.legacy_text is None and book.content is not None
+    assert book.extracted_text == TEXT
+    assert migrate_legacy_texts(db) == 0
+
+
+def test_language_lives_beside_the_text_and_lists_without_it(db, session_factory, make_user, make_book, captured_sql):
+    # The books table keeps its pre-ingestion schema: existing databases need no ALTER
+    assert "language" not in Book.__table__.c
+    user = make_user()
+    make_book(user, title="River", extracted_text=TEXT)
+    make_book(user, title="Langue", extracted_text=TEXT).content.language = "fr"
+    make_book(user, title="Unread")
+    db.commit()
+
+    listing_db = session_factory()
+    with captured_sql() as statements:
+        listed = {b.title: b.language for b in books_router.get_books(db=listing_db, current_user=user)}
+    assert listed == {"River": None, "Langue": "fr", "Unread": None}
+    content_queries = [s for s in statements if "book_contents" in s]
+    assert len(content_queries) == 1 and "book_contents.data" not in content_queries[0]
+    listing_db.close()
+
+
+def test_polling_one_book_reads_its_language_without_the_text(db, session_factory, make_user, make_book, captured_sql):
+    user = make_user()
+    book_id = make_book(user, title="Langue", extracted_text=TEXT).book_id
+    db.get(Book, book_id).content.language = "fr"
+    db.commit()
+
+    polling_db = session_factory()
+    with captured_sql() as statements:
+        polled = books_router.get_book(book_id, db=polling_db, current_user=user)
+        assert polled.language == "fr"
+    content_queries = [s for s in statements if "book_contents" in s]
+    assert len(content_queries) == 1 and "book_contents.data" not in content_queries[0]
+    polling_db.close()
@@ -0,0 +1,143 @@
+import re
+
+from app.utils.chunking import build_chunks, chunk_by_words, chunk_by_chars, count_words
+from app.utils.preprocessing import segment_sentence_spans
+
+TEXT = " ".join(f"Sentence number {i} has exactly seven words." for i in range(20))
+
+
+def test_sentence_spans_are_offsets_into_the_source():
+    text = "Dr. Smith paid 1.5 dollars. Then he left!\n\nMr. Jones stayed."
+    spans = segment_sentence_spans(text)
+    assert [text[s:e] for s, e in spans] == [
+        "Dr. Smith paid 1.5 dollars.",
+        "Then he left!",
+        "Mr. Jones stayed.",
+    ]
+
+
+def test_chunks_respect_budget_and_overlap():
+    index = chunk_by_words(TEXT, 30, 10)
+    chunks = list(index)
+
+    assert all(c.token_count <= 30 for c in chunks)
+    assert all(count_words(c.text) == c.token_count for c in chunks)
+    # Consecutive chunks share trailing sentences and never go backwards
+    for prev, nxt in zip(chunks, chunks[1:]):
+        assert prev.start < nxt.start < prev.end
+    assert chunks[0].start == 0 and chunks[-1].end == len(TEXT)
+
+
+def test_oversized_sentence_is_split_at_word_boundaries():
+    index = chunk_by_words("word " * 1000, 500)
+    assert [len(t.split()) for t in index.texts()] == [500, 500]
+
+    index = chunk_by_chars("x" * 10 + " y" * 50, 20)
+    assert all(len(t) <= 20 for t in index.texts())
+
+
+def test_char_budget_counts_the_gaps_between_sentences():
+    text = "One two three.\n\n\n\nFour five six.\n\n\n\nSeven eight nine."
+    spans = segment_sentence_spans(text)
+    index = chunk_by_chars(text, 34, 18, spans=spans)
+
+    # 14 + 14 characters of sentences, 32 with the gap: fits 34 but not 31
+    assert all(len(t) <= 34 and len(t) == c.token_count for t, c in zip(index.texts(), index))
+    assert index.texts()[0] == "One two three.\n\n\n\nFour five six."
+    assert index.texts()[-1].endswith("Seven eight nine.")
+    assert len(chunk_by_chars(text, 31, spans=spans)) == 3
+
+
+def test_empty_text_yields_no_chunks():
+    assert len(build_chunks("", 100)) == 0
+    assert len(build_chunks("   ", 100)) == 0
+
+
+class FakeTokenizer:
+    """Whitespace 'tokenizer' with the fast-tokenizer batch API; counts calls."""
+    def __init__(self):
+        self.batch_calls = 0
+        self.single_calls = 0
+
+    def __call__(self, texts, **kwargs):
+        self.batch_calls += 1
+        ids, offsets = [], []
+        for text in texts:
+            words = [m.span() for m in re.finditer(r"\S+", text)]
+            ids.append(list(range(len(words))))
+            offsets.append(words)
+        return {"input_ids": ids, "offset_mapping": offsets}
+
+    def encode(self, text, add_special_tokens=False):
+        self.single_calls += 1
+        return text.split()
+
+
+def test_chunking_service_tokenizes_lazily_in_one_batch():
+    from app.services.chunking_service import ChunkingService
+
+    service = ChunkingService()
+    assert service._tokenizer is None  # nothing loaded at construction
+
+    fake = FakeTokenizer()
+    service._tokenizer = fake
+    service.max_chunk_tokens, service.overlap_tokens = 30, 10
+
+    chunks = service.chunk_text(TEXT + " " + "long " * 70 + "end.")
+    assert fake.batch_calls == 1 and fake.single_calls == 0
+    assert all(len(c.split()) <= 30 for c in chunks)
+
+    # Second pass over the same book is served entirely from the count cache
+    service.chunk_text(TEXT)
+    assert fake.batch_calls == 1
+
+
+def test_streaming_preprocess_matches_running_stats_and_budget():
+    from app.utils.preprocessing import iter_preprocessed_chunks, RunningTextStats
+
+    blocks = [TEXT[i:i + 37] for i in range(0, len(TEXT), 37)]  # cuts mid-sentence
+    pulled = []
+
+    def source():
+        for block in blocks:
+            pulled.append(block)
+            yield block
+
+    stats = RunningTextStats()
+    stream = iter_preprocessed_chunks(source(), chunk_size=30, overlap=10, stats=stats)
+    first = next(stream)
+    assert len(pulled) < len(blocks)  # first chunk arrives before the source is read
+
+    chunks = [first, *stream]
+    assert all(c["word_count"] <= 30 for c in chunks)
+    assert stats.sentence_count == 20 and stats.word_count == 140
+    # Offsets point back into the (already clean) stream
+    assert all(TEXT[c["start_char"]:c["end_char"]] == c["text"] for c in chunks)
+    assert [c["text"] for c in chunks] == chunk_by_words(TEXT, 30, 10).texts()
+
+
+def test_streaming_char_budget_counts_the_joining_spaces():
+    from app.utils.chunking import StreamingChunker, count_chars
+
+    chunker = StreamingChunker(max_tokens=22, counter=count_chars)
+    chunks = []
+    for n, sentence in enumerate(["Tides rise.", "Moon pulls.", "Seas fall."]):  # 11 + 11 + 10 chars
+        chunks += chunker.feed(sentence, n * 12)
+    chunks.append(chunker.flush())
+
+    # 11 + 11 fits 22 only if the joining space is ignored; 11 + 1 + 10 fits exactly
+    assert [c["text"] for c in chunks] == ["Tides rise.", "Moon pulls. Seas fall."]
+    assert all(len(c["text"]) == c["token_count"] <= 22 for c in chunks)
+
+
+def test_clean_stream_normalizes_across_block_boundaries():
+    from app.utils.preprocessing import clean_text, iter_sentences
+
+    raw = "The moon rises.\r\nSeas  \t follow it.   Caf\u00e9 \u00e9 tides turn.\r\n\r\n\r\nThe end."
+    expected = list(iter_sentences(raw, clean=True))
+    whole = clean_text(raw)
+    assert all(whole[start:start + len(sentence)] == sentence for sentence, start in expected)
+
+    # Every cut point, including inside "\r\n" and space runs, gives the same sentences and offsets
+    for cut in range(1, len(raw)):
+        assert list(iter_sentences([raw[:cut], raw[cut:]], clean=True)) == expected
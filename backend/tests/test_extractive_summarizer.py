@@ -0,0 +1,31 @@
+from app.services.extractive_summarizer import tfidf_matrix, textrank_scores, rank_sentences, top_terms
+
+
+SENTENCES = [
+    "The river flooded the valley after weeks of heavy rain.",
+    "Farmers in the valley lost their crops to the flooded river.",
+    "Heavy rain and the flooded river forced the valley to evacuate.",
+    "My cat likes sardines.",
+    "Rebuilding the valley after the river flood took many years.",
+]
+
+
+def test_textrank_scores_form_a_distribution():
+    matrix, _ = tfidf_matrix(SENTENCES)
+    scores = textrank_scores(matrix)
+    assert scores.shape == (len(SENTENCES),)
+    assert abs(scores.sum() - 1.0) < 1e-6
+    # The off-topic sentence shares no terms, so it is the least central
+    assert scores.argmin() == 3
+
+
+def test_rank_sentences_keeps_reading_order_and_count():
+    chosen = rank_sentences(SENTENCES, 3)
+    assert len(chosen) == 3
+    assert chosen == sorted(chosen)
+    assert 3 not in chosen
+
+
+def test_top_terms_prefers_recurring_words():
+    matrix, terms = tfidf_matrix(SENTENCES)
+    assert {"valley", "river"} & set(top_terms(matrix, terms, 3))
@@ -0,0 +1,90 @@
+from typing import List
+
+import pytest
+from pydantic import BaseModel, Field
+from langchain_core.prompts import PromptTemplate
+from langchain_core.output_parsers import PydanticOutputParser
+
+from app.services import fake_providers
+from app.services.fake_providers import (
+    FakeChatModel,
+    FakeGeminiClient,
+    FakeGroqClient,
+    FakeProviderError,
+    FakeSarvamHTTP,
+    FakeTranslator,
+)
+from app.utils.rate_governor import is_rate_limit_error
+
+
+@pytest.fixture(autouse=True)
+def no_latency(monkeypatch):
+    monkeypatch.setattr(fake_providers, "FAKE_LATENCY_MS", 0)
+    monkeypatch.setattr(fake_providers, "FAKE_TOKENS_PER_SECOND", 0)
+    monkeypatch.setattr(fake_providers, "FAKE_ERROR_RATE", 0)
+
+
+class Question(BaseModel):
+    question: str = Field(description="The question")
+    options: List[str] = Field(description="Four options")
+    answer: str = Field(description="The answer")
+
+
+class Quiz(BaseModel):
+    quiz: List[Question]
+
+
+def test_outputs_are_deterministic_per_prompt():
+    client = FakeGroqClient()
+    messages = [{"role": "user", "content": "Summarize the river and the mountain."}]
+    first = client.chat.completions.create(model="m", messages=messages)
+    second = client.chat.completions.create(model="m", messages=messages)
+    other = client.chat.completions.create(model="m", messages=[{"role": "user", "content": "Something else."}])
+
+    assert first.choices[0].message.content == second.choices[0].message.content
+    assert first.choices[0].message.content != other.choices[0].message.content
+    assert first.usage.total_tokens > 0
+
+
+def test_chat_model_answers_parser_chains_with_schema_valid_json():
+    parser = PydanticOutputParser(pydantic_object=Quiz)
+    prompt = PromptTemplate(
+        template="Make a quiz about: {text}\n{format_instructions}",
+        input_variables=["text"],
+        partial_variables={"format_instructions": parser.get_format_instructions()},
+    )
+    result = (prompt | FakeChatModel(model_name="m") | parser).invoke({"text": "Photosynthesis in plants."})
+
+    assert isinstance(result, Quiz)
+    assert len(result.quiz) == 5
+    assert all(len(q.options) == 4 for q in result.quiz)
+
+
+def test_error_injection_looks_like_a_rate_limit(monkeypatch):
+    monkeypatch.setattr(fake_providers, "FAKE_ERROR_RATE", 1.0)
+
+    with pytest.raises(FakeProviderError) as excinfo:
+        FakeTranslator(target="hi").translate("hello")
+    assert is_rate_limit_error(excinfo.value)
+
+    response = FakeSarvamHTTP().post("https://api.sarvam.ai/translate", json={"input": "hello"})
+    assert response.status_code == 429
+
+
+def test_gemini_file_flow_and_translation_stand_ins(tmp_path):
+    path = tmp_path / "book.txt"
+    path.write_text("Glaciers carve valleys over thousands of years.")
+    client = FakeGeminiClient()
+
+    uploaded = client.files.upload(file=str(path))
+    assert "ACTIVE" in str(client.files.get(name=uploaded.name).state).upper()
+    response = client.models.generate_content(model="m", contents=[uploaded, "Summarize."])
+    streamed = "".join(c.text for c in client.models.generate_content_stream(model="m", contents=[uploaded, "Summarize."]))
+    assert response.text == streamed
+    assert response.usage_metadata.total_token_count > 0
+
+    sarvam = FakeSarvamHTTP().post(
+        "https://api.sarvam.ai/translate", json={"input": "hello", "target_language_code": "hi-IN"}
+    )
+    assert sarvam.json()["translated_text"] == "[hi-IN] hello"
+    assert FakeTranslator(target="bn").translate("hello") == "[bn] hello"
@@ -0,0 +1,53 @@
+import pytest
+
+from app.models import Book, ProcessingJob, SentenceIndex
+from app.services import job_queue
+
+TEXT = (
+    "The river rose slowly through the night. Farmers in the valley moved their animals "
+    "to higher ground. By morning the old bridge was under water, and the school was closed. "
+) * 20
+
+
+@pytest.fixture
+def ingest(db, make_book, session_factory, monkeypatch):
+    """Uploads `file_path` as a book and runs its ingest job; returns (book, job) afterwards."""
+    monkeypatch.setattr(job_queue, "SessionLocal", session_factory)
+
+    def run(file_path):
+        book = make_book(title="Flood", file_path=file_path, status="uploaded")
+        job = job_queue.enqueue(db, book, kind="ingest", priority=job_queue.INGEST_PRIORITY)
+        db.commit()
+        assert job_queue.claim_next(db, "w1").job_id == job.job_id
+        job_queue.execute_job(job.job_id)
+        db.expire_all()
+        return db.get(Book, book.book_id), db.get(ProcessingJob, job.job_id)
+    return run
+
+
+def test_ingestion_extracts_counts_indexes_and_marks_ready(db, ingest, tmp_path):
+    path = tmp_path / "flood.txt"
+    path.write_text(TEXT, encoding="utf-8")
+
+    book, job = ingest(str(path))
+
+    assert job.status == "completed"
+    assert book.status == "ready"
+    assert book.word_count == len(TEXT.split()) and book.char_count == len(TEXT)
+    assert book.language in ("en", None)  # None when langdetect is not installed
+    assert db.query(SentenceIndex).filter(SentenceIndex.book_id == book.book_id).one().sentence_count == 60
+    assert db.query(ProcessingJob).filter(ProcessingJob.book_id == book.book_id, ProcessingJob.kind == "tree").count() == 1
+
+
+def test_books_without_text_are_ready_for_ocr_summaries(db, ingest, tmp_path):
+    path = tmp_path / "scan.txt"
+    path.write_text("   \n\n  ", encoding="utf-8")
+
+    book, job = ingest(str(path))
+
+    # Scanned PDFs land here too: the summary path uploads the file and Gemini OCRs it
+    assert job.status == "completed" and job.attempts == 1
+    assert book.status == "ready"
+    assert book.word_count == 0 and book.char_count == 0 and book.language is None
+    assert db.query(SentenceIndex).filter(SentenceIndex.book_id == book.book_id).count() == 0
+    assert db.query(ProcessingJob).filter(ProcessingJob.book_id == book.book_id, ProcessingJob.kind == "tree").count() == 0
@@ -0,0 +1,76 @@
+import time
+
+from app.models import ProcessingJob, SummaryBatch
+from app.services import job_queue
+
+
+def test_claim_is_exclusive_and_stale_jobs_retry_then_fail(db, make_book):
+    book = make_book(title="Queued", status="processing")
+    job = job_queue.enqueue(db, book, "short", "bullet")
+    job.max_attempts = 2
+    db.commit()
+
+    claimed = job_queue.claim_next(db, "w1")
+    assert claimed.job_id == job.job_id
+    assert claimed.status == "running" and claimed.attempts == 1
+    assert job_queue.claim_next(db, "w2") is None
+
+    # Worker died mid-job: the lease expires and the job goes back on the queue
+    assert job_queue.recover_stale(db, lease_seconds=-1) == 1
+    db.refresh(claimed)
+    assert claimed.status == "queued"
+
+    claimed.available_at = job_queue._utcnow()
+    db.commit()
+    assert job_queue.claim_next(db, "w2").attempts == 2
+    job_queue.recover_stale(db, lease_seconds=-1)
+
+    db.refresh(claimed)
+    db.refresh(book)
+    assert claimed.status == "failed"
+    assert book.status == "failed"
+
+
+def test_batch_jobs_run_small_first_within_provider_limit(db, make_user, make_book, monkeypatch):
+    user = make_user("Batch")
+    books = [make_book(user, title=f"Book {n}", file_path=f"uploads/{n}.pdf", word_count=n) for n in (9000, 300, 4000)]
+    batch = SummaryBatch(user_id=user.user_id, total=3)
+    db.add(batch)
+    db.commit()
+
+    for book in books:
+        job_queue.enqueue(db, book, batch_id=batch.batch_id, priority=book.word_count)
+    db.commit()
+
+    monkeypatch.setitem(job_queue.KIND_CONCURRENCY, "summary", 2)
+    first = job_queue.claim_next(db, "w1")
+    second = job_queue.claim_next(db, "w2")
+    assert [first.book.word_count, second.book.word_count] == [300, 4000]
+    # Provider limit reached: the biggest book waits even though a worker is free
+    assert job_queue.claim_next(db, "w3") is None
+
+    first.status = "completed"
+    db.commit()
+    progress = job_queue.batch_progress(db, batch)
+    assert progress["counts"] == {"queued": 1, "running": 1, "completed": 1, "failed": 0}
+    assert progress["progress"] == 33.3 and progress["status"] == "running"
+    assert [b["title"] for b in progress["books"]] == ["Book 300", "Book 4000", "Book 9000"]
+
+    assert job_queue.claim_next(db, "w3").book.word_count == 9000
+
+
+def test_long_running_handler_keeps_its_lease(db, session_factory, make_book, monkeypatch):
+    book = make_book(title="Long", status="processing")
+    job = job_queue.enqueue(db, book)
+    db.commit()
+    job = job_queue.claim_next(db, "w1")
+    started = job.heartbeat_at
+    monkeypatch.setattr(job_queue, "SessionLocal", session_factory)
+
+    # Slower than the heartbeat interval: beats keep arriving until the block exits
+    with job_queue._keep_alive(job.job_id, interval=0.02):
+        time.sleep(0.2)
+
+    db.expire_all()
+    assert db.get(ProcessingJob, job.job_id).heartbeat_at > started
+    assert job_queue.recover_stale(db, lease_seconds=60) == 0
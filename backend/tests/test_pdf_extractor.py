@@ -0,0 +1,77 @@
+import fitz
+
+from app.services import pdf_extractor
+from app.services.pdf_extractor import page_issue
+from app.services.text_extractor import extract_from_pdf
+
+
+def _write_pdf(path, pages):
+    pdf = fitz.open()
+    for i in range(pages):
+        pdf.new_page().insert_text((72, 72), f"Page number {i} marker")
+    pdf.save(path)
+    pdf.close()
+
+
+def test_page_ranges_cover_every_page_once_in_order():
+    for count in (1, 7, 64, 1001):
+        ranges = pdf_extractor.page_ranges(count, workers=4)
+        assert ranges[0][0] == 0 and ranges[-1][1] == count
+        assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+        assert len(ranges) <= 4 * pdf_extractor.PDF_RANGES_PER_WORKER
+    assert pdf_extractor.page_ranges(0, workers=4) == []
+
+
+def test_pool_extraction_is_page_aligned(tmp_path, monkeypatch):
+    path = str(tmp_path / "book.pdf")
+    _write_pdf(path, 40)
+    monkeypatch.setattr(pdf_extractor, "PDF_PARALLEL_MIN_PAGES", 10)
+    monkeypatch.setattr(pdf_extractor, "PDF_MIN_PAGES_PER_RANGE", 4)
+
+    try:
+        parallel = pdf_extractor.extract_pages(path, workers=2)
+    finally:
+        pdf_extractor.shutdown_pool()
+    serial = pdf_extractor.extract_pages(path, workers=1)
+
+    assert parallel == serial
+    assert len(parallel) == 40
+    assert all(f"Page number {i} marker" in text for i, text in enumerate(parallel))
+    assert "Page number 39 marker" in extract_from_pdf(path)
+
+
+def test_page_issue_flags_empty_garbage_and_run_on_text():
+    assert page_issue("  \n ") == "empty"
+    assert page_issue("�� ok") == "garbage"
+    assert page_issue("Thewordsonthispagewereallrunntogetherbythefontencoding " * 3) == "missing_spaces"
+    assert page_issue("An ordinary page of text, with spaces between words.") is None
+
+
+def test_scripts_written_without_spaces_are_not_run_on_text():
+    assert page_issue("河水在夜里慢慢上涨，山谷里的农民把牲畜赶到高处。第二天早上，旧桥已经被水淹没了。" * 3) is None
+    assert page_issue("川の水は夜のうちにゆっくりと増え、谷の農家は家畜を高い所へ移した。" * 3) is None
+    assert page_issue("แม่น้ำค่อยๆเพิ่มสูงขึ้นตลอดทั้งคืนและชาวนาในหุบเขาย้ายสัตว์ขึ้นที่สูง" * 3) is None
+
+
+def test_only_bad_pages_go_to_the_fallback_parser(tmp_path, monkeypatch):
+    path = str(tmp_path / "mixed.pdf")
+    pdf = fitz.open()
+    for i in range(5):
+        page = pdf.new_page()
+        if i != 3:  # page 3 is blank, e.g. a scan without a text layer
+            page.insert_text((72, 72), f"Page number {i} marker")
+    pdf.save(path)
+    pdf.close()
+
+    asked = []
+
+    def fallback(file_path, indices):
+        asked.extend(indices)
+        return {i: f"Recovered text for page {i}" for i in indices}
+
+    monkeypatch.setattr(pdf_extractor, "_fallback_pages", fallback)
+    pages = pdf_extractor.extract_pages(path, workers=1)
+
+    assert asked == [3]
+    assert pages[3] == "Recovered text for page 3"
+    assert "Page number 4 marker" in pages[4]
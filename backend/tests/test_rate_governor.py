@@ -0,0 +1,90 @@
+import threading
+import time
+
+import pytest
+
+from app.utils.rate_governor import RateGovernor, GovernorCallbackHandler, governed, get_governor
+
+
+def test_request_bucket_spaces_calls_after_the_burst():
+    # 1200/min = one every 50ms; a 0.1s burst allows two immediately
+    governor = RateGovernor("test", "m", requests_per_minute=1200, tokens_per_minute=10**9)
+    governor._requests.capacity = governor._requests.tokens = 2
+
+    start = time.perf_counter()
+    for _ in range(5):
+        governor.acquire()
+    assert time.perf_counter() - start >= 0.14  # 3 calls had to wait ~50ms each
+
+
+def test_token_bucket_limits_large_prompts_and_settles_usage():
+    governor = RateGovernor("test", "m", requests_per_minute=10**6, tokens_per_minute=60000)  # 1000 tok/s
+    governor._tokens.capacity = governor._tokens.tokens = 500
+
+    governor.acquire(500)
+    governor.settle(charged=500, actual=100)  # 400 refunded
+    start = time.perf_counter()
+    governor.acquire(400)
+    assert time.perf_counter() - start < 0.05
+
+    start = time.perf_counter()
+    governor.acquire(200)  # bucket near empty: ~0.2s of refill
+    assert time.perf_counter() - start >= 0.15
+    assert governor.saturation()["token_bucket_used"] > 0.5
+
+
+def test_settle_refunds_against_what_was_charged_not_the_estimate():
+    governor = get_governor("test-capped", "m")
+    governor._tokens.rate = 1e-9  # no refill to speak of during the test
+    governor._tokens.capacity = governor._tokens.tokens = 1800
+
+    # Estimate 2524 is above one burst, so acquire takes only 1800
+    with governed("test-capped", "m", max_output_tokens=2523) as usage:
+        assert usage.charged == 1800 and governor._tokens.tokens == 0
+        usage.tokens = 1600
+    assert governor._tokens.tokens == pytest.approx(200)  # 1600 net, not 876
+
+
+def test_callers_are_served_in_arrival_order():
+    governor = RateGovernor("test", "m", requests_per_minute=3000, tokens_per_minute=10**9)
+    governor._requests.capacity = governor._requests.tokens = 1
+    order = []
+
+    def call(i):
+        governor.acquire()
+        order.append(i)
+
+    threads = []
+    for i in range(5):
+        t = threading.Thread(target=call, args=(i,))
+        t.start()
+        threads.append(t)
+        time.sleep(0.005)  # fix arrival order
+    for t in threads:
+        t.join()
+    assert order == [0, 1, 2, 3, 4]
+    assert governor.saturation()["queue_depth"] == 0
+
+
+def test_rate_limit_error_pauses_the_governor():
+    class TooMany(Exception):
+        status_code = 429
+
+    with pytest.raises(TooMany):
+        with governed("test-429", "m"):
+            raise TooMany("slow down")
+
+    stats = get_governor("test-429", "m").saturation()
+    assert stats["rate_limited"] == 1 and stats["blocked_for_seconds"] > 0
+
+
+def test_langchain_callback_acquires_before_each_call():
+    handler = GovernorCallbackHandler("test-cb", "m", max_output_tokens=10)
+    handler.on_llm_start({}, ["hello world"], run_id="r1")
+    assert handler.governor.total_requests == 1
+
+    class Result:
+        llm_output = {"token_usage": {"total_tokens": 5}}
+
+    handler.on_llm_end(Result(), run_id="r1")
+    assert handler._charged == {}
@@ -0,0 +1,39 @@
+from app.models import SentenceIndex
+from app.services.sentence_index import (
+    pack_spans, unpack_spans, SentenceView, build_sentence_index, get_sentence_view,
+)
+
+TEXT = "Dr. Smith arrived. He paid 1.5 dollars!\n\nThen he left. The end."
+
+
+def test_packed_offsets_round_trip():
+    spans = [(0, 18), (19, 39), (41, 54)]
+    blob = pack_spans(spans)
+    assert len(blob) == 4 * 2 * len(spans)
+    assert SentenceView("", unpack_spans(blob)).spans() == spans
+
+
+def test_view_gives_direct_sentence_access():
+    view = SentenceView(TEXT, unpack_spans(pack_spans([(0, 18), (19, 39), (41, 54), (55, 63)])))
+    assert len(view) == 4
+    assert view.sentence(1) == "He paid 1.5 dollars!"
+    assert view.sentence(-1) == "The end."
+    assert view.range_text(1, 3) == "He paid 1.5 dollars!\n\nThen he left."
+    assert view.sentence_at(TEXT.index("left")) == 2
+    # Window keeps whole sentences within the budget; an oversized first one is truncated
+    assert view.window(40) == "Dr. Smith arrived. He paid 1.5 dollars!"
+    assert view.window(5) == "Dr. S"  # never more than the budget, even mid-sentence
+
+
+def test_index_is_stored_once_and_rebuilt_when_stale(db, make_book):
+    book = make_book(title="Indexed", file_path="uploads/i.txt", extracted_text=TEXT)
+
+    build_sentence_index(db, book)
+    db.commit()
+    view = get_sentence_view(db, book)
+    assert view.sentences() == ["Dr. Smith arrived.", "He paid 1.5 dollars!", "Then he left.", "The end."]
+
+    book.extracted_text = TEXT + " Epilogue here."
+    db.commit()
+    assert get_sentence_view(db, book).sentence(-1) == "Epilogue here."
+    assert db.query(SentenceIndex).count() == 1
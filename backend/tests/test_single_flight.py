@@ -0,0 +1,60 @@
+import threading
+import time
+
+import pytest
+
+from app.utils.single_flight import SingleFlight
+
+
+def _run_concurrently(n, target):
+    results, errors = [], []
+
+    def worker():
+        try:
+            results.append(target())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+
+def test_concurrent_duplicates_share_one_execution():
+    flight = SingleFlight("test")
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"quiz": ["q1"]}
+
+    results, errors = _run_concurrently(5, lambda: flight.do((1, "English"), slow))
+
+    assert not errors and len(calls) == 1
+    assert all(r is results[0] for r in results)
+    stats = flight.stats()
+    assert stats["executions"] == 1 and stats["coalesced"] == 4 and stats["in_flight"] == 0
+
+    # Nothing is cached: a later call runs again
+    flight.do((1, "English"), slow)
+    assert len(calls) == 2
+
+
+def test_failure_is_shared_and_not_remembered():
+    flight = SingleFlight("test")
+
+    def boom():
+        time.sleep(0.1)
+        raise RuntimeError("provider down")
+
+    results, errors = _run_concurrently(3, lambda: flight.do("k", boom))
+    assert not results and len(errors) == 3
+    assert flight.stats()["errors"] == 1
+
+    assert flight.do("k", lambda: "ok") == "ok"
+    with pytest.raises(RuntimeError):
+        flight.do("other", boom)
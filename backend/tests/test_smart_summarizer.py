@@ -0,0 +1,73 @@
+import time
+
+from app.services.smart_summarizer import parallel_map, tree_reduce
+
+
+def test_parallel_map_preserves_order_and_overlaps_calls():
+    def slow_echo(x):
+        time.sleep(0.05 * (5 - x))
+        return x * 10
+
+    progress = []
+    start = time.perf_counter()
+    results = parallel_map(slow_echo, range(5), max_workers=5, on_done=lambda d, n: progress.append((d, n)))
+    elapsed = time.perf_counter() - start
+
+    assert results == [0, 10, 20, 30, 40]
+    assert progress[-1] == (5, 5)
+    assert elapsed < 0.45  # serial would take 0.75s
+
+
+def test_tree_reduce_batches_until_final_merge_fits():
+    summaries = ["x" * 400] * 10  # 100 tokens each, 1000 total
+    partial_calls = []
+
+    def partial(text):
+        partial_calls.append(text)
+        return "y" * 200  # every merge halves the batch
+
+    final = tree_reduce(summaries, final_merge=lambda t: f"FINAL:{len(t)}", partial_merge=partial, budget=300)
+
+    # level 1: 10 -> 4 batches (3+3+3+1); level 2: 4 x 50 tokens = 200 <= budget
+    assert len(partial_calls) == 4
+    assert final.startswith("FINAL:")
+
+
+def test_tree_reduce_merges_what_remains_when_a_level_does_not_shrink():
+    summaries = ["x" * 400] * 10
+    partial_calls = []
+
+    def verbose(text):
+        partial_calls.append(text)
+        return text + " and more"  # a model that pads instead of condensing
+
+    final = tree_reduce(summaries, final_merge=lambda t: f"FINAL:{len(t)}", partial_merge=verbose, budget=300)
+
+    # one level (4 batches) grows the text, so the next call is the final merge
+    assert len(partial_calls) == 4
+    assert final.startswith("FINAL:")
+
+
+def test_tree_reduce_single_pass_when_under_budget():
+    result = tree_reduce(["a", "b"], final_merge=lambda t: t.upper(), partial_merge=lambda t: 1 / 0, budget=100)
+    assert result == "A\n\nB"
+
+
+def test_parallel_map_consumes_lazy_iterables_incrementally():
+    pulled = []
+
+    def source():
+        for i in range(20):
+            pulled.append(i)
+            yield i
+
+    seen_at_first_result = []
+
+    def work(x):
+        if x == 0:
+            seen_at_first_result.append(len(pulled))
+        return x + 1
+
+    results = parallel_map(work, source(), max_workers=2)
+    assert results == list(range(1, 21))
+    assert seen_at_first_result[0] < 20  # work began before the source was drained
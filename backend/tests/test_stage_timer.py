@@ -0,0 +1,76 @@
+import time
+import urllib.request
+
+from app.models import Book, StageTiming
+from app.services import job_queue
+from app.utils.stage_timer import Histogram, recording, stage, render_prometheus, serve_prometheus
+
+
+def test_histogram_renders_cumulative_prometheus_buckets():
+    h = Histogram("demo_seconds", "Demo.", "stage", buckets=(0.1, 1))
+    for seconds in (0.05, 0.5, 0.7, 3):
+        h.observe("ocr_wait", seconds)
+
+    lines = h.render()
+    assert 'demo_seconds_bucket{stage="ocr_wait",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{stage="ocr_wait",le="1"} 3' in lines
+    assert 'demo_seconds_bucket{stage="ocr_wait",le="+Inf"} 4' in lines
+    assert 'demo_seconds_count{stage="ocr_wait"} 4' in lines
+    assert lines[1] == "# TYPE demo_seconds histogram"
+
+
+def test_stages_are_recorded_only_inside_a_recording_block():
+    with stage("outside"):
+        pass
+    with recording() as recorder:
+        with stage("generation"):
+            time.sleep(0.01)
+        with stage("generation"):
+            pass
+    with recording(recorder), stage("db_commit"):
+        pass
+
+    assert [name for name, _ in recorder.stages] == ["generation", "generation", "db_commit"]
+    assert recorder.totals()["generation"] >= 0.01
+    assert 'stage="generation"' in render_prometheus()
+
+
+def test_executed_jobs_persist_stage_timings_and_book_processing_times(db, make_book, session_factory, monkeypatch):
+    book = make_book(title="Timed")
+
+    def handler(db, job):
+        with stage("gemini_upload"):
+            pass
+        with stage("generation"):
+            time.sleep(0.02)
+
+    monkeypatch.setattr(job_queue, "SessionLocal", session_factory)
+    monkeypatch.setattr(job_queue, "_handler_for", lambda kind: handler)
+    job = job_queue.enqueue(db, book)
+    db.commit()
+    job_queue.claim_next(db, "w1")
+    job_queue.execute_job(job.job_id)
+
+    db.expire_all()
+    timings = db.query(StageTiming).filter(StageTiming.job_id == job.job_id).all()
+    assert sorted(t.stage for t in timings) == ["gemini_upload", "generation"]
+    assert all(t.book_id == book.book_id for t in timings)
+
+    book = db.get(Book, book.book_id)
+    assert book.processing_start is not None and book.processing_end is not None
+    assert book.processing_end >= book.processing_start
+    assert 'book_summarizer_job_duration_seconds_count{kind="summary"}' in render_prometheus()
+
+
+def test_worker_processes_serve_their_own_metrics():
+    with stage("worker_only_stage"):
+        pass
+    server = serve_prometheus(0, host="127.0.0.1")  # port 0: any free port
+    try:
+        url = f"http://127.0.0.1:{server.server_port}"
+        with urllib.request.urlopen(f"{url}/metrics") as response:
+            body = response.read().decode()
+        assert 'stage="worker_only_stage"' in body
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta, timezone
+
+from app.models import SummaryCacheEntry
+from app.services.summary_cache import SummaryCache, make_cache_key
+
+
+def test_cache_key_normalizes_settings():
+    a = make_cache_key("abc", "Medium", "Paragraph ", "gemini-1.5-flash", "v1")
+    b = make_cache_key("abc", "medium", "paragraph", "gemini-1.5-flash", "v1")
+    assert a == b
+    assert a != make_cache_key("abc", "medium", "paragraph", "gemini-1.5-flash", "v2")
+
+
+def test_cache_hit_miss_and_eviction(db):
+    cache = SummaryCache(ttl_hours=1, max_entries=2)
+
+    assert cache.get(db, "k1") is None
+    for key in ("k1", "k2", "k3"):
+        cache.put(db, key, "hash", "medium", "paragraph", "m", "v1", f"summary {key}", ["a", "b"])
+
+    # k1 was least recently used and pushed out by the cap
+    assert cache.get(db, "k1") is None
+    hit = cache.get(db, "k3")
+    assert hit["summary_text"] == "summary k3"
+    assert hit["keywords"] == ["a", "b"]
+
+    # Expired entries are misses
+    db.query(SummaryCacheEntry).update(
+        {"created_at": datetime.now(timezone.utc) - timedelta(hours=2)}, synchronize_session=False
+    )
+    db.commit()
+    assert cache.get(db, "k3") is None
+
+    stats = cache.stats(db)
+    assert stats["hits"] == 1
+    assert stats["misses"] == 3
@@ -0,0 +1,120 @@
+import json
+
+import nltk
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.models import Book, Summary
+from app.routers import summarizer
+from app.services import fake_providers, providers
+from app.services.summarizer_service import summarizer_service
+from app.utils.database import get_db
+
+
+def _has_punkt():
+    try:
+        nltk.data.find("tokenizers/punkt_tab")
+        return True
+    except LookupError:
+        return False
+
+
+app = FastAPI()
+app.include_router(summarizer.router, prefix="/summary")
+
+
+@pytest.fixture
+def client(session_factory, monkeypatch):
+    # PROVIDER_MODE=fake with no latency: the real service code talks to the offline Gemini stand-in
+    monkeypatch.setattr(providers, "PROVIDER_MODE", "fake")
+    monkeypatch.setattr(fake_providers, "FAKE_LATENCY_MS", 0)
+    monkeypatch.setattr(fake_providers, "FAKE_TOKENS_PER_SECOND", 0)
+    monkeypatch.setattr(fake_providers, "FAKE_ERROR_RATE", 0)
+    monkeypatch.setattr(summarizer_service, "client", providers.gemini_client())
+    monkeypatch.setattr(summarizer, "SessionLocal", session_factory)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setitem(app.dependency_overrides, get_db, override_get_db)
+    return TestClient(app)
+
+
+def _events(response):
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def _stream(client, make_book, tmp_path):
+    path = tmp_path / "tides.txt"
+    path.write_text("The moon pulls the oceans into tides that rise and fall twice a day.")
+    book_id = make_book(title="Tides", file_path=str(path), status="ready").book_id
+    response = client.get(f"/summary/{book_id}/stream", params={"length": "short"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    return book_id, _events(response)
+
+
+def test_stream_sends_progress_then_numbered_tokens(client, make_book, tmp_path):
+    _, events = _stream(client, make_book, tmp_path)
+
+    names = [name for name, _ in events]
+    assert names[:4] == ["progress", "progress", "progress", "token"]
+    assert [data["stage"] for _, data in events[:3]] == ["started", "uploaded", "ocr_active"]
+    tokens = [data for name, data in events if name == "token"]
+    assert len(tokens) > 1 and [t["chunk"] for t in tokens] == list(range(1, len(tokens) + 1))
+    assert names[3:3 + len(tokens)] == ["token"] * len(tokens)
+
+
+@pytest.mark.skipif(not _has_punkt(), reason="NLTK punkt data not installed (post-processing needs it)")
+def test_stream_ends_with_done_and_saves_the_summary(db, client, make_book, tmp_path):
+    book_id, events = _stream(client, make_book, tmp_path)
+
+    assert events[-1][0] == "done" and "error" not in [name for name, _ in events]
+    done = events[-1][1]
+    assert done["status"] == "completed" and done["length"] == "short" and done["summary_text"]
+    db.expire_all()
+    assert db.get(Summary, done["summary_id"]).book_id == book_id
+    assert db.get(Book, book_id).status == "completed"
+
+
+def test_stream_reports_errors_and_fails_the_book(db, client, make_book, tmp_path):
+    book_id = make_book(title="Tides", file_path=str(tmp_path / "missing.pdf"), status="ready").book_id
+
+    events = _events(client.get(f"/summary/{book_id}/stream"))
+
+    assert [name for name, _ in events] == ["progress", "error"]
+    assert events[-1][1]["status"] == "failed" and "missing.pdf" in events[-1][1]["message"]
+    db.expire_all()
+    assert db.get(Book, book_id).status == "failed"
+
+
+def test_disconnect_mid_stream_restores_the_book_status(db, client, make_book, tmp_path, monkeypatch):
+    path = tmp_path / "tides.txt"
+    path.write_text("The moon pulls the oceans into tides that rise and fall twice a day.")
+    book_id = make_book(title="Tides", file_path=str(path), status="ready").book_id
+    # Drive the generator directly so the test controls when the "client" goes away
+    monkeypatch.setattr(summarizer, "StreamingResponse", lambda content, **kwargs: content)
+    stream = summarizer.stream_summary(book_id, length="short", format="paragraph", db=db)
+
+    while not next(stream).startswith("event: token"):
+        pass
+    db.expire_all()
+    assert db.get(Book, book_id).status == "processing"
+
+    stream.close()
+    db.expire_all()
+    assert db.get(Book, book_id).status == "ready"
+    assert db.query(Summary).filter(Summary.book_id == book_id).count() == 0
+
+
+def test_stream_unknown_book_is_404(client):
+    assert client.get("/summary/999999/stream").status_code == 404
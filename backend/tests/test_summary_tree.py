@@ -0,0 +1,26 @@
+from app.services.summary_tree import pick_level, render_summary
+
+LEVELS = [
+    ["Chunk one happens. More detail.", "Chunk two follows."],
+    ["Section A covers the start. It sets the scene.", "Section B ends it."],
+    ["The whole book in brief."],
+]
+
+
+def test_lengths_map_to_tree_levels():
+    assert pick_level(LEVELS, "short") == LEVELS[2]
+    assert pick_level(LEVELS, "Medium") == LEVELS[1]
+    assert pick_level(LEVELS, "long") == LEVELS[0]
+    # Small books without a section level fall back to the root for medium
+    assert pick_level([LEVELS[0], LEVELS[2]], "medium") == LEVELS[2]
+
+
+def test_render_reformats_without_llm():
+    assert render_summary(LEVELS, "medium", "paragraph") == (
+        "Section A covers the start. It sets the scene.\n\nSection B ends it."
+    )
+    assert render_summary(LEVELS, "medium", "Bullet Points").splitlines() == [
+        "- Section A covers the start.",
+        "- It sets the scene.",
+        "- Section B ends it.",
+    ]
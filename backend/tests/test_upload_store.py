@@ -0,0 +1,72 @@
+import io
+import os
+import asyncio
+import hashlib
+
+import pytest
+from fastapi import APIRouter, FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from app.services import upload_store
+from app.services.upload_store import UploadRejected, UploadLimitRoute, save_upload, content_hash_of
+
+
+def _upload(name, data):
+    return UploadFile(io.BytesIO(data), filename=name, size=len(data))
+
+
+def test_identical_content_is_stored_once_under_its_hash(tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_store, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(upload_store, "UPLOAD_CHUNK_BYTES", 1024)  # several chunks
+    data = b"Chapter one. " * 1000
+    digest = hashlib.sha256(data).hexdigest()
+
+    first = asyncio.run(save_upload(_upload("notes.txt", data)))
+    second = asyncio.run(save_upload(_upload("other-name.txt", data)))
+
+    assert first.file_path == second.file_path == str(tmp_path / digest[:2] / f"{digest}.txt")
+    assert (first.duplicate, second.duplicate) == (False, True)
+    assert first.content_hash == digest and first.size == len(data)
+    assert content_hash_of(first.file_path) == digest
+    assert os.listdir(tmp_path / ".incoming") == []
+
+
+@pytest.mark.parametrize("name, data, status", [
+    ("image.png", b"This is a text file acting like an image", 400),
+    ("book.pdf", b"plain text pretending to be a PDF", 400),
+    ("book.txt", b"\x89PNG\r\n\x1a\n\x00\x00", 400),
+    ("big.txt", b"x" * 5000, 413),
+])
+def test_bad_uploads_are_rejected_without_leftovers(tmp_path, monkeypatch, name, data, status):
+    monkeypatch.setattr(upload_store, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(upload_store, "UPLOAD_CHUNK_BYTES", 1024)
+    upload = _upload(name, data)
+    upload.size = None  # as with chunked requests: the cap is enforced while streaming
+
+    with pytest.raises(UploadRejected) as exc:
+        asyncio.run(save_upload(upload, max_bytes=4096))
+
+    assert exc.value.status_code == status
+    assert not any(f.endswith((".txt", ".pdf", ".part")) for _, _, files in os.walk(tmp_path) for f in files)
+
+
+def test_oversized_requests_are_refused_before_the_body_is_parsed(monkeypatch):
+    monkeypatch.setattr(upload_store, "MAX_UPLOAD_MB", 0.1)  # ~100 KB, plus the form overhead
+    router = APIRouter(route_class=UploadLimitRoute)
+    parsed = []
+
+    @router.post("/upload")
+    def upload(file: UploadFile = File(...)):
+        parsed.append(file.filename)
+        return {"ok": True}
+
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+
+    response = client.post("/upload", files={"file": ("big.txt", b"x" * 300_000)})
+    assert response.status_code == 413 and "upload limit" in response.json()["detail"]
+    assert parsed == []
+
+    assert client.post("/upload", files={"file": ("small.txt", b"x" * 1000)}).status_code == 200
+    assert parsed == ["small.txt"]
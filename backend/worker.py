@@ -0,0 +1,100 @@
+# backend/worker.py
+# Standalone job worker. The API only enqueues by default (JOB_WORKER_MODE=external),
+# so run this next to it; JOB_WORKER_MODE=embedded runs the workers inside the web
+# process instead, for local development and tests.
+#   python worker.py --concurrency 4
+# Each worker process serves its own stage/job histograms on
+# WORKER_METRICS_PORT + index (default 9101, 9102, ...; 0 disables) for Prometheus.
+import os
+import sys
+import signal
+import logging
+import argparse
+import threading
+import multiprocessing
+
+# Add the current directory to Python path so we can import 'app'
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("worker")
+
+
+def run_worker_process(index: int, poll_interval: float, metrics_port: int = 0):
+    """Entry point of one pool process: claims and runs jobs until SIGTERM/SIGINT."""
+    from app.utils.database import engine
+    from app.models import Base
+    from app.services.job_queue import worker_loop, default_worker_id
+    from app.utils.stage_timer import serve_prometheus
+
+    # Never share pooled connections inherited from the parent process
+    engine.dispose(close=False)
+    Base.metadata.create_all(bind=engine)
+
+    # Histograms live in this process: the API's /metrics never sees them
+    if metrics_port:
+        try:
+            serve_prometheus(metrics_port + index)
+        except OSError as e:
+            logger.warning(f"⚠️ Worker {index} metrics disabled (port {metrics_port + index}): {e}")
+
+    stop_event = threading.Event()
+
+    def _graceful_stop(signum, frame):
+        logger.info(f"🛑 Worker {index} finishing current job, then exiting...")
+        stop_event.set()
+
+    signal.signal(signal.SIGTERM, _graceful_stop)
+    signal.signal(signal.SIGINT, _graceful_stop)
+
+    worker_loop(f"{default_worker_id()}-p{index}", stop_event, poll_interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Book Summarizer job worker pool")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=int(os.getenv("JOB_WORKER_CONCURRENCY", 2)),
+        help="Number of worker processes (default: JOB_WORKER_CONCURRENCY or 2)",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=float(os.getenv("JOB_POLL_INTERVAL", 2.0)),
+        help="Seconds to sleep when the queue is empty",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=int(os.getenv("WORKER_METRICS_PORT", 9101)),
+        help="First Prometheus port; process N listens on port + N (0 disables)",
+    )
+    args = parser.parse_args()
+
+    print(f"--- 👷 Starting {args.concurrency} worker process(es) ---")
+    pool = [
+        multiprocessing.Process(target=run_worker_process, args=(i, args.poll_interval, args.metrics_port), name=f"worker-{i}")
+        for i in range(args.concurrency)
+    ]
+    for p in pool:
+        p.start()
+
+    def _forward(signum, frame):
+        for p in pool:
+            if p.is_alive():
+                os.kill(p.pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, _forward)
+    signal.signal(signal.SIGINT, _forward)
+
+    for p in pool:
+        p.join()
+    print("✅ All workers stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -95,7 +95,7 @@ const Dashboard = () => {
   // ------------------------------------------------------
   const totalChars = books.reduce((acc, b) => acc + (b.char_count || 0), 0);
   const storageMB = (totalChars / (1024 * 1024)).toFixed(2);
-  const processedCount = books.filter(b => b.status === 'text_extracted' || b.status === 'completed').length;
+  const processedCount = books.filter(b => ['text_extracted', 'ready', 'completed'].includes(b.status)).length;
 
   if (loading) return (
     <div className="h-full flex flex-col items-center justify-center bg-white dark:bg-[#0F1016] min-h-screen">
@@ -170,7 +170,7 @@ const Dashboard = () => {
             {books.slice().sort((a, b) => b.book_id - a.book_id).slice(0, 5).map(book => {
               let message = `Processing ${book.title}`;
               if (book.status === 'completed') message = `Summary generated for ${book.title}`;
-              else if (book.status === 'text_extracted') message = `Uploaded ${book.title}`;
+              else if (book.status === 'text_extracted' || book.status === 'ready') message = `Uploaded ${book.title}`;
 
               return (
                 <div key={book.book_id} className="p-6 flex items-center justify-between hover:bg-slate-100 dark:hover:bg-white/5 transition-colors">
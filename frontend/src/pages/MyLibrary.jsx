@@ -208,7 +208,7 @@ const MyLibrary = () => {
 
                   {/* Action Buttons */}
                   <div className="mt-auto flex gap-3">
-                    {(book.status === 'text_extracted' || book.status === 'completed') ? (
+                    {(book.status === 'text_extracted' || book.status === 'ready' || book.status === 'completed') ? (
                       <button
                         onClick={() => handleAction(book)}
                         className="flex-1 bg-[#2A2B3D] hover:bg-[#35364F] text-white py-2.5 rounded-xl text-sm font-semibold transition-colors flex items-center justify-center gap-2 border border-white/5"
@@ -58,6 +58,21 @@ const getAuthHeaders = () => {
     fetchRecent();
   }, []);
 
+  // Text extraction runs in the background after upload: poll until the book is ready
+  const ingesting = successData && ['uploaded', 'extracting'].includes(successData.status);
+  useEffect(() => {
+    if (!ingesting) return;
+    const timer = setTimeout(async () => {
+      try {
+        const res = await fetch(`${API_URL}/books/${successData.book_id}`, { headers: getAuthHeaders() });
+        if (res.ok) setSuccessData(await res.json());
+      } catch (err) {
+        console.error("Failed to refresh book status");
+      }
+    }, 1500);
+    return () => clearTimeout(timer);
+  }, [successData]);
+
   // 3) FILE HANDLING
   const handleFileChange = (e) => {
     const selected = e.target.files[0];
@@ -248,7 +263,11 @@ const getAuthHeaders = () => {
                   <CheckCircle2 size={32} />
                 </div>
                 <h2 className="text-2xl font-bold text-white mb-2">Upload Successful!</h2>
-                <p className="text-slate-400 mb-6">Your book has been processed and is ready.</p>
+                <p className="text-slate-400 mb-6">
+                  {ingesting ? 'Extracting text...' :
+                    successData.status === 'failed' ? 'We could not read any text from this file.' :
+                    'Your book has been processed and is ready.'}
+                </p>
 
                 <div className="grid grid-cols-2 gap-4 mb-6 max-w-sm mx-auto">
                   <div className="bg-[#0F1016] p-3 rounded-xl border border-white/5">